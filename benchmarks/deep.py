@@ -0,0 +1,132 @@
+"""Compare the recursive and iterative evaluators on deeply nested programs.
+
+Run from the repository root:
+
+    python -m benchmarks.deep --depth 100000
+
+Two programs are timed: one assignment of a long chain of additions, whose
+AST is as deep as the chain is long, and ``if`` statements nested ``depth``
+levels deep. Each is parsed by Parser, which keeps open blocks on a stack,
+and by RecursiveParser, which recurses once per nested block as Parser used
+to, then run by the tree-walking interpreter, which recurses once per
+level, and by IterativeInterpreter. The chain has no blocks, so both
+parsers take the same path on it. The recursive parser and interpreter
+run in a thread with a raised recursion limit and a large stack; a
+failure is reported instead of a time.
+"""
+import argparse
+import io
+import sys
+import threading
+import time
+
+from src.ast import IfStatement
+from src.interpreter import Interpreter
+from src.iterative import IterativeInterpreter
+from src.lexer import Lexer
+from src.output import BufferedSink
+from src.parser import Parser
+
+RECURSIVE_STACK_SIZE = 512 * 1024 * 1024
+
+
+class RecursiveParser(Parser):
+    """Parser that parses each if block with a recursive call, for comparison."""
+
+    def iter_statements(self):
+        while self.current_token is not None and self.current_token.type != 'EOF':
+            if self.current_token.type == 'LBRACE':
+                self.eat('LBRACE')
+            elif self.current_token.type == 'RBRACE':
+                self.eat('RBRACE')
+                return
+            else:
+                yield self.statement()
+
+    def if_statement(self):
+        token = self.current_token
+        self.eat('IF')
+        self.eat('LPAREN')
+        condition = self.logical_expression()
+        self.eat('RPAREN')
+        true_block = self.parse()
+        false_block = None
+        if self.current_token is not None and self.current_token.type == 'ELSE':
+            self.eat('ELSE')
+            false_block = self.parse()
+        return IfStatement(condition, true_block, false_block, token.line, token.column)
+
+
+def long_chain(depth):
+    return 'x = 0' + ' + 1' * depth + ';\nprint x;\n'
+
+
+def nested_ifs(depth):
+    return 'x = 1;\n' + 'if (x) { ' * depth + 'print x;' + ' }' * depth + '\n'
+
+
+def time_parser(parser, tokens):
+    start = time.perf_counter()
+    parser(tokens).parse()
+    return time.perf_counter() - start
+
+
+def time_interpreter(engine, ast):
+    start = time.perf_counter()
+    engine(ast, BufferedSink(io.StringIO())).interpret()
+    return time.perf_counter() - start
+
+
+def with_deep_stack(function, *args):
+    """Call function in a thread that has room for deep recursion.
+
+    Returns the function's result, or the exception it raised.
+    """
+    outcome = []
+
+    def target():
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(10 ** 7)
+        try:
+            outcome.append(function(*args))
+        except (RecursionError, MemoryError) as e:
+            outcome.append(e)
+        finally:
+            sys.setrecursionlimit(limit)
+
+    stack_size = threading.stack_size(RECURSIVE_STACK_SIZE)
+    try:
+        thread = threading.Thread(target=target)
+        thread.start()
+    finally:
+        threading.stack_size(stack_size)
+    thread.join()
+    return outcome[0] if outcome else RuntimeError("thread crashed")
+
+
+def format_outcome(outcome):
+    if isinstance(outcome, BaseException):
+        return f'{type(outcome).__name__:>12}'
+    return f'{outcome:>12.3f}'
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Benchmark evaluation of deeply nested programs.")
+    arg_parser.add_argument('--depth', type=int, default=100000, help="nesting depth of the programs")
+    args = arg_parser.parse_args(argv)
+
+    print(f"{'program':<10} {'parse, recursive (s)':>21} {'parse, stack (s)':>17} "
+          f"{'run, recursive (s)':>19} {'run, iterative (s)':>19}")
+    for name, generator in (('chain', long_chain), ('nested', nested_ifs)):
+        tokens = Lexer(generator(args.depth)).tokenize()
+        recursive_parse = with_deep_stack(time_parser, RecursiveParser, tokens)
+        start = time.perf_counter()
+        ast = Parser(tokens).parse()
+        parse_time = time.perf_counter() - start
+        recursive = with_deep_stack(time_interpreter, Interpreter, ast)
+        iterative = time_interpreter(IterativeInterpreter, ast)
+        print(f"{name:<10} {format_outcome(recursive_parse):>21} {parse_time:>17.3f} "
+              f"{format_outcome(recursive):>19} {format_outcome(iterative):>19}")
+
+if __name__ == "__main__":
+    main()
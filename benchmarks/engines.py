@@ -0,0 +1,64 @@
+"""Compare the execution engines on a large generated script.
+
+Run from the repository root:
+
+    python -m benchmarks.engines --statements 100000
+"""
+import argparse
+import gc
+import io
+import sys
+import time
+
+from benchmarks.generators import mixed
+from src.engines import ALL_ENGINES
+from src.lexer import Lexer
+from src.parser import Parser
+
+
+def time_engine(engine, ast, repeat):
+    """Return (first, warm) timings for one engine.
+
+    The first run includes any compilation the engine does up front; warm
+    runs reuse the same engine instance and only measure execution.
+    """
+    held_stdout = sys.stdout
+    sys.stdout = io.StringIO()
+    try:
+        gc.collect()
+        start = time.perf_counter()
+        interpreter = engine(ast)
+        interpreter.interpret()
+        first = time.perf_counter() - start
+        warm = None
+        for _ in range(repeat):
+            interpreter.environment = {}
+            sys.stdout = io.StringIO()
+            start = time.perf_counter()
+            interpreter.interpret()
+            elapsed = time.perf_counter() - start
+            warm = elapsed if warm is None else min(warm, elapsed)
+    finally:
+        sys.stdout = held_stdout
+    return first, warm
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Benchmark the execution engines.")
+    arg_parser.add_argument('--statements', type=int, default=100000, help="number of generated statements")
+    arg_parser.add_argument('--repeat', type=int, default=3, help="warm runs per engine, the best is reported")
+    arg_parser.add_argument('--engines', nargs='+', choices=sorted(ALL_ENGINES), default=list(ALL_ENGINES))
+    args = arg_parser.parse_args(argv)
+
+    code = mixed(args.statements)
+    ast = Parser(Lexer(code).tokenize()).parse()
+
+    baseline = None
+    print(f"{'engine':<10} {'first (s)':>10} {'warm (s)':>10} {'speedup':>8}")
+    for name in args.engines:
+        first, warm = time_engine(ALL_ENGINES[name], ast, args.repeat)
+        baseline = warm if baseline is None else baseline
+        print(f"{name:<10} {first:>10.3f} {warm:>10.3f} {baseline / warm:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
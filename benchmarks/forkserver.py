@@ -0,0 +1,74 @@
+"""Compare ways of running a small script in a process of its own.
+
+Run from the repository root:
+
+    python -m benchmarks.forkserver --runs 50
+
+Each run executes the same script, and the best time per run is reported
+for a new interpreter process (what ``python execute.py`` costs), a child
+forked from a warmed-up parent when the run is requested, and a child
+taken from a pool forked ahead of time. Running the script in the current
+process, without isolation, is shown for reference.
+"""
+import argparse
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from src.execute import run_file
+from src.forkserver import ForkServer, warm_up
+from src.output import BufferedSink
+
+SCRIPT = 'x = 2; y = x * 3 + 1; if (y > 5) { print y; } else { print x; }\n'
+
+
+def run_script(filename, result):
+    output = io.TextIOWrapper(result, write_through=True)
+    run_file(filename, BufferedSink(output))
+    output.flush()
+    output.detach()
+
+
+def best_time(function, runs):
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Benchmark isolated runs of a small script.")
+    arg_parser.add_argument('--runs', type=int, default=50, help="runs of each method; the best is reported")
+    args = arg_parser.parse_args(argv)
+
+    directory = tempfile.TemporaryDirectory()
+    filename = os.path.join(directory.name, 'script.scl')
+    with open(filename, 'w') as file:
+        file.write(SCRIPT)
+    warm_up()
+    on_demand = ForkServer(run_script, pool_size=0)
+    pool = ForkServer(run_script, pool_size=2)
+    pool.start()
+    command = [sys.executable, '-c', 'from src.execute import main; import sys; main(sys.argv[1:])', filename]
+    methods = [
+        ('new process', lambda: subprocess.run(command, stdout=subprocess.DEVNULL, check=True)),
+        ('fork per run', lambda: on_demand.run(filename)),
+        ('pre-forked pool', lambda: pool.run(filename)),
+        ('in process', lambda: run_script(filename, io.BytesIO())),
+    ]
+    try:
+        print(f"{'method':<16} {'per run (ms)':>13}")
+        for name, function in methods:
+            print(f"{name:<16} {best_time(function, args.runs) * 1000:>13.2f}")
+    finally:
+        pool.close()
+        directory.cleanup()
+
+
+if __name__ == "__main__":
+    main()
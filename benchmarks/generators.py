@@ -0,0 +1,106 @@
+"""Generators of synthetic scripts for the benchmarks.
+
+Every generator takes the approximate number of statements to produce and a
+seed, returns the script's source, and produces the same script for the same
+arguments.
+"""
+import random
+
+
+def mixed(size, seed=0, variables=50):
+    """Assignments, if/else blocks and prints on a pool of variables.
+
+    The arithmetic is contracting so values stay bounded however long the
+    script is.
+    """
+    rng = random.Random(seed)
+    names = [f'v{i}' for i in range(variables)]
+    lines = [f'{name} = {rng.randint(1, 100)};' for name in names]
+    while len(lines) < size:
+        target, left, right = rng.choice(names), rng.choice(names), rng.choice(names)
+        shape = rng.random()
+        if shape < 0.6:
+            lines.append(f'{target} = ({left} + {rng.randint(1, 9)}) / 2 - {right} / 4;')
+        elif shape < 0.95:
+            lines.append(f'if ({left} > {right} && {left} < 1000) {{ {target} = {left} - {right}; }} '
+                         f'else {{ {target} = {right} / 2 + 1; }}')
+        else:
+            lines.append(f'print {target};')
+    return '\n'.join(lines) + '\n'
+
+
+def assignment_chain(size, seed=0):
+    """A long chain of assignments, each reading the previous variable."""
+    rng = random.Random(seed)
+    lines = ['x0 = 1;']
+    for i in range(1, size):
+        operator = rng.choice('+-*')
+        operand = rng.randint(1, 9) if operator != '*' else 1
+        lines.append(f'x{i} = x{i - 1} {operator} {operand};')
+    return '\n'.join(lines) + '\n'
+
+
+def nested_ifs(size, seed=0, depth=50):
+    """Groups of if blocks nested ``depth`` deep, each with an else branch."""
+    rng = random.Random(seed)
+    lines = ['n = 0;']
+    while len(lines) < size:
+        limit = rng.randint(0, depth)
+        for level in range(depth):
+            indent = '    ' * level
+            lines.append(f'{indent}if (n < {limit + level}) {{')
+            lines.append(f'{indent}    n = n + 1;')
+        for level in reversed(range(depth)):
+            indent = '    ' * level
+            lines.append(f'{indent}}} else {{ n = n - 1; }}')
+    return '\n'.join(lines) + '\n'
+
+
+def wide_expression(size, seed=0, width=100):
+    """Assignments whose value is a single expression of ``width`` terms."""
+    rng = random.Random(seed)
+    lines = [f'a{i} = {rng.randint(1, 9)};' for i in range(10)]
+    while len(lines) < size:
+        expression = f'a{rng.randrange(10)}'
+        for _ in range(width - 1):
+            operator = rng.choice(('+', '-', '*'))
+            # Only multiply by small literals so the values stay bounded.
+            if operator == '*':
+                term = str(rng.randint(1, 2))
+            else:
+                term = f'a{rng.randrange(10)}' if rng.random() < 0.5 else str(rng.randint(1, 9))
+            expression += f' {operator} {term}'
+        lines.append(f'a{rng.randrange(10)} = ({expression}) / {width * 10};')
+    return '\n'.join(lines) + '\n'
+
+
+def string_prints(size, seed=0, length=40):
+    """Prints of string literals and concatenations."""
+    rng = random.Random(seed)
+    words = ['alpha', 'beta', 'gamma', 'delta', 'epsilon']
+    lines = ['prefix = "item: ";']
+    while len(lines) < size:
+        text = ' '.join(rng.choice(words) for _ in range(length // 6))[:length]
+        if rng.random() < 0.5:
+            lines.append(f'print "{text}";')
+        else:
+            lines.append(f'print prefix + "{text}";')
+    return '\n'.join(lines) + '\n'
+
+
+# Workloads by name, with the size used when none is given.
+GENERATORS = {
+    'mixed': mixed,
+    'chain': assignment_chain,
+    'nested': nested_ifs,
+    'wide': wide_expression,
+    'strings': string_prints,
+}
+
+DEFAULT_SIZES = {
+    'mixed': 20000,
+    'chain': 20000,
+    'nested': 20000,
+    'wide': 1000,
+    'strings': 20000,
+}
@@ -0,0 +1,67 @@
+"""Find the source size from which lexing in parallel pays off.
+
+Run from the repository root:
+
+    python -m benchmarks.parallel_lexer --processes 4
+
+For each size, a ``mixed`` script is lexed serially with
+Lexer.tokenize_compact(), in parallel with a process pool started for the
+call, and in parallel with a pool that is already running. The best of
+``--repeat`` runs is reported, followed by the size from which each
+parallel mode beat the serial lexer at every larger size.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.generators import GENERATORS
+from src.lexer import Lexer
+
+DEFAULT_SIZES = (1000, 4000, 16000, 64000, 256000)
+
+
+def best_time(function, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Compare serial and parallel lexing by source size.")
+    arg_parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="statements per script")
+    arg_parser.add_argument('--processes', type=int, default=max(2, os.cpu_count() or 1),
+                            help="processes lexing in parallel (default: %(default)s)")
+    arg_parser.add_argument('--repeat', type=int, default=3, help="runs of each mode; the best is reported")
+    args = arg_parser.parse_args(argv)
+
+    modes = ('serial', 'new pool', 'warm pool')
+    faster = {mode: [] for mode in modes[1:]}  # Whether the mode beat serial, for each size
+    with ProcessPoolExecutor(args.processes) as executor:
+        executor.submit(int).result()  # Start the pool before timing
+        print(f"{'statements':>10} {'bytes':>11} " + ' '.join(f'{mode + " (ms)":>14}' for mode in modes))
+        for size in args.sizes:
+            code = GENERATORS['mixed'](size)
+            times = [
+                best_time(lambda: Lexer(code).tokenize_compact(), args.repeat),
+                best_time(lambda: Lexer(code).tokenize_parallel(args.processes), args.repeat),
+                best_time(lambda: Lexer(code).tokenize_parallel(args.processes, executor), args.repeat),
+            ]
+            print(f"{size:>10} {len(code.encode()):>11} " + ' '.join(f'{elapsed * 1000:>14.1f}' for elapsed in times))
+            for mode, elapsed in zip(modes[1:], times[1:]):
+                faster[mode].append((len(code.encode()), elapsed < times[0]))
+    print()
+    for mode, results in faster.items():
+        crossover = None
+        for size, is_faster in reversed(results):
+            if not is_faster:
+                break
+            crossover = size
+        print(f"{mode}: " + (f"faster from {crossover} bytes" if crossover else "not faster at the largest size"))
+
+
+if __name__ == "__main__":
+    main()
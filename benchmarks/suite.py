@@ -0,0 +1,176 @@
+"""Time the lexer, parser and interpreter on synthetic workloads.
+
+Run from the repository root:
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --baseline results.json --threshold 0.15
+
+Each phase is timed separately and the best of ``--repeat`` runs is kept.
+Peak memory of the whole pipeline is measured with tracemalloc in a separate
+untimed run, since tracing slows everything down. With ``--baseline`` every
+measurement is compared against a saved result file, and the exit status is
+1 if any of them got worse by more than the threshold.
+"""
+import argparse
+import gc
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from benchmarks.generators import DEFAULT_SIZES, GENERATORS
+from src.engines import DEFAULT_ENGINE, ENGINES
+from src.lexer import Lexer
+from src.output import BufferedSink
+from src.parser import Parser
+
+PHASES = ('lex', 'parse', 'interpret')
+METRICS = PHASES + ('peak_memory',)
+DEFAULT_THRESHOLD = 0.1
+
+
+def run_pipeline(code, engine, compact_tokens=False):
+    """Lex, parse and run code once; return the time of each phase."""
+    timings = {}
+    start = time.perf_counter()
+    lexer = Lexer(code)
+    tokens = lexer.tokenize_compact() if compact_tokens else lexer.tokenize()
+    timings['lex'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ast = Parser(tokens).parse()
+    timings['parse'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine(ast, BufferedSink(io.StringIO())).interpret()
+    timings['interpret'] = time.perf_counter() - start
+    return timings
+
+
+def peak_memory(code, engine, compact_tokens=False):
+    """Return the peak number of bytes allocated while running the pipeline."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run_pipeline(code, engine, compact_tokens)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark(workload, size, engine_name=DEFAULT_ENGINE, repeat=3, seed=0, compact_tokens=False):
+    """Return the result record of one workload."""
+    code = GENERATORS[workload](size, seed)
+    engine = ENGINES[engine_name]
+    best = {}
+    for _ in range(repeat):
+        gc.collect()
+        for phase, elapsed in run_pipeline(code, engine, compact_tokens).items():
+            best[phase] = min(elapsed, best.get(phase, elapsed))
+    return {
+        'workload': workload,
+        'size': size,
+        'engine': engine_name,
+        'compact_tokens': compact_tokens,
+        'source_bytes': len(code.encode()),
+        **best,
+        'peak_memory': peak_memory(code, engine, compact_tokens),
+    }
+
+
+def result_key(result):
+    return result['workload'], result['size'], result['engine'], result.get('compact_tokens', False)
+
+
+def compare(results, baseline):
+    """Compare results against baseline results.
+
+    Returns a list of (key, metric, old, new, change) for every measurement
+    present in both, where change is the relative difference.
+    """
+    old_results = {result_key(result): result for result in baseline}
+    comparisons = []
+    for result in results:
+        old = old_results.get(result_key(result))
+        if old is None:
+            continue
+        for metric in METRICS:
+            if metric in old and old[metric]:
+                change = result[metric] / old[metric] - 1
+                comparisons.append((result_key(result), metric, old[metric], result[metric], change))
+    return comparisons
+
+
+def regressions(comparisons, threshold=DEFAULT_THRESHOLD):
+    """Return the comparisons that got worse by more than threshold."""
+    return [comparison for comparison in comparisons if comparison[4] > threshold]
+
+
+def format_value(metric, value):
+    if metric == 'peak_memory':
+        return f'{value / (1024 * 1024):.2f} MB'
+    return f'{value * 1000:.1f} ms'
+
+
+def report(results):
+    lines = [f"{'workload':<10} {'size':>8} {'engine':<8} {'lex':>10} {'parse':>10} {'interpret':>10} {'peak':>10}"]
+    for result in results:
+        lines.append(f"{result['workload']:<10} {result['size']:>8} {result['engine']:<8} "
+                     + ' '.join(f'{format_value(metric, result[metric]):>10}' for metric in METRICS))
+    return '\n'.join(lines)
+
+
+def comparison_report(comparisons, threshold=DEFAULT_THRESHOLD):
+    lines = []
+    for (workload, size, engine, compact_tokens), metric, old, new, change in comparisons:
+        flag = '  REGRESSION' if change > threshold else ''
+        lines.append(f"{workload:<10} {size:>8} {engine:<8} {metric:<12} {format_value(metric, old):>10} -> "
+                     f"{format_value(metric, new):>10} {change:>+8.1%}{flag}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Benchmark the lexer, parser and interpreter.")
+    arg_parser.add_argument('--workloads', nargs='+', choices=sorted(GENERATORS), default=list(GENERATORS),
+                            help="workloads to run (default: all)")
+    arg_parser.add_argument('--size', type=int, help="statements per workload (default: a size per workload)")
+    arg_parser.add_argument('--engine', choices=sorted(ENGINES), default=DEFAULT_ENGINE,
+                            help="engine used for the interpret phase (default: %(default)s)")
+    arg_parser.add_argument('--compact-tokens', action='store_true',
+                            help="lex into a TokenArray instead of a list of Tokens")
+    arg_parser.add_argument('--repeat', type=int, default=3, help="timed runs per workload, the best is kept")
+    arg_parser.add_argument('--seed', type=int, default=0, help="seed of the script generators")
+    arg_parser.add_argument('--output', help="write the results to this JSON file")
+    arg_parser.add_argument('--baseline', help="compare against results saved with --output")
+    arg_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                            help="relative slowdown counted as a regression (default: %(default)s)")
+    args = arg_parser.parse_args(argv)
+
+    results = []
+    for workload in args.workloads:
+        size = args.size if args.size is not None else DEFAULT_SIZES[workload]
+        results.append(benchmark(workload, size, args.engine, args.repeat, args.seed,
+                                 args.compact_tokens))
+    print(report(results))
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'python': platform.python_version(), 'results': results}, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)['results']
+        comparisons = compare(results, baseline)
+        print()
+        print(comparison_report(comparisons, args.threshold))
+        regressed = regressions(comparisons, args.threshold)
+        if regressed:
+            print(f"\n{len(regressed)} measurements regressed by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+import operator
+from array import array
+
+try:
+    import numpy
+except ImportError:  # Fall back to the standard library's array module
+    numpy = None
+
+
+class Array:
+    """Array value of the language: a fixed-length vector of floats.
+
+    Arithmetic (+ - * /) and comparisons with another array of the same
+    length or with a number work element-wise, so a whole array is processed
+    by one operation. Comparisons give 1.0 where they hold and 0.0 elsewhere.
+    The elements are stored in a NumPy float64 array when NumPy is installed
+    and in an ``array.array('d')`` otherwise; both behave the same, except
+    that sums may differ in the last digits.
+    """
+
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        # data is a float64 buffer of the backend in use, see from_values().
+        self.data = data
+
+    @classmethod
+    def from_values(cls, values):
+        """Build an array from numbers, as in an array literal."""
+        values = list(values)
+        for value in values:
+            if not isinstance(value, (int, float)):
+                raise Exception(f"Array elements must be numbers, not {type(value).__name__}")
+        if numpy is not None:
+            return cls(numpy.array(values, dtype=numpy.float64))
+        return cls(array('d', values))
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def tolist(self):
+        return self.data.tolist()
+
+    def __str__(self):
+        return str(self.tolist())
+
+    def __repr__(self):
+        return f'Array({self.tolist()})'
+
+    def __bool__(self):
+        raise Exception("The truth value of an array is ambiguous, use any() or all()")
+
+    def elementwise(self, other, operation, reflected=False):
+        if isinstance(other, Array):
+            if len(other) != len(self):
+                raise Exception(f"Array lengths differ: {len(self)} and {len(other)}")
+            other = other.data
+        elif not isinstance(other, (int, float)):
+            return NotImplemented
+        left, right = (other, self.data) if reflected else (self.data, other)
+
+        if numpy is not None:
+            if operation is operator.truediv and numpy.any(numpy.asarray(right) == 0):
+                raise ZeroDivisionError("float division by zero")
+            with numpy.errstate(all='ignore'):
+                result = operation(left, right)
+            return Array(numpy.asarray(result, dtype=numpy.float64))
+
+        # array.array has no arithmetic of its own, so apply the operation to
+        # the elements pairwise; a number operand is repeated.
+        lefts = left if isinstance(left, array) else [left] * len(self)
+        rights = right if isinstance(right, array) else [right] * len(self)
+        return Array(array('d', map(operation, lefts, rights)))
+
+    def __add__(self, other):
+        return self.elementwise(other, operator.add)
+
+    def __radd__(self, other):
+        return self.elementwise(other, operator.add, reflected=True)
+
+    def __sub__(self, other):
+        return self.elementwise(other, operator.sub)
+
+    def __rsub__(self, other):
+        return self.elementwise(other, operator.sub, reflected=True)
+
+    def __mul__(self, other):
+        return self.elementwise(other, operator.mul)
+
+    def __rmul__(self, other):
+        return self.elementwise(other, operator.mul, reflected=True)
+
+    def __truediv__(self, other):
+        return self.elementwise(other, operator.truediv)
+
+    def __rtruediv__(self, other):
+        return self.elementwise(other, operator.truediv, reflected=True)
+
+    # Python swaps the operands of reflected comparisons itself, so 1 < a
+    # calls a.__gt__(1).
+    def __eq__(self, other):
+        return self.elementwise(other, operator.eq)
+
+    def __ne__(self, other):
+        return self.elementwise(other, operator.ne)
+
+    def __lt__(self, other):
+        return self.elementwise(other, operator.lt)
+
+    def __gt__(self, other):
+        return self.elementwise(other, operator.gt)
+
+    def __le__(self, other):
+        return self.elementwise(other, operator.le)
+
+    def __ge__(self, other):
+        return self.elementwise(other, operator.ge)
+
+    __hash__ = None
+
+
+def expect_array(name, value):
+    if not isinstance(value, Array):
+        raise Exception(f"{name}() expects an array, not {type(value).__name__}")
+    return value
+
+
+def array_sum(values):
+    values = expect_array('sum', values)
+    if numpy is not None:
+        return float(values.data.sum())
+    return sum(values.data, 0.0)
+
+
+def array_min(values):
+    values = expect_array('min', values)
+    if not len(values):
+        raise Exception("min() of an empty array")
+    return float(values.data.min()) if numpy is not None else min(values.data)
+
+
+def array_max(values):
+    values = expect_array('max', values)
+    if not len(values):
+        raise Exception("max() of an empty array")
+    return float(values.data.max()) if numpy is not None else max(values.data)
+
+
+def array_len(values):
+    return len(expect_array('len', values))
+
+
+def array_any(values):
+    values = expect_array('any', values)
+    return bool(numpy.any(values.data)) if numpy is not None else any(values.data)
+
+
+def array_all(values):
+    values = expect_array('all', values)
+    return bool(numpy.all(values.data)) if numpy is not None else all(values.data)
+
+
+# Functions callable from the language, by name.
+BUILTINS = {
+    'sum': array_sum,
+    'min': array_min,
+    'max': array_max,
+    'len': array_len,
+    'any': array_any,
+    'all': array_all,
+}
+
+
+def argument_count_error(name, count):
+    """Return the error message for calling builtin name with count arguments, or None."""
+    # Every builtin takes a single array.
+    return f"{name}() takes 1 argument, not {count}" if count != 1 else None
+
+
+def call_builtin(name, arguments):
+    if name not in BUILTINS:
+        raise Exception(f"Unknown function: {name}")
+    error = argument_count_error(name, len(arguments))
+    if error:
+        raise Exception(error)
+    return BUILTINS[name](*arguments)
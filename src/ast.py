@@ -1,46 +1,108 @@
+# Nodes use __slots__ so they carry no per-instance __dict__; large programs
+# are dominated by the size of these objects.
+
+
 class ASTNode:
-    pass
+    # Source position of the node's token, or None for nodes made up by the
+    # optimizer or built by hand.
+    __slots__ = ('line', 'column')
 
 
 class BinaryOperation(ASTNode):
-    def __init__(self, left, operator, right):
+    __slots__ = ('left', 'operator', 'right', 'operand_types')
+
+    def __init__(self, left, operator, right, line=None, column=None):
         self.left = left
         self.operator = operator
         self.right = right
+        # Filled in by the type checker when both operand types are known.
+        self.operand_types = None
+        self.line = line
+        self.column = column
 
 
 class Number(ASTNode):
-    def __init__(self, value):
+    __slots__ = ('value',)
+
+    def __init__(self, value, line=None, column=None):
         self.value = value
+        self.line = line
+        self.column = column
 
 class String(ASTNode):
-    def __init__(self, value):
+    __slots__ = ('value',)
+
+    def __init__(self, value, line=None, column=None):
         self.value = value
+        self.line = line
+        self.column = column
+
+
+class ArrayLiteral(ASTNode):
+    __slots__ = ('elements',)
+
+    def __init__(self, elements, line=None, column=None):
+        self.elements = elements
+        self.line = line
+        self.column = column
+
+
+class Call(ASTNode):
+    __slots__ = ('name', 'arguments')
+
+    def __init__(self, name, arguments, line=None, column=None):
+        self.name = name
+        self.arguments = arguments
+        self.line = line
+        self.column = column
 
 
 class Variable(ASTNode):
-    def __init__(self, name):
+    __slots__ = ('name', 'slot', 'may_be_unbound')
+
+    def __init__(self, name, slot=None, line=None, column=None):
         self.name = name
+        # Filled in by the resolver.
+        self.slot = slot
+        self.may_be_unbound = True
+        self.line = line
+        self.column = column
 
 
 class AssignmentStatement(ASTNode):
-    def __init__(self, variable, value):
+    __slots__ = ('variable', 'value')
+
+    def __init__(self, variable, value, line=None, column=None):
         self.variable = variable
         self.value = value
+        self.line = line
+        self.column = column
 
 
 class PrintStatement(ASTNode):
-    def __init__(self, value):
+    __slots__ = ('value',)
+
+    def __init__(self, value, line=None, column=None):
         self.value = value
+        self.line = line
+        self.column = column
 
 
 class IfStatement(ASTNode):
-    def __init__(self, condition, true_block, false_block=None):
+    __slots__ = ('condition', 'true_block', 'false_block')
+
+    def __init__(self, condition, true_block, false_block=None, line=None, column=None):
         self.condition = condition
         self.true_block = true_block
         self.false_block = false_block
+        self.line = line
+        self.column = column
 
 
 class Block(ASTNode):
-    def __init__(self, statements):
+    __slots__ = ('statements',)
+
+    def __init__(self, statements, line=None, column=None):
         self.statements = statements
+        self.line = line
+        self.column = column
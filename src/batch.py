@@ -0,0 +1,150 @@
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.cache import DEFAULT_MAX_SIZE, ProgramCache
+from src.engines import DEFAULT_ENGINE, get_engine
+from src.execute import error_message, run_file
+from src.optimizer import DEFAULT_OPT_LEVEL
+from src.output import BufferedSink
+
+SCRIPT_SUFFIX = '.scl'
+
+# Settings of the batch this worker process runs scripts for, set once by
+# init_worker() so that they are not pickled with every script.
+worker_settings = None
+
+
+class ScriptResult:
+    """Captured output and outcome of one script run by the batch runner."""
+
+    def __init__(self, filename, output, error=None, elapsed=0.0):
+        self.filename = filename
+        self.output = output
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def failed(self):
+        return self.error is not None
+
+
+class BatchSettings:
+    def __init__(self, engine=DEFAULT_ENGINE, opt_level=DEFAULT_OPT_LEVEL, stream=False, use_mmap=False,
+                 cache_dir=None, cache_max_size=DEFAULT_MAX_SIZE, typecheck=False, limits=None):
+        get_engine(engine)  # Fail early on unknown engines
+        self.engine = engine
+        self.opt_level = opt_level
+        self.stream = stream
+        self.use_mmap = use_mmap
+        self.cache = ProgramCache(cache_dir, cache_max_size) if cache_dir and not stream else None
+        self.typecheck = typecheck
+        self.limits = limits  # Restarted for every script
+
+
+def collect_scripts(paths):
+    """Expand directories to the .scl files below them, in sorted order.
+
+    Files named explicitly are kept in the order given, whatever their suffix.
+    """
+    filenames = []
+    for path in paths:
+        if not os.path.isdir(path):
+            filenames.append(path)
+            continue
+        found = []
+        for directory, subdirectories, files in os.walk(path):
+            subdirectories.sort()
+            found.extend(os.path.join(directory, name) for name in files if name.endswith(SCRIPT_SUFFIX))
+        filenames.extend(sorted(found))
+    return filenames
+
+
+def init_worker(settings):
+    global worker_settings
+    worker_settings = settings
+
+
+def run_script(filename):
+    """Run filename with the worker's settings and capture what it prints.
+
+    An error ends the script's output with the same message execute.py
+    prints for a single file.
+    """
+    settings = worker_settings
+    buffer = io.StringIO()
+    output = BufferedSink(buffer)
+    error = None
+    start = time.perf_counter()
+    try:
+        run_file(filename, output, settings.engine, settings.opt_level, settings.stream, settings.use_mmap,
+                 settings.cache, typecheck=settings.typecheck, limits=settings.limits)
+    except Exception as e:
+        error = error_message(filename, e)
+    elapsed = time.perf_counter() - start
+    output.flush()
+    if error is not None:
+        buffer.write(error + '\n')
+    return ScriptResult(filename, buffer.getvalue(), error, elapsed)
+
+
+def iter_batch(filenames, settings, jobs=1, chunksize=None):
+    """Yield a ScriptResult for every file, in the order of filenames.
+
+    With more than one job the scripts are spread over a pool of worker
+    processes. Each worker imports the interpreter once and runs many
+    scripts, sent in chunks to keep the inter-process traffic down.
+    """
+    if jobs == 1:
+        init_worker(settings)
+        for filename in filenames:
+            yield run_script(filename)
+        return
+
+    if chunksize is None:
+        # A few chunks per worker keeps them balanced without a round trip per script.
+        chunksize = max(1, min(256, len(filenames) // (jobs * 4)))
+    with ProcessPoolExecutor(jobs, initializer=init_worker, initargs=(settings,)) as executor:
+        yield from executor.map(run_script, filenames, chunksize=chunksize)
+
+
+def summary(results, elapsed, slowest=5):
+    """Return a report of the timings and failures of a batch run."""
+    failures = [result for result in results if result.failed]
+    total = sum(result.elapsed for result in results)
+    lines = [f"Ran {len(results)} scripts in {elapsed:.3f}s ({total:.3f}s in scripts), {len(failures)} failed"]
+    if results:
+        lines.append("Slowest scripts:")
+        for result in sorted(results, key=lambda result: result.elapsed, reverse=True)[:slowest]:
+            lines.append(f"  {result.elapsed:.4f}s  {result.filename}")
+    if failures:
+        lines.append("Failures:")
+        for result in failures:
+            lines.append(f"  {result.filename}: {result.error}")
+    return '\n'.join(lines)
+
+
+def run_batch(paths, jobs=1, settings=None, stdout=None, report=None):
+    """Run every script in paths and write their output in order.
+
+    Each script's output is written to stdout as one piece once it has
+    finished, and the summary goes to report (stderr by default). Returns
+    the list of ScriptResults.
+    """
+    if settings is None:
+        settings = BatchSettings()
+    if jobs is None or jobs < 1:
+        jobs = os.cpu_count() or 1
+    stdout = stdout if stdout is not None else sys.stdout
+    report = report if report is not None else sys.stderr
+
+    start = time.perf_counter()
+    results = []
+    for result in iter_batch(collect_scripts(paths), settings, jobs):
+        stdout.write(result.output)
+        results.append(result)
+    stdout.flush()
+    print(summary(results, time.perf_counter() - start), file=report)
+    return results
@@ -0,0 +1,137 @@
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+
+# Bump whenever the AST classes or the optimizer change, so that stale cache
+# entries are never loaded.
+CACHE_VERSION = 4
+
+MAGIC = b'SCLC%d\n' % CACHE_VERSION
+SUFFIX = '.sclc'
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+
+class ProgramCache:
+    """On-disk cache of parsed and optimized programs, like __pycache__.
+
+    Entries are keyed by a hash of the source, the optimization level, the
+    lexing mode, the cache version and the Python implementation, and hold
+    a pickled (ast, optimizer stats) pair.
+
+    Writes go to a temporary file that is atomically renamed into place, so
+    concurrent readers only ever see complete entries; an unreadable entry is
+    treated as a miss. The total size is capped: once it is exceeded the least
+    recently used entries are evicted, where a hit refreshes an entry's
+    modification time.
+    """
+
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, source, opt_level, use_mmap=False):
+        """Return the cache key for source bytes (or any bytes-like buffer).
+
+        use_mmap tells programs lexed from bytes apart, since their columns
+        are byte offsets instead of character offsets.
+        """
+        digest = hashlib.sha256()
+        mode = 'bytes' if use_mmap else 'text'
+        digest.update(f'{CACHE_VERSION}:{sys.implementation.cache_tag}:{opt_level}:{mode}:'.encode())
+        digest.update(source)
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def load(self, key):
+        """Return the cached program for key, or None on a miss."""
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as file:
+                if file.read(len(MAGIC)) != MAGIC:
+                    raise ValueError(f"Bad cache entry: {path}")
+                program = pickle.load(file)
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            # A corrupt entry or one written by an incompatible version.
+            self.misses += 1
+            self.discard(path)
+            return None
+        self.hits += 1
+        return program
+
+    def store(self, key, program):
+        """Write program under key; return False if it could not be cached.
+
+        A full or unwritable cache directory only means the program is not
+        cached, so OSErrors are not raised.
+        """
+        try:
+            data = MAGIC + pickle.dumps(program, protocol=pickle.HIGHEST_PROTOCOL)
+        except RecursionError:
+            return False  # Too deeply nested to pickle
+
+        try:
+            descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        except OSError:
+            return False
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                file.write(data)
+            os.replace(temporary, self.path(key))
+        except OSError:
+            self.discard(temporary)
+            return False
+        except BaseException:
+            self.discard(temporary)
+            raise
+        try:
+            self.evict()
+        except OSError:
+            pass  # The entry was stored; eviction is retried on the next store
+        return True
+
+    def entries(self):
+        """Return (mtime, size, path) for every entry, oldest first."""
+        entries = []
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if not entry.name.endswith(SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # Evicted by another process
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        return entries
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits max_size."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            self.discard(path)
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            self.discard(path)
+
+    @staticmethod
+    def discard(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # Already gone, or the directory is not writable
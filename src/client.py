@@ -0,0 +1,91 @@
+"""Run a script on a running src.server, with the options of execute.py.
+
+Only the standard library is imported, so the client starts about as fast
+as Python itself and the server does the rest.
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+
+# Same as src.server; tempfile is not imported for this, it takes longer than the rest.
+DEFAULT_SOCKET = os.path.join(os.environ.get('TMPDIR', '/tmp'), 'scl-server.sock')
+
+
+def connect(socket_path=DEFAULT_SOCKET, host='127.0.0.1', port=None):
+    if port is not None:
+        return socket.create_connection((host, port))
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.connect(socket_path)
+    return connection
+
+
+def run(request, output=None, socket_path=DEFAULT_SOCKET, host='127.0.0.1', port=None):
+    """Send request to the server and write the script's output as it arrives.
+
+    Returns (exit status, error message or None).
+    """
+    if output is None:
+        output = sys.stdout
+    with connect(socket_path, host, port) as connection:
+        connection.sendall(json.dumps(request).encode() + b'\n')
+        with connection.makefile('r', encoding='utf-8') as responses:
+            for line in responses:
+                response = json.loads(line)
+                if 'output' in response:
+                    output.write(response['output'])
+                else:
+                    return response['exit'], response['error']
+    raise Exception("The server closed the connection before the script finished")
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Run a source file on a running server.")
+    arg_parser.add_argument('source_file', help="path to a .scl script, or - to read the script from stdin")
+    arg_parser.add_argument('--engine', help="execution engine (default: the server's default)")
+    arg_parser.add_argument('-O', '--opt-level', type=int, help="AST optimization level (default: the server's default)")
+    arg_parser.add_argument('--stream', action='store_true',
+                            help="parse and execute one top-level statement at a time")
+    arg_parser.add_argument('--mmap', action='store_true',
+                            help="memory-map the file and lex its bytes without decoding it up front")
+    arg_parser.add_argument('--typecheck', action='store_true',
+                            help="infer types and refuse to run a program with type errors")
+    # Same as execute.add_limit_arguments(); the server keeps its own limits if they are lower.
+    arg_parser.add_argument('--max-statements', type=int, metavar='N',
+                            help="stop the script after it has executed N statements")
+    arg_parser.add_argument('--max-output-bytes', type=int, metavar='N',
+                            help="stop the script if it prints more than N bytes")
+    arg_parser.add_argument('--max-variables', type=int, metavar='N',
+                            help="stop the script if it assigns more than N variables")
+    arg_parser.add_argument('--timeout', type=float, metavar='SECONDS',
+                            help="stop the script if it runs for longer than SECONDS, parsing included")
+    arg_parser.add_argument('--socket', default=DEFAULT_SOCKET,
+                            help="Unix socket of the server (default: %(default)s)")
+    arg_parser.add_argument('--host', default='127.0.0.1', help="host of the server with --port")
+    arg_parser.add_argument('--port', type=int, help="connect over TCP instead of a Unix socket")
+    args = arg_parser.parse_args(argv)
+
+    request = {'stream': args.stream, 'mmap': args.mmap, 'typecheck': args.typecheck}
+    if args.source_file == '-':
+        request['source'] = sys.stdin.read()
+    else:
+        # The server has its own working directory.
+        request['path'] = os.path.abspath(args.source_file)
+    if args.engine is not None:
+        request['engine'] = args.engine
+    if args.opt_level is not None:
+        request['opt_level'] = args.opt_level
+    limits = {name: getattr(args, name) for name in ('max_statements', 'max_output_bytes', 'max_variables', 'timeout')}
+    if any(cap is not None for cap in limits.values()):
+        request['limits'] = limits
+
+    status, error = run(request, socket_path=args.socket, host=args.host, port=args.port)
+    sys.stdout.flush()
+    if error is not None:
+        print(error)
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
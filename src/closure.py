@@ -0,0 +1,209 @@
+import operator
+
+from src.arrays import Array, BUILTINS
+from src.ast import Block, PrintStatement, AssignmentStatement, IfStatement, BinaryOperation, Number, String, Variable, \
+    ArrayLiteral, Call
+from src.compiler import OPERATORS
+from src.interpreter import Interpreter
+from src.limits import count_variables
+from src.resolver import Resolver, UNBOUND, load_slots, store_slots
+from src.vm import BINARY_OPERATIONS
+
+OPERATIONS = dict(zip(OPERATORS, BINARY_OPERATIONS))
+
+# && and || on two bools, as C functions instead of the generic lambdas.
+BOOLEAN_OPERATIONS = {'&&': operator.and_, '||': operator.or_}
+
+
+class ClosureCompiler:
+    """Turn an AST into nested Python closures.
+
+    Every node becomes a function of the slot list (see Resolver) with its
+    operator and children already bound, so running the program is a single
+    call of the root closure with no per-node dispatch left. Print statements
+    are bound to the given output sink.
+
+    With limits, blocks count every statement down before running it.
+    variables is then a function of the slot list that returns the number
+    of variables bound. Without limits, blocks are compiled without checks.
+    """
+
+    def __init__(self, output, limits=None, variables=None):
+        self.resolver = Resolver()
+        self.output = output
+        self.limits = limits
+        self.variables = variables
+
+    def compile(self, ast):
+        self.resolver.resolve(ast)
+        return self.visit_statement(ast)
+
+    def visit_statement(self, node):
+        if isinstance(node, Block):
+            return self.visit_block(node)
+        elif isinstance(node, AssignmentStatement):
+            return self.visit_assignment(node)
+        elif isinstance(node, PrintStatement):
+            value = self.visit_expression(node.value)
+            write = self.output.write
+
+            def print_statement(slots):
+                write(value(slots))
+            return print_statement
+        elif isinstance(node, IfStatement):
+            return self.visit_if(node)
+        else:
+            # Bare expressions are evaluated for their errors and discarded.
+            return self.visit_expression(node)
+
+    def visit_block(self, block):
+        statements = tuple(self.visit_statement(statement) for statement in block.statements)
+        if self.limits is not None:
+            return self.limited_block(statements)
+        if len(statements) == 1:
+            return statements[0]
+
+        def block_statement(slots):
+            for statement in statements:
+                statement(slots)
+        return block_statement
+
+    def limited_block(self, statements):
+        limits, variables = self.limits, self.variables
+
+        def block_statement(slots):
+            for statement in statements:
+                limits.countdown -= 1
+                if limits.countdown < 0:
+                    limits.check(variables(slots))
+                statement(slots)
+        return block_statement
+
+    def visit_assignment(self, assignment):
+        slot = assignment.variable.slot
+        value_node = assignment.value
+        if isinstance(value_node, (Number, String)):
+            constant = value_node.value
+
+            def assign_constant(slots):
+                slots[slot] = constant
+            return assign_constant
+
+        value = self.visit_expression(value_node)
+
+        def assign(slots):
+            slots[slot] = value(slots)
+        return assign
+
+    def visit_if(self, if_stmt):
+        condition = self.visit_expression(if_stmt.condition)
+        true_block = self.visit_statement(if_stmt.true_block)
+        if not if_stmt.false_block:
+            def if_statement(slots):
+                if condition(slots):
+                    true_block(slots)
+            return if_statement
+
+        false_block = self.visit_statement(if_stmt.false_block)
+
+        def if_else_statement(slots):
+            if condition(slots):
+                true_block(slots)
+            else:
+                false_block(slots)
+        return if_else_statement
+
+    def visit_expression(self, node):
+        if isinstance(node, BinaryOperation):
+            return self.visit_binary_operation(node)
+        elif isinstance(node, (Number, String)):
+            constant = node.value
+            return lambda slots: constant
+        elif isinstance(node, Variable):
+            return self.visit_variable(node)
+        elif isinstance(node, ArrayLiteral):
+            elements = tuple(self.visit_expression(element) for element in node.elements)
+            from_values = Array.from_values
+            return lambda slots: from_values([element(slots) for element in elements])
+        elif isinstance(node, Call):
+            return self.visit_call(node)
+        else:
+            raise Exception(f"Unknown node type: {type(node)}")
+
+    def visit_variable(self, variable):
+        name, slot = variable.name, variable.slot
+        if not variable.may_be_unbound:
+            return lambda slots: slots[slot]
+
+        def load_checked(slots):
+            value = slots[slot]
+            if value is UNBOUND:
+                raise KeyError(name)
+            return value
+        return load_checked
+
+    def visit_call(self, call):
+        if call.name not in BUILTINS:
+            raise Exception(f"Unknown function: {call.name}")
+        function = BUILTINS[call.name]
+        arguments = tuple(self.visit_expression(argument) for argument in call.arguments)
+        if len(arguments) == 1:
+            argument = arguments[0]
+            return lambda slots: function(argument(slots))
+        return lambda slots: function(*[argument(slots) for argument in arguments])
+
+    def visit_binary_operation(self, bin_op):
+        if bin_op.operator not in OPERATIONS:
+            raise Exception(f"Unknown operator: {bin_op.operator}")
+        operation = OPERATIONS[bin_op.operator]
+        if bin_op.operand_types == (bool, bool) and bin_op.operator in BOOLEAN_OPERATIONS:
+            # Proved by the type checker; see src/typecheck.py.
+            operation = BOOLEAN_OPERATIONS[bin_op.operator]
+        left_node, right_node = bin_op.left, bin_op.right
+
+        # Fold literal operands and variables that are known to be assigned
+        # straight into the closure; these shapes cover most expressions and
+        # save a call per operand.
+        if is_bound(left_node) and isinstance(right_node, (Number, String)):
+            slot, constant = left_node.slot, right_node.value
+            return lambda slots: operation(slots[slot], constant)
+        if is_bound(left_node) and is_bound(right_node):
+            left_slot, right_slot = left_node.slot, right_node.slot
+            return lambda slots: operation(slots[left_slot], slots[right_slot])
+        if isinstance(right_node, (Number, String)):
+            left, constant = self.visit_expression(left_node), right_node.value
+            return lambda slots: operation(left(slots), constant)
+
+        left = self.visit_expression(left_node)
+        right = self.visit_expression(right_node)
+        return lambda slots: operation(left(slots), right(slots))
+
+
+def is_bound(node):
+    return isinstance(node, Variable) and not node.may_be_unbound
+
+
+class ClosureInterpreter(Interpreter):
+    """Drop-in replacement for Interpreter that runs pre-bound closures."""
+
+    def __init__(self, ast, output=None, limits=None):
+        super().__init__(ast, output, limits)
+        self.program = None
+        self.program_output = None
+        self.names = None
+
+    def interpret(self):
+        # The closures are bound to the output sink, so recompile if it changed.
+        if self.program is None or self.program_output is not self.output:
+            compiler = ClosureCompiler(self.output, self.limits, self.count_variables)
+            self.program = compiler.compile(self.ast)
+            self.program_output = self.output
+            self.names = compiler.resolver.names
+        slots = load_slots(self.names, self.environment)
+        try:
+            self.program(slots)
+        finally:
+            store_slots(self.names, slots, self.environment)
+
+    def count_variables(self, slots):
+        return count_variables(self.names, slots, self.environment)
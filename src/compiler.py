@@ -0,0 +1,163 @@
+from src.arrays import BUILTINS
+from src.ast import Block, PrintStatement, AssignmentStatement, IfStatement, BinaryOperation, Number, String, Variable, \
+    ArrayLiteral, Call
+from src.resolver import Resolver
+
+# Opcodes. Every instruction is encoded as an (opcode, argument) pair of ints
+# laid out flat in CodeObject.instructions; opcodes that take no argument use 0.
+# LOAD_NAME, LOAD_FAST and STORE_NAME take the variable's slot, which is also
+# its index in the name table. LOAD_FAST is used for reads the resolver has
+# proven to follow an assignment and skips the unbound check. BUILD_ARRAY and
+# CALL_FUNCTION take the number of values they pop; CALL_FUNCTION pops the
+# arguments and then the function, which LOAD_CONST pushed. CHECK_LIMITS counts
+# the statement it starts against the limits, see src/limits.py; it is only
+# emitted when compiling for a run with limits.
+LOAD_CONST = 0
+LOAD_NAME = 1
+STORE_NAME = 2
+BINARY_OP = 3
+PRINT = 4
+POP_TOP = 5
+JUMP = 6
+POP_JUMP_IF_FALSE = 7
+LOAD_FAST = 8
+BUILD_ARRAY = 9
+CALL_FUNCTION = 10
+CHECK_LIMITS = 11
+
+OPCODE_NAMES = {
+    LOAD_CONST: 'LOAD_CONST',
+    LOAD_NAME: 'LOAD_NAME',
+    STORE_NAME: 'STORE_NAME',
+    BINARY_OP: 'BINARY_OP',
+    PRINT: 'PRINT',
+    POP_TOP: 'POP_TOP',
+    JUMP: 'JUMP',
+    POP_JUMP_IF_FALSE: 'POP_JUMP_IF_FALSE',
+    LOAD_FAST: 'LOAD_FAST',
+    BUILD_ARRAY: 'BUILD_ARRAY',
+    CALL_FUNCTION: 'CALL_FUNCTION',
+    CHECK_LIMITS: 'CHECK_LIMITS',
+}
+
+BUILTIN_NAMES = {function: name for name, function in BUILTINS.items()}
+
+# Operators in the order used as the BINARY_OP argument.
+OPERATORS = ['+', '-', '*', '/', '==', '!=', '<', '>', '<=', '>=', '&&', '||']
+
+
+class CodeObject:
+    def __init__(self, instructions, constants, names):
+        self.instructions = instructions
+        self.constants = constants
+        self.names = names
+
+    def disassemble(self):
+        """Return a human readable listing of the instructions."""
+        lines = []
+        for pc in range(0, len(self.instructions), 2):
+            opcode, arg = self.instructions[pc], self.instructions[pc + 1]
+            name = OPCODE_NAMES[opcode]
+            if opcode == LOAD_CONST:
+                constant = self.constants[arg]
+                detail = f'<function {BUILTIN_NAMES[constant]}>' if callable(constant) else repr(constant)
+            elif opcode in (LOAD_NAME, LOAD_FAST, STORE_NAME):
+                detail = self.names[arg]
+            elif opcode == BINARY_OP:
+                detail = OPERATORS[arg]
+            elif opcode in (JUMP, POP_JUMP_IF_FALSE):
+                detail = f'-> {arg}'
+            elif opcode in (BUILD_ARRAY, CALL_FUNCTION):
+                detail = str(arg)
+            else:
+                detail = ''
+            lines.append(f'{pc:>6} {name:<18} {detail}'.rstrip())
+        return '\n'.join(lines)
+
+
+class Compiler:
+    """Compile an AST into a flat CodeObject for the VM."""
+
+    def __init__(self, check_limits=False):
+        self.check_limits = check_limits
+        self.instructions = []
+        self.constants = []
+        self.constant_indices = {}
+        self.resolver = Resolver()
+
+    def compile(self, ast):
+        self.resolver.resolve(ast)
+        self.visit_statement(ast)
+        return CodeObject(self.instructions, self.constants, self.resolver.names)
+
+    def emit(self, opcode, arg=0):
+        """Append an instruction and return the position of its argument."""
+        self.instructions.extend((opcode, arg))
+        return len(self.instructions) - 1
+
+    def patch(self, position, target):
+        self.instructions[position] = target
+
+    def constant(self, value):
+        # Key on the type too so that 1, 1.0 and True get separate entries.
+        key = (type(value), value)
+        if key not in self.constant_indices:
+            self.constant_indices[key] = len(self.constants)
+            self.constants.append(value)
+        return self.constant_indices[key]
+
+    def visit_statement(self, node):
+        if isinstance(node, Block):
+            for statement in node.statements:
+                if self.check_limits:
+                    self.emit(CHECK_LIMITS)
+                self.visit_statement(statement)
+        elif isinstance(node, AssignmentStatement):
+            self.visit_expression(node.value)
+            self.emit(STORE_NAME, node.variable.slot)
+        elif isinstance(node, PrintStatement):
+            self.visit_expression(node.value)
+            self.emit(PRINT)
+        elif isinstance(node, IfStatement):
+            self.visit_if(node)
+        else:
+            # Bare expressions are evaluated for their errors and discarded.
+            self.visit_expression(node)
+            self.emit(POP_TOP)
+
+    def visit_if(self, if_stmt):
+        self.visit_expression(if_stmt.condition)
+        jump_to_else = self.emit(POP_JUMP_IF_FALSE)
+        self.visit_statement(if_stmt.true_block)
+        if if_stmt.false_block:
+            jump_to_end = self.emit(JUMP)
+            self.patch(jump_to_else, len(self.instructions))
+            self.visit_statement(if_stmt.false_block)
+            self.patch(jump_to_end, len(self.instructions))
+        else:
+            self.patch(jump_to_else, len(self.instructions))
+
+    def visit_expression(self, node):
+        if isinstance(node, BinaryOperation):
+            if node.operator not in OPERATORS:
+                raise Exception(f"Unknown operator: {node.operator}")
+            self.visit_expression(node.left)
+            self.visit_expression(node.right)
+            self.emit(BINARY_OP, OPERATORS.index(node.operator))
+        elif isinstance(node, (Number, String)):
+            self.emit(LOAD_CONST, self.constant(node.value))
+        elif isinstance(node, Variable):
+            self.emit(LOAD_NAME if node.may_be_unbound else LOAD_FAST, node.slot)
+        elif isinstance(node, ArrayLiteral):
+            for element in node.elements:
+                self.visit_expression(element)
+            self.emit(BUILD_ARRAY, len(node.elements))
+        elif isinstance(node, Call):
+            if node.name not in BUILTINS:
+                raise Exception(f"Unknown function: {node.name}")
+            self.emit(LOAD_CONST, self.constant(BUILTINS[node.name]))
+            for argument in node.arguments:
+                self.visit_expression(argument)
+            self.emit(CALL_FUNCTION, len(node.arguments))
+        else:
+            raise Exception(f"Unknown node type: {type(node)}")
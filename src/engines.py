@@ -0,0 +1,35 @@
+from src.closure import ClosureInterpreter
+from src.flat_ast import FlatInterpreter
+from src.interpreter import Interpreter
+from src.iterative import IterativeInterpreter
+from src.quickening import QuickeningInterpreter
+from src.transpiler import TranspiledInterpreter
+from src.vm import VMInterpreter
+
+# Every engine takes the parsed AST, exposes an ``environment`` dict and runs
+# the program from ``interpret()``.
+ENGINES = {
+    'tree': Interpreter,
+    'vm': VMInterpreter,
+    'closure': ClosureInterpreter,
+    'python': TranspiledInterpreter,
+    'flat': FlatInterpreter,
+    'iterative': IterativeInterpreter,
+}
+
+# Engines that only pay off when one program is interpreted many times
+# through the API: quick runs a script once slower than tree. They are not
+# offered on the command line or by the server.
+API_ENGINES = {
+    'quick': QuickeningInterpreter,
+}
+
+ALL_ENGINES = {**ENGINES, **API_ENGINES}
+
+DEFAULT_ENGINE = 'tree'
+
+
+def get_engine(name):
+    if name not in ENGINES:
+        raise Exception(f"Unknown engine: {name}")
+    return ENGINES[name]
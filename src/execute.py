@@ -1,35 +1,253 @@
+import argparse
+import contextlib
+import functools
+import io
+import mmap
+import os
 import sys
+
+from src.ast import Block
+from src.cache import DEFAULT_MAX_SIZE, ProgramCache
+from src.engines import ENGINES, DEFAULT_ENGINE, get_engine
 from src.lexer import Lexer
+from src.limits import Limits
+from src.optimizer import OPT_LEVELS, DEFAULT_OPT_LEVEL, OptimizationStats, optimize
+from src.output import BufferedSink, StdoutSink
 from src.parser import Parser
-from src.interpreter import Interpreter
+from src.profiler import Profile, ProfilingInterpreter
+from src.typecheck import TypeCheckError, TypeChecker, check
 
 
-def run_source_file(filename):
-    try:
+@contextlib.contextmanager
+def open_source(filename, stream=False, use_mmap=False):
+    """Open filename and yield its contents in the form the lexer should read.
+
+    That is the whole text, the open file for streaming line by line, or a
+    read-only memory map of the raw bytes.
+    """
+    if use_mmap:
+        with open(filename, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                yield b''  # Empty files can't be mapped
+            else:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    yield mapped
+    else:
         with open(filename, 'r') as file:
-            code = file.read()
+            yield file if stream else file.read()
 
-        # Tokenize the code
-        lexer = Lexer(code)
-        tokens = lexer.tokenize()
 
-        # Parse the tokens
+def parse_source(source, opt_level=DEFAULT_OPT_LEVEL):
+    """Lex, parse and optimize source; return (ast, optimizer stats)."""
+    # Tokenize the code lazily and parse the tokens as they are produced
+    lexer = Lexer(source)
+    tokens = lexer.iter_tokens()
+    try:
         parser = Parser(tokens)
         ast = parser.parse()
+    finally:
+        tokens.close()  # Release the source buffer, even on syntax errors
+
+    # Optimize the AST
+    return optimize(ast, opt_level)
+
+
+def load_program(filename, opt_level=DEFAULT_OPT_LEVEL, use_mmap=False, cache=None):
+    """Return (ast, optimizer stats) for filename.
+
+    With a ProgramCache, an unchanged file is loaded from the cache without
+    lexing or parsing it, and a changed one is stored after parsing.
+    """
+    if cache is None:
+        with open_source(filename, use_mmap=use_mmap) as source:
+            return parse_source(source, opt_level)
+
+    with open_source(filename, use_mmap=True) as data:
+        key = cache.key(data, opt_level, use_mmap)
+        program = cache.load(key)
+        if program is None:
+            # Decode the same way open() in text mode would.
+            source = data if use_mmap else io.TextIOWrapper(io.BytesIO(data)).read()
+            program = parse_source(source, opt_level)
+            cache.store(key, program)
+    return program
 
-        # Interpret the AST
-        interpreter = Interpreter(ast)
-        interpreter.interpret()
 
-    except FileNotFoundError:
-        print(f"Error: The file '{filename}' was not found.")
+def run_file(filename, output, engine=DEFAULT_ENGINE, opt_level=DEFAULT_OPT_LEVEL, stream=False, use_mmap=False,
+             cache=None, profile=None, typecheck=False, limits=None):
+    """Run one script, writing its prints to output; return the optimizer stats.
+
+    With a Profile, the script runs on the profiling tree-walking interpreter
+    whatever the engine. With typecheck, the program is type checked first
+    and a TypeCheckError stops it before anything runs. With Limits, they
+    are restarted here, so the time limit includes parsing, and a script
+    that goes over one is stopped with a LimitExceeded. Errors are raised to
+    the caller.
+    """
+    engine = get_engine(engine)
+    if profile is not None:
+        engine = functools.partial(ProfilingInterpreter, profile=profile)
+    if limits is not None:
+        limits.start()
+
+    if stream:
+        with open_source(filename, stream, use_mmap) as source:
+            return run_statements(source, engine, opt_level, output, typecheck, limits)
+
+    ast, stats = load_program(filename, opt_level, use_mmap, cache)
+    if typecheck:
+        check(ast)
+
+    # Interpret the AST
+    interpreter = engine(ast, output, limits=limits)
+    interpreter.interpret()
+    if limits is not None:
+        limits.check(len(interpreter.environment))  # Also catch what happened since the last check
+    return stats
+
+
+def error_message(filename, error):
+    """Return the message run_source_file prints for an exception."""
+    if isinstance(error, FileNotFoundError):
+        return f"Error: The file '{filename}' was not found."
+    return f"Error: {error}"
+
+
+def run_source_file(filename, engine=DEFAULT_ENGINE, opt_level=DEFAULT_OPT_LEVEL, opt_report=False, stream=False,
+                    use_mmap=False, cache_dir=None, cache_max_size=DEFAULT_MAX_SIZE, output=None, profile=False,
+                    profile_output=None, typecheck=False, limits=None):
+    # Printed values are buffered and written to stdout in large chunks,
+    # except when streaming, where each one should appear as soon as it is printed.
+    if output is None:
+        output = StdoutSink() if stream else BufferedSink()
+    profile = Profile() if profile or profile_output else None
+    try:
+        try:
+            cache = ProgramCache(cache_dir, cache_max_size) if cache_dir and not stream else None
+            stats = run_file(filename, output, engine, opt_level, stream, use_mmap, cache, profile, typecheck, limits)
+        finally:
+            # Emit everything printed so far before any error message.
+            output.flush()
+
+        if opt_report:
+            print(stats.report(), file=sys.stderr)
+
     except Exception as e:
-        print(f"Error: {e}")
+        print(error_message(filename, e))
+
+    # A profile is reported even when the script failed part way through.
+    if profile is not None:
+        print(profile.report(), file=sys.stderr)
+        if profile_output:
+            profile.write_collapsed_stacks(profile_output)
+
+
+def run_statements(source, engine, opt_level=DEFAULT_OPT_LEVEL, output=None, typecheck=False, limits=None):
+    """Execute a program one top-level statement at a time.
+
+    source is anything the Lexer accepts; an open file or an mmap is read
+    lazily. Each statement (an if statement counts as one, with its blocks)
+    is optimized and executed as soon as it has been parsed and is dropped
+    afterwards, so output starts immediately and memory use does not grow
+    with the length of the program. Printed values go to output (stdout by
+    default). Returns the accumulated optimizer stats.
+
+    With typecheck, each statement is type checked before it runs, knowing
+    the types the statements before it assigned. Limits apply to the
+    statements together.
+    """
+    environment = {}
+    total = OptimizationStats()
+    checker = TypeChecker() if typecheck else None
+    tokens = Lexer(source).iter_tokens()
+    try:
+        parser = Parser(tokens)
+        for statement in parser.iter_statements():
+            ast, stats = optimize(Block([statement]), opt_level)
+            total.add(stats)
+            if checker is not None and checker.check(ast):
+                raise TypeCheckError(checker.errors)
+            interpreter = engine(ast, output, limits=limits)
+            interpreter.environment = environment
+            interpreter.interpret()
+    finally:
+        tokens.close()
+    if limits is not None:
+        limits.check(len(environment))
+    return total
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Run a source file, or a batch of them.")
+    arg_parser.add_argument('source_files', nargs='+', metavar='source_file',
+                            help="path to a .scl script, or a directory of scripts to run as a batch")
+    arg_parser.add_argument('-j', '--jobs', type=int,
+                            help="run the scripts as a batch on this many worker processes (0: one per CPU)")
+    arg_parser.add_argument('--engine', choices=sorted(ENGINES), default=DEFAULT_ENGINE,
+                            help="execution engine (default: %(default)s)")
+    arg_parser.add_argument('-O', '--opt-level', type=int, choices=OPT_LEVELS, default=DEFAULT_OPT_LEVEL,
+                            help="AST optimization level (default: %(default)s)")
+    arg_parser.add_argument('--opt-report', action='store_true',
+                            help="print how many nodes the optimizer removed to stderr")
+    arg_parser.add_argument('--stream', action='store_true',
+                            help="parse and execute one top-level statement at a time")
+    arg_parser.add_argument('--mmap', action='store_true',
+                            help="memory-map the file and lex its bytes without decoding it up front")
+    arg_parser.add_argument('--cache-dir',
+                            help="cache parsed programs in this directory and reuse them while the source is unchanged")
+    arg_parser.add_argument('--cache-max-size', type=int, default=DEFAULT_MAX_SIZE // (1024 * 1024),
+                            help="size cap of the cache directory in MB (default: %(default)s)")
+    arg_parser.add_argument('--profile', action='store_true',
+                            help="run on the profiling tree-walking interpreter and print where the time went "
+                                 "to stderr")
+    arg_parser.add_argument('--profile-output', metavar='FILE',
+                            help="also write the profile to FILE as collapsed stacks for flamegraph tools "
+                                 "(implies --profile)")
+    arg_parser.add_argument('--typecheck', action='store_true',
+                            help="infer types and refuse to run a program with type errors")
+    add_limit_arguments(arg_parser)
+    args = arg_parser.parse_args(argv)
+    limits = limits_from_args(args)
+    profile = args.profile or args.profile_output is not None
+    if profile and args.engine != 'tree':
+        arg_parser.error("--profile always uses the tree engine")
+    cache_max_size = args.cache_max_size * 1024 * 1024
+
+    batch = args.jobs is not None or len(args.source_files) > 1 or os.path.isdir(args.source_files[0])
+    if batch:
+        if args.opt_report or profile:
+            arg_parser.error("--opt-report and --profile can only be used with a single script")
+        # Imported here because the batch runner itself builds on this module.
+        from src.batch import BatchSettings, run_batch
+        settings = BatchSettings(args.engine, args.opt_level, args.stream, args.mmap, args.cache_dir, cache_max_size,
+                                 args.typecheck, limits)
+        run_batch(args.source_files, jobs=1 if args.jobs is None else args.jobs, settings=settings)
+        return
+
+    run_source_file(args.source_files[0], engine=args.engine, opt_level=args.opt_level, opt_report=args.opt_report,
+                    stream=args.stream, use_mmap=args.mmap, cache_dir=args.cache_dir,
+                    cache_max_size=cache_max_size, profile=args.profile, profile_output=args.profile_output,
+                    typecheck=args.typecheck, limits=limits)
+
+
+def add_limit_arguments(arg_parser):
+    arg_parser.add_argument('--max-statements', type=int, metavar='N',
+                            help="stop a script after it has executed N statements")
+    arg_parser.add_argument('--max-output-bytes', type=int, metavar='N',
+                            help="stop a script that prints more than N bytes")
+    arg_parser.add_argument('--max-variables', type=int, metavar='N',
+                            help="stop a script that assigns more than N variables")
+    arg_parser.add_argument('--timeout', type=float, metavar='SECONDS',
+                            help="stop a script that runs for longer than SECONDS, parsing included")
+
+
+def limits_from_args(args):
+    """Return the Limits set by the --max-* and --timeout options, or None."""
+    caps = (args.max_statements, args.max_output_bytes, args.max_variables, args.timeout)
+    if all(cap is None for cap in caps):
+        return None
+    return Limits(*caps)
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python execute.py source_file.scl")
-    else:
-        source_file = sys.argv[1]
-        run_source_file(source_file)
+    main()
@@ -0,0 +1,236 @@
+from array import array
+
+from src.arrays import Array, call_builtin
+from src.ast import Block, PrintStatement, AssignmentStatement, IfStatement, BinaryOperation, Number, String, Variable, \
+    ArrayLiteral, Call
+from src.compiler import OPERATORS
+from src.interpreter import Interpreter
+from src.vm import BINARY_OPERATIONS
+
+# Node kinds stored in FlatAST.kinds.
+BLOCK = 0
+ASSIGNMENT = 1
+PRINT = 2
+IF = 3
+BINARY_OPERATION = 4
+NUMBER = 5
+STRING = 6
+VARIABLE = 7
+ARRAY = 8
+CALL = 9
+
+NO_NODE = -1
+
+
+class FlatAST:
+    """Struct-of-arrays form of an AST.
+
+    Node i is described by ``kinds[i]`` plus up to three integer fields
+    ``a[i]``, ``b[i]`` and ``c[i]`` whose meaning depends on the kind:
+
+    =================  ===============  ===========  =============
+    kind               a                b            c
+    =================  ===============  ===========  =============
+    BLOCK              first child      child count
+    ASSIGNMENT         name index       value node
+    PRINT              value node
+    IF                 condition node   true block   false block or NO_NODE
+    BINARY_OPERATION   left node        right node
+    NUMBER / STRING    literal index
+    VARIABLE           name index
+    ARRAY              first child      child count
+    CALL               literal index    first child  child count
+    =================  ===============  ===========  =============
+
+    ``ops[i]`` holds the operator of a BINARY_OPERATION as an index into
+    compiler.OPERATORS. Block children, array elements and call arguments
+    are listed in ``children``, literals (and the names of called functions)
+    in ``literals`` and variable names in ``names``, both deduplicated. The
+    whole program is a few flat buffers instead of one object per node,
+    and it pickles compactly.
+    """
+
+    def __init__(self):
+        self.kinds = array('B')
+        self.ops = array('B')
+        self.a = array('i')
+        self.b = array('i')
+        self.c = array('i')
+        self.children = array('i')
+        self.literals = []
+        self.names = []
+        self.root = NO_NODE
+        self.literal_indices = {}
+        self.name_indices = {}
+
+    def __len__(self):
+        return len(self.kinds)
+
+    @classmethod
+    def from_ast(cls, ast):
+        flat = cls()
+        flat.root = flat.add(ast)
+        # The deduplication tables are only needed while building.
+        flat.literal_indices = None
+        flat.name_indices = None
+        return flat
+
+    def node(self, kind, a=0, b=0, c=0, op=0):
+        self.kinds.append(kind)
+        self.ops.append(op)
+        self.a.append(a)
+        self.b.append(b)
+        self.c.append(c)
+        return len(self.kinds) - 1
+
+    def literal(self, value):
+        # Key on the type too so that 1, 1.0 and True get separate entries.
+        key = (type(value), value)
+        if key not in self.literal_indices:
+            self.literal_indices[key] = len(self.literals)
+            self.literals.append(value)
+        return self.literal_indices[key]
+
+    def name(self, name):
+        if name not in self.name_indices:
+            self.name_indices[name] = len(self.names)
+            self.names.append(name)
+        return self.name_indices[name]
+
+    def add(self, node):
+        """Append node and its descendants and return node's index."""
+        if isinstance(node, Block):
+            statements = [self.add(statement) for statement in node.statements]
+            first = len(self.children)
+            self.children.extend(statements)
+            return self.node(BLOCK, first, len(statements))
+        elif isinstance(node, AssignmentStatement):
+            value = self.add(node.value)
+            return self.node(ASSIGNMENT, self.name(node.variable.name), value)
+        elif isinstance(node, PrintStatement):
+            return self.node(PRINT, self.add(node.value))
+        elif isinstance(node, IfStatement):
+            condition = self.add(node.condition)
+            true_block = self.add(node.true_block)
+            false_block = self.add(node.false_block) if node.false_block else NO_NODE
+            return self.node(IF, condition, true_block, false_block)
+        elif isinstance(node, BinaryOperation):
+            if node.operator not in OPERATORS:
+                raise Exception(f"Unknown operator: {node.operator}")
+            left = self.add(node.left)
+            right = self.add(node.right)
+            return self.node(BINARY_OPERATION, left, right, op=OPERATORS.index(node.operator))
+        elif isinstance(node, Number):
+            return self.node(NUMBER, self.literal(node.value))
+        elif isinstance(node, String):
+            return self.node(STRING, self.literal(node.value))
+        elif isinstance(node, Variable):
+            return self.node(VARIABLE, self.name(node.name))
+        elif isinstance(node, ArrayLiteral):
+            first, count = self.add_children(node.elements)
+            return self.node(ARRAY, first, count)
+        elif isinstance(node, Call):
+            first, count = self.add_children(node.arguments)
+            return self.node(CALL, self.literal(node.name), first, count)
+        else:
+            raise Exception(f"Unknown node type: {type(node)}")
+
+    def add_children(self, nodes):
+        """Add nodes and list them in ``children``; return (first, count)."""
+        indices = [self.add(node) for node in nodes]
+        first = len(self.children)
+        self.children.extend(indices)
+        return first, len(indices)
+
+    def to_ast(self, index=None):
+        """Rebuild the object tree rooted at index (the program root by default)."""
+        if index is None:
+            index = self.root
+        kind, a, b, c = self.kinds[index], self.a[index], self.b[index], self.c[index]
+        if kind == BLOCK:
+            return Block([self.to_ast(child) for child in self.children[a:a + b]])
+        elif kind == ASSIGNMENT:
+            return AssignmentStatement(Variable(self.names[a]), self.to_ast(b))
+        elif kind == PRINT:
+            return PrintStatement(self.to_ast(a))
+        elif kind == IF:
+            false_block = self.to_ast(c) if c != NO_NODE else None
+            return IfStatement(self.to_ast(a), self.to_ast(b), false_block)
+        elif kind == BINARY_OPERATION:
+            return BinaryOperation(self.to_ast(a), OPERATORS[self.ops[index]], self.to_ast(b))
+        elif kind == NUMBER:
+            return Number(self.literals[a])
+        elif kind == STRING:
+            return String(self.literals[a])
+        elif kind == VARIABLE:
+            return Variable(self.names[a])
+        elif kind == ARRAY:
+            return ArrayLiteral([self.to_ast(child) for child in self.children[a:a + b]])
+        elif kind == CALL:
+            return Call(self.literals[a], [self.to_ast(child) for child in self.children[b:b + c]])
+        else:
+            raise Exception(f"Unknown node kind: {kind}")
+
+
+class FlatInterpreter(Interpreter):
+    """Interpreter that evaluates a FlatAST without rebuilding node objects.
+
+    It accepts either a FlatAST or a regular AST, which is flattened first.
+    """
+
+    def __init__(self, ast, output=None, limits=None):
+        if not isinstance(ast, FlatAST):
+            ast = FlatAST.from_ast(ast)
+        super().__init__(ast, output, limits)
+
+    def interpret(self):
+        self.visit_statement(self.ast.root)
+
+    def visit_statement(self, index):
+        flat = self.ast
+        kind = flat.kinds[index]
+        if kind == BLOCK:
+            first = flat.a[index]
+            limits = self.limits
+            if limits is not None:
+                for child in flat.children[first:first + flat.b[index]]:
+                    limits.countdown -= 1
+                    if limits.countdown < 0:
+                        limits.check(len(self.environment))
+                    self.visit_statement(child)
+                return
+            for child in flat.children[first:first + flat.b[index]]:
+                self.visit_statement(child)
+        elif kind == ASSIGNMENT:
+            self.environment[flat.names[flat.a[index]]] = self.visit_expression(flat.b[index])
+        elif kind == PRINT:
+            self.output.write(self.visit_expression(flat.a[index]))
+        elif kind == IF:
+            if self.visit_expression(flat.a[index]):
+                self.visit_statement(flat.b[index])
+            elif flat.c[index] != NO_NODE:
+                self.visit_statement(flat.c[index])
+        else:
+            self.visit_expression(index)
+
+    def visit_expression(self, index):
+        flat = self.ast
+        kind = flat.kinds[index]
+        if kind == BINARY_OPERATION:
+            left = self.visit_expression(flat.a[index])
+            right = self.visit_expression(flat.b[index])
+            return BINARY_OPERATIONS[flat.ops[index]](left, right)
+        elif kind == VARIABLE:
+            return self.environment[flat.names[flat.a[index]]]
+        elif kind == NUMBER or kind == STRING:
+            return flat.literals[flat.a[index]]
+        elif kind == ARRAY:
+            first = flat.a[index]
+            elements = [self.visit_expression(child) for child in flat.children[first:first + flat.b[index]]]
+            return Array.from_values(elements)
+        elif kind == CALL:
+            first = flat.b[index]
+            arguments = [self.visit_expression(child) for child in flat.children[first:first + flat.c[index]]]
+            return call_builtin(flat.literals[flat.a[index]], arguments)
+        else:
+            raise Exception(f"Unknown node kind: {kind}")
@@ -0,0 +1,209 @@
+"""Pool of pre-forked child processes that each run one job in isolation.
+
+The parent imports everything and warms up once. Every child is forked
+from it before it gets its job, so running a job costs a pipe write
+instead of starting and importing a new interpreter, and no job can
+affect the parent or the jobs after it.
+"""
+import asyncio
+import os
+import pickle
+import traceback
+
+from src.engines import ENGINES
+from src.execute import parse_source, run_statements
+from src.lexer import Lexer
+from src.output import ListSink
+from src.typecheck import check
+
+WARM_UP_SOURCE = '''
+x = 1; y = 2.5; s = "a";
+if (x < y && s == "a") { print x + y * 2 - 1 / 4; } else { print s + "b"; }
+a = [1, 2, 3]; print sum(a * 2); print len(a) > 2;
+'''
+
+
+def warm_up():
+    """Run a small program through the lexer, parser, type checker and every engine.
+
+    Forked children start with the lexer's pattern compiled, the lazily
+    built tables filled in and the code paths of a run paged in.
+    """
+    Lexer(WARM_UP_SOURCE.encode()).tokenize()
+    for engine in ENGINES.values():
+        ast, _ = parse_source(WARM_UP_SOURCE)
+        check(ast)
+        engine(ast, ListSink()).interpret()
+    run_statements(WARM_UP_SOURCE, ENGINES['tree'], output=ListSink())
+
+
+class Worker:
+    """Parent's handle on a forked child that is waiting for its one job."""
+
+    __slots__ = ('pid', 'job_fd', 'result_fd')
+
+    def __init__(self, pid, job_fd, result_fd):
+        self.pid = pid
+        self.job_fd = job_fd
+        self.result_fd = result_fd
+
+    def submit(self, job):
+        """Send the job to the child; it starts running when the pipe is closed."""
+        data = pickle.dumps(job)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(self.job_fd, view):]
+        finally:
+            os.close(self.job_fd)
+
+    def wait(self):
+        """Wait for the child to exit; return its exit status, or -signal if it was killed."""
+        _, status = os.waitpid(self.pid, 0)
+        return os.waitstatus_to_exitcode(status)
+
+    async def wait_async(self):
+        """Like wait(), without blocking the running event loop.
+
+        A pidfd of the child becomes readable when it exits. Where there
+        are no pidfds, the child is polled instead.
+        """
+        try:
+            pidfd = os.pidfd_open(self.pid)
+        except (AttributeError, OSError):
+            while True:
+                pid, status = os.waitpid(self.pid, os.WNOHANG)
+                if pid:
+                    return os.waitstatus_to_exitcode(status)
+                await asyncio.sleep(0.01)
+        loop = asyncio.get_running_loop()
+        exited = loop.create_future()
+
+        def on_exit():
+            loop.remove_reader(pidfd)
+            exited.set_result(None)
+        try:
+            loop.add_reader(pidfd, on_exit)
+            await exited
+        finally:
+            loop.remove_reader(pidfd)
+            os.close(pidfd)
+        return self.wait()
+
+
+class JobPipeProtocol(asyncio.BaseProtocol):
+    """Protocol of the transport writing a job; ``closed`` is set once the pipe is closed."""
+
+    def __init__(self, forkserver, worker):
+        self.forkserver = forkserver
+        self.worker = worker
+        self.closed = asyncio.get_running_loop().create_future()
+
+    def connection_lost(self, exc):
+        # Called right before the transport closes the pipe.
+        self.forkserver.parent_fds.discard(self.worker.job_fd)
+        self.closed.set_result(exc)
+
+
+class ForkServer:
+    """Fork a child per job, keeping ``pool_size`` idle children forked ahead.
+
+    ``target(job, result)`` runs in the child, with ``result`` a binary file
+    of the pipe whose read end is ``Worker.result_fd`` in the parent. The
+    child exits as soon as target returns, with status 0, or 1 if it raised.
+
+    Fork from a single-threaded process only: a child gets copies of locks
+    that other threads may be holding.
+    """
+
+    def __init__(self, target, pool_size=1):
+        self.target = target
+        self.pool_size = pool_size
+        self.idle = []
+        self.parent_fds = set()  # Closed in every new child, see spawn()
+        # Other files of the parent that children must not keep open, such
+        # as a server's listening socket; also closed right after the fork.
+        self.inherited_fds = set()
+
+    def start(self):
+        while len(self.idle) < self.pool_size:
+            self.idle.append(self.spawn())
+
+    def spawn(self):
+        job_read, job_write = os.pipe()
+        result_read, result_write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            self.run_child(job_read, result_write, job_write, result_read)
+        os.close(job_read)
+        os.close(result_write)
+        self.parent_fds.update((job_write, result_read))
+        return Worker(pid, job_write, result_read)
+
+    def run_child(self, job_fd, result_fd, *unused_fds):
+        status = 1
+        try:
+            # Other children only see the end of their job pipe once no
+            # process holds its write end.
+            for fd in (*unused_fds, *self.parent_fds):
+                os.close(fd)
+            # A socket closed in the parent before it was discarded from
+            # inherited_fds may have left its number free, or reused by a pipe.
+            for fd in self.inherited_fds - {job_fd, result_fd, *unused_fds, *self.parent_fds}:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+            with os.fdopen(job_fd, 'rb') as jobs:
+                data = jobs.read()
+            if data:  # Nothing is sent when the pool is closed
+                with os.fdopen(result_fd, 'wb') as result:
+                    self.target(pickle.loads(data), result)
+            status = 0
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            # Skip the parent's cleanup, such as flushing its stdout buffer again.
+            os._exit(status)
+
+    def take(self):
+        """Return an idle worker, or a new one if there is none.
+
+        Call start() once its job is submitted, to refill the pool while
+        the job runs.
+        """
+        worker = self.idle.pop(0) if self.idle else self.spawn()
+        self.parent_fds.difference_update((worker.job_fd, worker.result_fd))
+        return worker
+
+    async def submit(self, worker, job):
+        """Like worker.submit(job), without blocking the running event loop.
+
+        Children forked while the job is written close the pipe as well,
+        so that the worker's child still sees its end.
+        """
+        self.parent_fds.add(worker.job_fd)
+        protocol = JobPipeProtocol(self, worker)
+        transport, _ = await asyncio.get_running_loop().connect_write_pipe(
+            lambda: protocol, os.fdopen(worker.job_fd, 'wb', 0))
+        transport.write(pickle.dumps(job))
+        transport.close()  # Once everything is written
+        await protocol.closed  # A child that died before reading is reported by wait()
+
+    def run(self, job):
+        """Run job in a child; return (everything it wrote to result, its exit status)."""
+        worker = self.take()
+        worker.submit(job)
+        self.start()
+        with os.fdopen(worker.result_fd, 'rb') as result:
+            data = result.read()
+        return data, worker.wait()
+
+    def close(self):
+        """Stop the idle children."""
+        for worker in self.idle:
+            os.close(worker.job_fd)
+            os.close(worker.result_fd)
+            worker.wait()
+        self.idle = []
+        self.parent_fds.clear()
@@ -1,10 +1,21 @@
-from src.ast import Block, PrintStatement, AssignmentStatement, IfStatement, BinaryOperation, Number, String, Variable
+from src.arrays import Array, call_builtin
+from src.ast import Block, PrintStatement, AssignmentStatement, IfStatement, BinaryOperation, Number, String, Variable, \
+    ArrayLiteral, Call
+from src.limits import LimitedSink
+from src.output import StdoutSink
 
 
 class Interpreter:
-    def __init__(self, ast):
+    def __init__(self, ast, output=None, limits=None):
         self.ast = ast
         self.environment = {}
+        # Receives the value of every print statement, see src/output.py.
+        self.output = output if output is not None else StdoutSink()
+        # Caps on the run, see src/limits.py. Blocks only count their
+        # statements down when there are limits, in a loop of their own.
+        self.limits = limits
+        if limits is not None and limits.max_output_bytes is not None:
+            self.output = LimitedSink(self.output, limits)
 
     def interpret(self):
         self.visit(self.ast)
@@ -26,10 +37,22 @@ class Interpreter:
             return node.value
         elif isinstance(node, Variable):
             return self.environment[node.name]
+        elif isinstance(node, ArrayLiteral):
+            return Array.from_values([self.visit(element) for element in node.elements])
+        elif isinstance(node, Call):
+            return call_builtin(node.name, [self.visit(argument) for argument in node.arguments])
         else:
             raise Exception(f"Unknown node type: {type(node)}")
 
     def visit_block(self, block):
+        limits = self.limits
+        if limits is not None:
+            for statement in block.statements:
+                limits.countdown -= 1
+                if limits.countdown < 0:
+                    limits.check(len(self.environment))
+                self.visit(statement)
+            return
         for statement in block.statements:
             self.visit(statement)
 
@@ -39,7 +62,7 @@ class Interpreter:
 
     def visit_print(self, print_stmt):
         value = self.visit(print_stmt.value)
-        print(value)
+        self.output.write(value)
 
     def visit_if(self, if_stmt):
         condition = self.visit(if_stmt.condition)
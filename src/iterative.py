@@ -0,0 +1,115 @@
+from src.arrays import Array, call_builtin
+from src.ast import Block, PrintStatement, AssignmentStatement, IfStatement, BinaryOperation, Number, String, Variable, \
+    ArrayLiteral, Call
+from src.closure import OPERATIONS
+from src.interpreter import Interpreter
+
+# Actions on the task stack. EXECUTE runs a statement and EVALUATE pushes the
+# value of an expression; the others finish a node once the values of its
+# children are on the value stack.
+EXECUTE = 0
+EVALUATE = 1
+APPLY = 2
+STORE = 3
+WRITE = 4
+BRANCH = 5
+DISCARD = 6
+BUILD_ARRAY = 7
+CALL = 8
+COUNT = 9  # Counts a statement against the limits, only pushed when there are any
+
+
+class IterativeInterpreter(Interpreter):
+    """Drop-in replacement for Interpreter that walks the tree with explicit stacks.
+
+    Pending work is kept as (action, node) pairs on a task stack and
+    intermediate values on a value stack instead of in Python frames, so
+    neither long operator chains nor deeply nested if statements run into
+    the recursion limit.
+    """
+
+    def interpret(self):
+        environment = self.environment
+        write = self.output.write
+        operations = OPERATIONS
+        limits = self.limits
+        tasks = [(EXECUTE, self.ast)]
+        push_task = tasks.append
+        pop_task = tasks.pop
+        values = []
+        push = values.append
+        pop = values.pop
+
+        while tasks:
+            action, node = pop_task()
+            if action == EVALUATE:
+                node_type = type(node)
+                if node_type is Variable:
+                    push(environment[node.name])
+                elif node_type is BinaryOperation:
+                    push_task((APPLY, node))
+                    push_task((EVALUATE, node.right))
+                    push_task((EVALUATE, node.left))
+                elif node_type is Number or node_type is String:
+                    push(node.value)
+                elif node_type is ArrayLiteral:
+                    push_task((BUILD_ARRAY, node))
+                    for element in reversed(node.elements):
+                        push_task((EVALUATE, element))
+                elif node_type is Call:
+                    push_task((CALL, node))
+                    for argument in reversed(node.arguments):
+                        push_task((EVALUATE, argument))
+                else:
+                    raise Exception(f"Unknown node type: {node_type}")
+            elif action == APPLY:
+                operation = operations.get(node.operator)
+                if operation is None:
+                    raise Exception(f"Unknown operator: {node.operator}")
+                right = pop()
+                values[-1] = operation(values[-1], right)
+            elif action == EXECUTE:
+                node_type = type(node)
+                if node_type is Block:
+                    for statement in reversed(node.statements):
+                        push_task((EXECUTE, statement))
+                        if limits is not None:
+                            push_task((COUNT, statement))
+                elif node_type is AssignmentStatement:
+                    push_task((STORE, node))
+                    push_task((EVALUATE, node.value))
+                elif node_type is PrintStatement:
+                    push_task((WRITE, node))
+                    push_task((EVALUATE, node.value))
+                elif node_type is IfStatement:
+                    push_task((BRANCH, node))
+                    push_task((EVALUATE, node.condition))
+                else:
+                    # Bare expressions are evaluated for their errors and discarded.
+                    push_task((DISCARD, node))
+                    push_task((EVALUATE, node))
+            elif action == STORE:
+                environment[node.variable.name] = pop()
+            elif action == WRITE:
+                write(pop())
+            elif action == BRANCH:
+                if pop():
+                    push_task((EXECUTE, node.true_block))
+                elif node.false_block:
+                    push_task((EXECUTE, node.false_block))
+            elif action == DISCARD:
+                pop()
+            elif action == BUILD_ARRAY:
+                count = len(node.elements)
+                elements = values[len(values) - count:]
+                del values[len(values) - count:]
+                push(Array.from_values(elements))
+            elif action == CALL:
+                count = len(node.arguments)
+                arguments = values[len(values) - count:]
+                del values[len(values) - count:]
+                push(call_builtin(node.name, arguments))
+            elif action == COUNT:
+                limits.countdown -= 1
+                if limits.countdown < 0:
+                    limits.check(len(environment))
@@ -1,8 +1,19 @@
 import re
 import collections
+import itertools
+import mmap
+import sys
+from array import array
 
 Token = collections.namedtuple('Token', ['type', 'value', 'line', 'column'])
 
+# Inputs lexed with the bytes pattern instead of being decoded up front.
+BYTES_TYPES = (bytes, bytearray, memoryview, mmap.mmap)
+
+
+class UnterminatedString(RuntimeError):
+    """Raised for a string literal that is still open at the end of the input."""
+
 
 class Lexer:
     token_specification = [
@@ -22,21 +33,122 @@ class Lexer:
         ('RPAREN', r'\)'),  # Right Parenthesis
         ('LBRACE', r'\{'),  # Left Curly Brace
         ('RBRACE', r'\}'),  # Right Curly Brace
+        ('LBRACKET', r'\['),  # Left Square Bracket
+        ('RBRACKET', r'\]'),  # Right Square Bracket
+        ('COMMA', r','),  # Separates array elements and arguments
         ('NEWLINE', r'\n'),  # Line endings
         ('SKIP', r'[ \t]+'),  # Skip over spaces and tabs
         ('MISMATCH', r'.'),  # Any other character
     ]
+    # Compiled once for all lexers.
+    token_regex = re.compile('|'.join('(?P<%s>%s)' % pair for pair in token_specification))
+    bytes_token_regex = re.compile('|'.join('(?P<%s>%s)' % pair for pair in token_specification).encode())
 
-    def __init__(self, code):
+    def __init__(self, code, first_line=1):
+        # first_line numbers the lines of code that starts partway into a file.
         self.code = code
+        self.first_line = first_line
+        self.line = first_line  # The line reached, once all of code is lexed
         self.tokens = []
         self.current_token_index = 0
 
     def tokenize(self):
+        self.tokens.extend(self.iter_tokens())
+        return self.tokens
+
+    def tokenize_compact(self):
+        """Return all tokens as a TokenArray instead of a list of Token tuples."""
+        tokens = TokenArray()
+        tokens.extend(self.iter_fields())
+        return tokens
+
+    def tokenize_parallel(self, processes=None, executor=None):
+        """Return all tokens as a TokenArray, lexing parts of the code in parallel.
+
+        See src.parallel_lexer; the tokens are the same as tokenize() returns.
+        """
+        from src.parallel_lexer import tokenize_parallel
+        return tokenize_parallel(self.code, processes, executor, self.first_line)
+
+    def iter_tokens(self):
+        """Return a generator that yields tokens one at a time.
+
+        ``code`` is either a string, an iterable of chunks that each end on a
+        line boundary (such as an open file), or a bytes-like buffer of UTF-8
+        source (such as an mmap).
+        """
+        fields = self.iter_fields()
+        try:
+            # tuple.__new__ builds each Token without going through its Python-level __new__.
+            yield from map(tuple.__new__, itertools.repeat(Token), fields)
+        finally:
+            fields.close()  # Release the source buffer when the caller closes the tokens
+
+    def iter_fields(self):
+        """Like iter_tokens(), but yield plain (type, value, line, column) tuples."""
+        if isinstance(self.code, BYTES_TYPES):
+            return self.iter_bytes_tokens()
+        return self.iter_text_tokens()
+
+    def iter_text_tokens(self):
+        """Tokenize a string or an iterable of line chunks.
+
+        Chunks are read one at a time, so only the current line (or a string
+        literal spanning several lines) is held in memory.
+        """
+        linestart = 0
+        line = self.first_line
+        finditer = self.token_regex.finditer
+        chunks = [self.code] if isinstance(self.code, str) else self.code
+        # Chunks not lexed yet, which start with a string literal left open.
+        # The literal ends at the next '"', so chunks without one are only
+        # collected, and joined once a chunk may close it.
+        pending = []
+        # None marks the end of the input.
+        for chunk in itertools.chain(chunks, [None]):
+            if chunk is not None:
+                pending.append(chunk)
+                if len(pending) > 1 and '"' not in chunk:
+                    continue  # The literal is still open
+            buffer = ''.join(pending)
+            consumed = 0
+            for mo in finditer(buffer):
+                kind = mo.lastgroup
+                value = mo.group()
+                column = mo.start() - linestart
+                if kind == 'NEWLINE':
+                    linestart = mo.end()
+                    line += 1
+                elif kind in ['SKIP', 'COMMENT']:
+                    pass  # Skip whitespace and comments
+                elif kind == 'MISMATCH':
+                    if value == '"' and chunk is not None:
+                        break  # The string literal may be closed by a later chunk
+                    error = UnterminatedString if value == '"' else RuntimeError
+                    raise error(f'{line}:{column}: Illegal character {value!r}')
+                else:
+                    if kind == 'NUMBER':
+                        value = float(value) if '.' in value else int(value)
+                    yield kind, value, line, column
+                consumed = mo.end()
+            buffer = buffer[consumed:]
+            pending = [buffer] if buffer else []
+            linestart -= consumed
+        self.line = line
+
+    def iter_bytes_tokens(self):
+        """Tokenize a bytes-like buffer without decoding it up front.
+
+        The pattern runs directly over the buffer, so with an mmap the file
+        is paged in lazily by the OS. Only STRING and ID values are decoded;
+        numbers are converted straight from bytes and the fixed spellings of
+        keywords, operators and punctuation are decoded once and reused.
+        Columns are byte offsets.
+        """
         linestart = 0
-        line = 1
-        token_regex = '|'.join('(?P<%s>%s)' % pair for pair in self.token_specification)
-        for mo in re.finditer(token_regex, self.code):
+        line = self.first_line
+        decoded = {}
+        for mo in self.bytes_token_regex.finditer(self.code):
             kind = mo.lastgroup
             value = mo.group()
             column = mo.start() - linestart
@@ -46,12 +158,20 @@ class Lexer:
             elif kind in ['SKIP', 'COMMENT']:
                 continue  # Skip whitespace and comments
             elif kind == 'MISMATCH':
-                raise RuntimeError(f'{line}:{column}: Illegal character {value!r}')
+                error = UnterminatedString if value == b'"' else RuntimeError
+                raise error(f'{line}:{column}: Illegal character {value.decode("utf-8", "replace")!r}')
             else:
                 if kind == 'NUMBER':
-                    value = float(value) if '.' in value else int(value)
-                self.tokens.append(Token(kind, value, line, column))
-        return self.tokens
+                    value = float(value) if b'.' in value else int(value)
+                elif kind == 'STRING' or kind == 'ID':
+                    value = value.decode('utf-8')
+                else:
+                    text = decoded.get(value)
+                    if text is None:
+                        text = decoded[value] = value.decode('ascii')
+                    value = text
+                yield kind, value, line, column
+        self.line = line
 
     def next_token(self):
         if self.current_token_index < len(self.tokens):
@@ -59,3 +179,86 @@ class Lexer:
             self.current_token_index += 1
             return token
         return None
+
+
+# Token types in the order of their codes in TokenArray.types.
+TOKEN_TYPES = tuple(name for name, pattern in Lexer.token_specification)
+TOKEN_TYPE_CODES = {name: code for code, name in enumerate(TOKEN_TYPES)}
+
+
+class TokenArray:
+    """A compact sequence of tokens, stored column by column.
+
+    The type code, line and column of every token are kept in parallel
+    arrays of machine integers instead of one tuple per token. Values are
+    interned: every distinct value is stored once in ``constants`` and each
+    token holds its index there, so an identifier used a thousand times is
+    a single string. Iterating yields Token tuples one at a time, so a
+    Parser can read a TokenArray directly without a list of Tokens ever
+    being built.
+    """
+
+    def __init__(self, tokens=()):
+        self.types = array('B')
+        self.values = array('I')  # Indices into constants
+        self.lines = array('I')
+        self.columns = array('I')
+        self.constants = []
+        self.constant_indices = {}
+        self.extend(tokens)
+
+    def extend(self, tokens):
+        add_type = self.types.append
+        add_value = self.values.append
+        add_line = self.lines.append
+        add_column = self.columns.append
+        constants = self.constants
+        constant_indices = self.constant_indices
+        type_codes = TOKEN_TYPE_CODES
+        for token_type, value, line, column in tokens:
+            # constant_index(), inlined.
+            key = value if value.__class__ is str else (value.__class__, value)
+            index = constant_indices.get(key)
+            if index is None:
+                index = constant_indices[key] = len(constants)
+                constants.append(sys.intern(value) if value.__class__ is str else value)
+            add_type(type_codes[token_type])
+            add_value(index)
+            add_line(line)
+            add_column(column)
+
+    def extend_array(self, other, line_offset=0):
+        """Append the tokens of another TokenArray, adding line_offset to their lines."""
+        indices = [self.constant_index(value) for value in other.constants]
+        self.types.extend(other.types)
+        if indices == list(range(len(indices))):
+            self.values.extend(other.values)  # Same constants, as when this array was empty
+        else:
+            self.values.extend(map(indices.__getitem__, other.values))
+        self.lines.extend(map(line_offset.__add__, other.lines) if line_offset else other.lines)
+        self.columns.extend(other.columns)
+
+    def append(self, token):
+        self.extend([token])
+
+    def constant_index(self, value):
+        """Return the index of value in constants, adding it if it is new."""
+        # 1 and 1.0 are equal, so numbers are told apart by their type.
+        key = value if value.__class__ is str else (value.__class__, value)
+        index = self.constant_indices.get(key)
+        if index is None:
+            index = self.constant_indices[key] = len(self.constants)
+            self.constants.append(sys.intern(value) if value.__class__ is str else value)
+        return index
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index):
+        return Token(TOKEN_TYPES[self.types[index]], self.constants[self.values[index]],
+                     self.lines[index], self.columns[index])
+
+    def __iter__(self):
+        fields = zip(map(TOKEN_TYPES.__getitem__, self.types), map(self.constants.__getitem__, self.values),
+                     self.lines, self.columns)
+        return map(tuple.__new__, itertools.repeat(Token), fields)
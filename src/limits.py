@@ -0,0 +1,116 @@
+import time
+
+from src.output import OutputSink
+from src.resolver import UNBOUND
+
+# Most statements executed between two checks of the clock and of the
+# number of variables.
+CHECK_INTERVAL = 1024
+
+
+class LimitExceeded(Exception):
+    """Raised when a script goes over one of its Limits."""
+
+    def __init__(self, limit, message):
+        super().__init__(message)
+        self.limit = limit
+
+
+class Limits:
+    """Caps on what one run of a program may use; None means no cap.
+
+    Engines count every statement down in ``countdown`` before running it,
+    and call check() when it drops below zero. check() then compares
+    everything with the caps and sets the next countdown, so a run pays one
+    subtraction per statement and a full check every CHECK_INTERVAL
+    statements at most. Output is counted as it is written, see LimitedSink.
+    Engines skip the counting entirely when they have no limits.
+
+    Counting starts when the Limits are made, or again on start(). One
+    Limits can be shared by several engines that run parts of the same
+    program, as when streaming.
+    """
+
+    def __init__(self, max_statements=None, max_output_bytes=None, max_variables=None, timeout=None):
+        self.max_statements = max_statements
+        self.max_output_bytes = max_output_bytes
+        self.max_variables = max_variables
+        self.timeout = timeout
+        self.start()
+
+    def copy(self):
+        """Return new Limits with the same caps, for a run of its own."""
+        return Limits(self.max_statements, self.max_output_bytes, self.max_variables, self.timeout)
+
+    def capped(self, caps):
+        """Return new Limits with no cap above the one of caps; caps may be None."""
+        if caps is None:
+            return self.copy()
+        pairs = zip((self.max_statements, self.max_output_bytes, self.max_variables, self.timeout),
+                    (caps.max_statements, caps.max_output_bytes, caps.max_variables, caps.timeout))
+        return Limits(*(cap if own is None else own if cap is None else min(own, cap) for own, cap in pairs))
+
+    def start(self):
+        self.statements = 0  # Executed before the current countdown began
+        self.output_bytes = 0
+        self.deadline = time.monotonic() + self.timeout if self.timeout is not None else None
+        self.interval = self.countdown = self.next_interval()
+
+    def next_interval(self):
+        if self.max_statements is None:
+            return CHECK_INTERVAL
+        return min(CHECK_INTERVAL, self.max_statements - self.statements)
+
+    @property
+    def executed_statements(self):
+        return self.statements + self.interval - self.countdown
+
+    def check(self, variables):
+        """Raise LimitExceeded if a limit was passed; otherwise restart the countdown.
+
+        variables is the number of variables the program has bound.
+        """
+        self.statements = self.executed_statements
+        self.interval = self.countdown = 0
+        if self.max_statements is not None and self.statements > self.max_statements:
+            raise LimitExceeded('statements', f"Statement limit of {self.max_statements} exceeded")
+        if self.max_variables is not None and variables > self.max_variables:
+            raise LimitExceeded('variables', f"Variable limit of {self.max_variables} exceeded")
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise LimitExceeded('timeout', f"Time limit of {self.timeout:g}s exceeded")
+        self.interval = self.countdown = self.next_interval()
+
+    def count_output(self, text):
+        self.output_bytes += len(text.encode())
+        if self.max_output_bytes is not None and self.output_bytes > self.max_output_bytes:
+            raise LimitExceeded('output', f"Output limit of {self.max_output_bytes} bytes exceeded")
+
+
+class LimitedSink(OutputSink):
+    """Pass printed values on to output, counting their bytes against limits.
+
+    A value that would go over the limit is not written.
+    """
+
+    def __init__(self, output, limits):
+        self.output = output
+        self.limits = limits
+
+    def write(self, value):
+        self.limits.count_output(str(value) + '\n')
+        self.output.write(value)
+
+    def flush(self):
+        self.output.flush()
+
+    def close(self):
+        self.output.close()
+
+
+def count_variables(names, slots, environment):
+    """Return how many variables a program running on slots has bound.
+
+    That is the environment once store_slots() has copied the slots back.
+    """
+    return len(environment) + sum(1 for name, value in zip(names, slots)
+                                  if value is not UNBOUND and name not in environment)
@@ -0,0 +1,253 @@
+import math
+
+from src.ast import Block, PrintStatement, AssignmentStatement, IfStatement, BinaryOperation, Number, String, Variable, \
+    ArrayLiteral, Call
+from src.closure import OPERATIONS
+
+# Like CPython's peephole optimizer, don't fold operations that would bake
+# very long strings into the program.
+MAX_FOLDED_STRING = 4096
+
+# Level 1 only performs transformations that cannot change behaviour:
+# constant folding (operations that would fail are left for run time) and
+# removal of if branches whose condition is a literal. Level 2 also applies
+# algebraic identities such as x * 1 and x + 0, which assume numeric operands
+# ("abc" + 0 raises at run time but simplifies to "abc").
+OPT_LEVELS = (0, 1, 2)
+DEFAULT_OPT_LEVEL = 1
+
+
+def child_nodes(node):
+    """Return the nodes directly below node."""
+    if isinstance(node, Block):
+        return node.statements
+    elif isinstance(node, AssignmentStatement):
+        return [node.variable, node.value]
+    elif isinstance(node, PrintStatement):
+        return [node.value]
+    elif isinstance(node, IfStatement):
+        children = [node.condition, node.true_block]
+        if node.false_block:
+            children.append(node.false_block)
+        return children
+    elif isinstance(node, BinaryOperation):
+        return [node.left, node.right]
+    elif isinstance(node, ArrayLiteral):
+        return node.elements
+    elif isinstance(node, Call):
+        return node.arguments
+    return []
+
+
+def count_nodes(node):
+    """Count the AST nodes reachable from node."""
+    count = 0
+    pending = [node]
+    while pending:
+        count += 1
+        pending.extend(child_nodes(pending.pop()))
+    return count
+
+
+def run_iteratively(visit):
+    """Drive a generator based visitor to completion and return its result.
+
+    Visitor methods yield the generator of a nested visit instead of calling
+    it and are sent its result back, so the nesting is kept on a list rather
+    than in Python frames and the depth of the tree is not limited by the
+    recursion limit.
+    """
+    stack = [visit]
+    result = None
+    while stack:
+        try:
+            nested = stack[-1].send(result)
+        except StopIteration as stop:
+            stack.pop()
+            result = stop.value
+        else:
+            stack.append(nested)
+            result = None
+    return result
+
+
+class OptimizationStats:
+    def __init__(self):
+        self.nodes_before = 0
+        self.nodes_after = 0
+        self.folded = 0
+        self.branches_eliminated = 0
+        self.simplified = 0
+
+    def add(self, other):
+        """Accumulate the counters of another run, e.g. one per statement."""
+        self.nodes_before += other.nodes_before
+        self.nodes_after += other.nodes_after
+        self.folded += other.folded
+        self.branches_eliminated += other.branches_eliminated
+        self.simplified += other.simplified
+
+    @property
+    def nodes_removed(self):
+        return self.nodes_before - self.nodes_after
+
+    def report(self):
+        return (f"Optimizer: removed {self.nodes_removed} of {self.nodes_before} nodes "
+                f"({self.folded} folded, {self.branches_eliminated} branches eliminated, "
+                f"{self.simplified} simplified)")
+
+
+class Optimizer:
+    """Rewrite an AST into a cheaper equivalent one.
+
+    The input tree is left untouched; optimize() returns a new tree and
+    records what it did in ``stats``.
+    """
+
+    def __init__(self, level=DEFAULT_OPT_LEVEL):
+        if level not in OPT_LEVELS:
+            raise Exception(f"Unknown optimization level: {level}")
+        self.level = level
+        self.stats = OptimizationStats()
+
+    def optimize(self, ast):
+        self.stats = OptimizationStats()
+        self.stats.nodes_before = count_nodes(ast)
+        if self.level > 0:
+            ast = run_iteratively(self.visit_block(ast))
+        self.stats.nodes_after = count_nodes(ast)
+        return ast
+
+    # The visit methods are generators driven by run_iteratively(): each
+    # nested visit is yielded and its result sent back.
+
+    def visit_statements(self, statements):
+        result = []
+        for statement in statements:
+            result.extend((yield self.visit_statement(statement)))
+        return result
+
+    def visit_statement(self, node):
+        """Return the list of statements that replace node."""
+        if isinstance(node, Block):
+            return [(yield self.visit_block(node))]
+        elif isinstance(node, AssignmentStatement):
+            value = yield self.visit_expression(node.value)
+            return [AssignmentStatement(node.variable, value, node.line, node.column)]
+        elif isinstance(node, PrintStatement):
+            value = yield self.visit_expression(node.value)
+            return [PrintStatement(value, node.line, node.column)]
+        elif isinstance(node, IfStatement):
+            return (yield self.visit_if(node))
+        return [(yield self.visit_expression(node))]
+
+    def visit_if(self, if_stmt):
+        condition = yield self.visit_expression(if_stmt.condition)
+        if is_literal(condition):
+            # Blocks don't introduce a scope, so the surviving branch can be
+            # spliced into the enclosing block.
+            self.stats.branches_eliminated += 1
+            taken = if_stmt.true_block if condition.value else if_stmt.false_block
+            if not taken:
+                return []
+            return (yield self.visit_statements(taken.statements))
+
+        true_block = yield self.visit_block(if_stmt.true_block)
+        false_block = None
+        if if_stmt.false_block:
+            false_block = yield self.visit_block(if_stmt.false_block)
+        return [IfStatement(condition, true_block, false_block, if_stmt.line, if_stmt.column)]
+
+    def visit_block(self, block):
+        return Block((yield self.visit_statements(block.statements)), block.line, block.column)
+
+    def visit_expression(self, node):
+        if isinstance(node, ArrayLiteral):
+            elements = []
+            for element in node.elements:
+                elements.append((yield self.visit_expression(element)))
+            return ArrayLiteral(elements, node.line, node.column)
+        if isinstance(node, Call):
+            arguments = []
+            for argument in node.arguments:
+                arguments.append((yield self.visit_expression(argument)))
+            return Call(node.name, arguments, node.line, node.column)
+        if not isinstance(node, BinaryOperation):
+            return node
+        # Operands that are leaves can't change, so skip visiting them.
+        left = node.left if is_leaf(node.left) else (yield self.visit_expression(node.left))
+        right = node.right if is_leaf(node.right) else (yield self.visit_expression(node.right))
+
+        if is_literal(left) and is_literal(right):
+            folded = self.fold(node.operator, left.value, right.value)
+            if folded is not None:
+                self.stats.folded += 1
+                folded.line, folded.column = node.line, node.column
+                return folded
+
+        if self.level >= 2:
+            simplified = self.simplify(node.operator, left, right)
+            if simplified is not None:
+                self.stats.simplified += 1
+                return simplified
+
+        return BinaryOperation(left, node.operator, right, node.line, node.column)
+
+    def fold(self, operator, left, right):
+        """Return a literal node for the operation, or None if it can't be folded."""
+        if operator not in OPERATIONS or result_too_long(operator, left, right):
+            return None
+        try:
+            value = OPERATIONS[operator](left, right)
+        except Exception:
+            # Leave the error to be raised at run time, in program order.
+            return None
+        if isinstance(value, str):
+            return String(value) if len(value) <= MAX_FOLDED_STRING else None
+        if isinstance(value, float) and not math.isfinite(value):
+            return None
+        return Number(value)
+
+    def simplify(self, operator, left, right):
+        # x / 1 is left alone: it turns an int into a float.
+        if operator in ('+', '-') and is_int(right, 0):
+            return left
+        if operator == '+' and is_int(left, 0):
+            return right
+        if operator == '*' and is_int(right, 1):
+            return left
+        if operator == '*' and is_int(left, 1):
+            return right
+        return None
+
+
+def result_too_long(operator, left, right):
+    """Tell whether a string operation would build more than MAX_FOLDED_STRING characters.
+
+    Checked before running the operation, so "a" * 1000000000 is never built.
+    """
+    if operator == '+' and isinstance(left, str) and isinstance(right, str):
+        return len(left) + len(right) > MAX_FOLDED_STRING
+    if operator == '*':
+        for text, count in ((left, right), (right, left)):
+            if isinstance(text, str) and isinstance(count, int):
+                return len(text) * count > MAX_FOLDED_STRING
+    return False
+
+
+def is_literal(node):
+    return isinstance(node, (Number, String))
+
+
+def is_leaf(node):
+    return isinstance(node, (Number, String, Variable))
+
+
+def is_int(node, value):
+    return isinstance(node, Number) and type(node.value) is int and node.value == value
+
+
+def optimize(ast, level=DEFAULT_OPT_LEVEL):
+    """Optimize ast at the given level and return (new_ast, stats)."""
+    optimizer = Optimizer(level)
+    return optimizer.optimize(ast), optimizer.stats
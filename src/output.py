@@ -0,0 +1,94 @@
+import sys
+
+DEFAULT_FLUSH_THRESHOLD = 64 * 1024
+
+
+class OutputSink:
+    """Destination for the values of print statements.
+
+    Engines call write() once per print statement with the printed value;
+    how and when it reaches its destination is up to the sink.
+    """
+
+    def write(self, value):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class StdoutSink(OutputSink):
+    """Print every value straight away, like the builtin print()."""
+
+    def write(self, value):
+        print(value)
+
+
+class BufferedSink(OutputSink):
+    """Collect printed lines and write them out in large chunks.
+
+    The text is written to ``stream`` (sys.stdout at the time of the write
+    by default) once at least ``flush_threshold`` characters are pending and
+    whenever flush() is called.
+    """
+
+    def __init__(self, stream=None, flush_threshold=DEFAULT_FLUSH_THRESHOLD):
+        self.stream = stream
+        self.flush_threshold = flush_threshold
+        self.parts = []
+        self.size = 0
+
+    def write(self, value):
+        text = str(value) + '\n'
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size >= self.flush_threshold:
+            self.flush()
+
+    def flush(self):
+        stream = self.stream if self.stream is not None else sys.stdout
+        if self.parts:
+            stream.write(''.join(self.parts))
+            self.parts = []
+            self.size = 0
+        stream.flush()
+
+
+class FileSink(BufferedSink):
+    """Buffered output to a file, which is opened here and closed by close()."""
+
+    def __init__(self, filename, mode='w', flush_threshold=DEFAULT_FLUSH_THRESHOLD):
+        super().__init__(open(filename, mode), flush_threshold)
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.stream.close()
+
+
+class ListSink(OutputSink):
+    """Collect the printed values in memory."""
+
+    def __init__(self):
+        self.values = []
+
+    def write(self, value):
+        self.values.append(value)
+
+    def getvalue(self):
+        """Return the output as the text print() would have produced."""
+        return ''.join(str(value) + '\n' for value in self.values)
+
+
+class CallbackSink(OutputSink):
+    """Pass every printed value to a user supplied callback."""
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def write(self, value):
+        self.callback(value)
@@ -0,0 +1,119 @@
+"""Lex large sources with a pool of processes.
+
+The source is written once to a temporary file, which every process maps
+into memory, and split at line boundaries
+into one chunk per process. Every process lexes its chunk as if no string
+literal were open where it starts, which is true unless a literal runs
+across the boundary: tokens never span lines otherwise, and comments end
+at the end of their line. The chunks are then joined in order. A chunk
+that ends inside a string literal is lexed again in this process together
+with the chunks after it, until the literal is closed, so the tokens and
+errors are exactly those of Lexer.tokenize().
+"""
+import mmap
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from src.lexer import BYTES_TYPES, Lexer, TokenArray, UnterminatedString
+
+
+def split_lines(data, count):
+    """Split data into at most count (start, end) spans of whole lines, of about equal size."""
+    spans = []
+    start = 0
+    for part in range(1, count + 1):
+        if start >= len(data):
+            break
+        end = len(data) if part == count else data.find(b'\n', max(start, len(data) * part // count)) + 1
+        if end <= 0:
+            end = len(data)  # No line ends after the target
+        spans.append((start, end))
+        start = end
+    return spans
+
+
+def lex_chunk(filename, start, end, text):
+    """Lex bytes start to end of filename.
+
+    Returns the tokens, numbering the first line 1, and the line reached at
+    the end of the chunk.
+    """
+    with open(filename, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        chunk = mapped[start:end]
+    lexer = Lexer(chunk.decode() if text else chunk)
+    return lexer.tokenize_compact(), lexer.line
+
+
+def tokenize_parallel(code, processes=None, executor=None, first_line=1):
+    """Return the tokens of code as a TokenArray, lexed by several processes.
+
+    code is anything Lexer accepts. With a ProcessPoolExecutor, its workers
+    are used instead of starting processes for this call. Columns are byte
+    offsets for bytes-like code, as with Lexer.
+    """
+    text = not isinstance(code, BYTES_TYPES)
+    if text:
+        data = (code if isinstance(code, str) else ''.join(code)).encode()
+    else:
+        data = bytes(code)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    spans = split_lines(data, processes)
+    if len(spans) <= 1:
+        return Lexer(data.decode() if text else data, first_line).tokenize_compact()
+
+    with tempfile.NamedTemporaryFile(prefix='scl-', suffix='.scl') as file:
+        file.write(data)
+        file.flush()
+        if executor is None:
+            with ProcessPoolExecutor(processes) as executor:
+                return join_chunks(executor, file.name, data, spans, text, first_line)
+        return join_chunks(executor, file.name, data, spans, text, first_line)
+
+
+def join_chunks(executor, filename, data, spans, text, first_line):
+    futures = [executor.submit(lex_chunk, filename, start, end, text) for start, end in spans]
+    try:
+        return join_results(futures, data, spans, text, first_line)
+    finally:
+        for future in futures:
+            future.cancel()  # Those not needed after an error
+
+
+def join_results(futures, data, spans, text, first_line):
+    """Join the tokens of every chunk, lexing chunks again where needed.
+
+    Lines are only counted outside of string literals, so the first line of
+    a chunk is only known once the chunks before it are joined.
+    """
+    tokens = TokenArray()
+    line = first_line
+    index = 0
+    while index < len(spans):
+        try:
+            chunk_tokens, last_line = futures[index].result()
+            tokens.extend_array(chunk_tokens, line - 1)
+            line += last_line - 1
+            index += 1
+            continue
+        except UnterminatedString:
+            # A string literal may run into the next chunk: lex the chunks
+            # from here together until one of them ends outside of a string.
+            last = min(index + 1, len(spans) - 1)
+        except RuntimeError:
+            last = index
+        # Errors are raised when lexing again, with the right line numbers.
+        start = spans[index][0]
+        for last in range(last, len(spans)):
+            chunk = data[start:spans[last][1]]
+            lexer = Lexer(chunk.decode() if text else chunk, line)
+            try:
+                tokens.extend_array(lexer.tokenize_compact())
+                break
+            except UnterminatedString:
+                if last == len(spans) - 1:
+                    raise
+        line = lexer.line
+        index = last + 1
+    return tokens
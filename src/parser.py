@@ -1,19 +1,36 @@
-from src.ast import Block, BinaryOperation, Number, Variable, PrintStatement, AssignmentStatement, IfStatement, String
+from src.arrays import BUILTINS, argument_count_error
+from src.ast import Block, BinaryOperation, Number, Variable, PrintStatement, AssignmentStatement, IfStatement, String, \
+    ArrayLiteral, Call
+
+# Binding power of every binary operator: higher binds tighter, and operators
+# of equal power associate to the left. New binary operators only need an
+# entry here (and in the lexer's patterns).
+BINDING_POWERS = {
+    '&&': 1, '||': 1,
+    '==': 2, '!=': 2, '<': 2, '>': 2, '<=': 2, '>=': 2,
+    '+': 3, '-': 3,
+    '*': 4, '/': 4,
+}
+
+# Token types whose values are binary operators.
+OPERATOR_TOKEN_TYPES = frozenset(['LOGICAL', 'COMPARE', 'OP'])
 
 
 class Parser:
     def __init__(self, tokens):
+        # tokens can be a list, a TokenArray or any iterator, such as
+        # Lexer.iter_tokens().
+        # Only the current token is held, so a lazy token stream is never
+        # materialized in full.
         self.tokens = tokens
+        self.token_stream = iter(tokens)
         self.current_token = None
         self.index = -1
         self.next_token()
 
     def next_token(self):
         self.index += 1
-        if self.index < len(self.tokens):
-            self.current_token = self.tokens[self.index]
-        else:
-            self.current_token = None  # End of token stream
+        self.current_token = next(self.token_stream, None)  # None at the end of the token stream
 
     def parse(self):
         return self.program()
@@ -28,109 +45,161 @@ class Parser:
                 f"Expected token {token_type}, but got {self.current_token.type} at line {self.current_token.line}")
 
     def program(self):
-        nodes = []
-        while self.current_token is not None and self.current_token.type != 'EOF':
-            if self.current_token.type == 'LBRACE':
+        # Blocks span several lines, so unlike other nodes they get no position.
+        return Block(list(self.iter_statements()))
+
+    def iter_statements(self):
+        """Yield the statements of the current block one at a time.
+
+        At the top level this lets callers execute each statement as soon as
+        it is parsed instead of waiting for the whole program.
+
+        Nested if blocks are parsed without recursion: the if statements
+        whose blocks are still open are kept on an explicit stack, each with
+        the list of statements of its current block, so the nesting depth is
+        not limited by Python's recursion limit.
+        """
+        open_ifs = []  # [if statement, statements of its open block] pairs
+        while True:
+            token = self.current_token
+            if token is None or token.type == 'EOF' or token.type == 'RBRACE':
+                if token is not None and token.type == 'RBRACE':
+                    self.eat('RBRACE')
+                if not open_ifs:
+                    return
+                # Close the innermost open block; at the end of the input
+                # every open block is closed in turn.
+                if_stmt, statements = open_ifs[-1]
+                if if_stmt.true_block is None:
+                    if_stmt.true_block = Block(statements)
+                    if self.current_token is not None and self.current_token.type == 'ELSE':
+                        self.eat('ELSE')
+                        open_ifs[-1][1] = []
+                        continue
+                else:
+                    if_stmt.false_block = Block(statements)
+                open_ifs.pop()
+                statement = if_stmt
+            elif token.type == 'LBRACE':
                 self.eat('LBRACE')
-            elif self.current_token.type == 'ID':
-                nodes.append(self.assignment_statement())
-            elif self.current_token.type == 'PRINT':
-                nodes.append(self.print_statement())
-            elif self.current_token.type == 'IF':
-                nodes.append(self.if_statement())
-            elif self.current_token.type == 'RBRACE':
-                self.eat('RBRACE')
-                return Block(nodes)
+                continue
+            elif token.type == 'IF':
+                open_ifs.append([self.if_header(), []])
+                continue
             else:
-                nodes.append(self.logical_expression())
-        return Block(nodes)
+                statement = self.statement()
 
-    def logical_expression(self):
-        node = self.comparison()
-        while self.current_token is not None and self.current_token.type == 'LOGICAL':
-            token = self.current_token
-            self.eat('LOGICAL')
-            node = BinaryOperation(left=node, operator=token.value, right=self.comparison())
-        return node
+            if open_ifs:
+                open_ifs[-1][1].append(statement)
+            else:
+                yield statement
+
+    def statement(self):
+        if self.current_token.type == 'ID':
+            return self.assignment_statement()
+        elif self.current_token.type == 'PRINT':
+            return self.print_statement()
+        elif self.current_token.type == 'IF':
+            return self.if_statement()
+        else:
+            return self.logical_expression()
 
-    def comparison(self):
-        node = self.expression()
-        while self.current_token is not None and self.current_token.type == 'COMPARE':
-            token = self.current_token
-            self.eat('COMPARE')
-            node = BinaryOperation(left=node, operator=token.value, right=self.expression())
-        return node
-
-    def expression(self):
-        node = self.term()
-        while self.current_token is not None and self.current_token.type == 'OP' and self.current_token.value in (
-                '+', '-'):
-            token = self.current_token
-            if token.value == '+':
-                self.eat('OP')
-            elif token.value == '-':
-                self.eat('OP')
-            node = BinaryOperation(left=node, operator=token.value, right=self.term())
-        return node
-
-    def term(self):
-        """Parse a term from the list of tokens."""
-        node = self.factor()
-        while self.current_token is not None and self.current_token.type == 'OP' and self.current_token.value in (
-                '*', '/'):
-            token = self.current_token
-            if token.value == '*':
-                self.eat('OP')
-            elif token.value == '/':
-                self.eat('OP')
+    def logical_expression(self, min_power=1):
+        """Parse an expression by precedence climbing over BINDING_POWERS.
 
-            node = BinaryOperation(left=node, operator=token.value, right=self.factor())
+        Operators binding less tightly than min_power end the expression and
+        are left to the caller; the right operand of an operator is parsed
+        with a higher min_power, which makes operators left-associative.
+        This replaces a method per precedence level, so a lone literal costs
+        two calls instead of five.
+        """
+        token = self.current_token
+        if token is not None and token.type == 'LPAREN':
+            self.next_token()
+            node = self.logical_expression()
+            self.eat('RPAREN')
+        else:
+            node = self.primary()
 
-        return node
+        while True:
+            token = self.current_token
+            if token is None or token.type not in OPERATOR_TOKEN_TYPES:
+                return node
+            power = BINDING_POWERS[token.value]
+            if power < min_power:
+                return node
+            self.next_token()
+            right = self.logical_expression(power + 1)
+            node = BinaryOperation(node, token.value, right, token.line, token.column)
 
-    def factor(self):
-        """Handle factors which can be numbers, variables, or expressions in parentheses."""
+    def primary(self):
+        """Parse a number, variable, call, array or string."""
         token = self.current_token
+        if token is None:
+            raise Exception("Unexpected end of input.")
         if token.type == 'NUMBER':
-            self.eat('NUMBER')
-            return Number(token.value)
+            self.next_token()
+            return Number(token.value, token.line, token.column)
         elif token.type == 'ID':
-            self.eat('ID')
-            return Variable(token.value)
-        elif token.type == 'LPAREN':
-            self.eat('LPAREN')
-            node = self.logical_expression()
-            self.eat('RPAREN')
-            return node
+            self.next_token()
+            if self.current_token is not None and self.current_token.type == 'LPAREN':
+                return self.call(token)
+            return Variable(token.value, line=token.line, column=token.column)
+        elif token.type == 'LBRACKET':
+            self.next_token()
+            return ArrayLiteral(self.expression_list('RBRACKET'), token.line, token.column)
         elif token.type == 'STRING':
-            self.eat('STRING')
-            return String(token.value.replace('"', ''))
+            self.next_token()
+            return String(token.value.replace('"', ''), token.line, token.column)
         else:
             raise Exception(f'Unexpected token type: {token.type}')
 
+    def call(self, name_token):
+        if name_token.value not in BUILTINS:
+            raise Exception(f"Unknown function: {name_token.value} at line {name_token.line}")
+        self.eat('LPAREN')
+        arguments = self.expression_list('RPAREN')
+        error = argument_count_error(name_token.value, len(arguments))
+        if error:
+            raise Exception(f"{error} at line {name_token.line}")
+        return Call(name_token.value, arguments, name_token.line, name_token.column)
+
+    def expression_list(self, closing):
+        """Parse comma separated expressions up to and including the closing token."""
+        expressions = []
+        while self.current_token is not None and self.current_token.type != closing:
+            if expressions:
+                self.eat('COMMA')
+            expressions.append(self.logical_expression())
+        self.eat(closing)
+        return expressions
+
     def assignment_statement(self):
-        var_name = self.current_token.value
+        token = self.current_token
         self.eat('ID')
         self.eat('ASSIGN')
         expr = self.logical_expression()
         self.eat('END')
-        return AssignmentStatement(Variable(var_name), expr)
+        variable = Variable(token.value, line=token.line, column=token.column)
+        return AssignmentStatement(variable, expr, token.line, token.column)
 
     def print_statement(self):
+        token = self.current_token
         self.eat('PRINT')
         expr = self.logical_expression()
         self.eat('END')
-        return PrintStatement(expr)
+        return PrintStatement(expr, token.line, token.column)
 
     def if_statement(self):
+        # iter_statements() parses the blocks and yields the if statement
+        # once they are closed.
+        return next(self.iter_statements())
+
+    def if_header(self):
+        """Parse ``if (condition)``; the blocks are filled in by iter_statements()."""
+        token = self.current_token
         self.eat('IF')
         self.eat('LPAREN')
         condition = self.logical_expression()
         self.eat('RPAREN')
-        true_block = self.parse()
-        false_block = None
-        if self.current_token is not None and self.current_token.type == 'ELSE':
-            self.eat('ELSE')
-            false_block = self.parse()
-
-        return IfStatement(condition, true_block, false_block)
+        return IfStatement(condition, None, None, token.line, token.column)
@@ -0,0 +1,130 @@
+import time
+
+from src.ast import BinaryOperation
+from src.interpreter import Interpreter
+
+
+class Timing:
+    """Hit count and times of one entry of a profile.
+
+    ``total`` includes the time spent in child nodes, counted once even when
+    nodes of the same entry are nested; ``own`` excludes it.
+    """
+
+    __slots__ = ('hits', 'total', 'own', 'active')
+
+    def __init__(self):
+        self.hits = 0
+        self.total = 0.0
+        self.own = 0.0
+        self.active = 0  # Nesting depth, so recursive entries aren't counted twice
+
+
+class Profile:
+    """Timings collected by ProfilingInterpreter.
+
+    Entries are kept per node type, per operator of binary operations and
+    per source line, and ``stacks`` holds the own time of every distinct
+    path of nodes from the root, for collapsed-stack output.
+    """
+
+    def __init__(self):
+        self.node_types = {}
+        self.operators = {}
+        self.lines = {}
+        self.stacks = {}
+
+    def enter(self, table, key):
+        timing = table.get(key)
+        if timing is None:
+            timing = table[key] = Timing()
+        timing.hits += 1
+        timing.active += 1
+        return timing
+
+    @staticmethod
+    def leave(timing, elapsed, own):
+        timing.active -= 1
+        if not timing.active:
+            timing.total += elapsed
+        timing.own += own
+
+    def report(self, limit=20):
+        """Return the entries of each table sorted by total time."""
+        sections = [('node type', self.node_types), ('operator', self.operators), ('line', self.lines)]
+        lines = []
+        for title, table in sections:
+            if not table:
+                continue
+            if lines:
+                lines.append('')
+            lines.append(f"{'by ' + title:<20} {'hits':>10} {'total (s)':>12} {'own (s)':>12}")
+            entries = sorted(table.items(), key=lambda entry: entry[1].total, reverse=True)
+            for key, timing in entries[:limit]:
+                lines.append(f"{key!s:<20} {timing.hits:>10} {timing.total:>12.6f} {timing.own:>12.6f}")
+        return '\n'.join(lines)
+
+    def collapsed_stacks(self):
+        """Return the stacks in the collapsed format flamegraph tools read.
+
+        Every line is a semicolon separated path of frames followed by its
+        own time in microseconds.
+        """
+        lines = []
+        for stack, own in sorted(self.stacks.items()):
+            microseconds = round(own * 1e6)
+            if microseconds:
+                lines.append(f"{';'.join(stack)} {microseconds}")
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def write_collapsed_stacks(self, filename):
+        with open(filename, 'w') as file:
+            file.write(self.collapsed_stacks())
+
+
+def frame_name(node):
+    name = type(node).__name__
+    if isinstance(node, BinaryOperation):
+        name += f' {node.operator}'
+    if node.line is not None:
+        name += f' (line {node.line})'
+    return name
+
+
+class ProfilingInterpreter(Interpreter):
+    """Tree-walking interpreter that times every node it visits.
+
+    Profiling lives entirely in this subclass, so the plain Interpreter pays
+    nothing for it. Several instances can share one Profile, for example one
+    per statement when streaming.
+    """
+
+    def __init__(self, ast, output=None, profile=None, limits=None):
+        super().__init__(ast, output, limits)
+        self.profile = profile if profile is not None else Profile()
+        self.frames = []
+        self.child_times = []
+
+    def visit(self, node):
+        profile = self.profile
+        timings = [profile.enter(profile.node_types, type(node).__name__)]
+        if isinstance(node, BinaryOperation):
+            timings.append(profile.enter(profile.operators, node.operator))
+        if node.line is not None:
+            timings.append(profile.enter(profile.lines, node.line))
+        self.frames.append(frame_name(node))
+        self.child_times.append(0.0)
+
+        start = time.perf_counter()
+        try:
+            return super().visit(node)
+        finally:
+            elapsed = time.perf_counter() - start
+            own = elapsed - self.child_times.pop()
+            if self.child_times:
+                self.child_times[-1] += elapsed
+            for timing in timings:
+                profile.leave(timing, elapsed, own)
+            stack = tuple(self.frames)
+            profile.stacks[stack] = profile.stacks.get(stack, 0.0) + own
+            self.frames.pop()
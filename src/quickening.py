@@ -0,0 +1,240 @@
+import operator
+
+from src.ast import BinaryOperation, Number, String, Variable
+from src.closure import OPERATIONS
+from src.interpreter import Interpreter
+
+# Executions with the same operand types before a site is specialized, and
+# misses after which a specialized site falls back to the generic path.
+QUICKEN_AFTER = 8
+DEOPTIMIZE_AFTER = 4
+
+# Executions a site waits before trying again when its operand types have
+# no specialization or it was deoptimized.
+BACKOFF = 64
+
+NUMBER_TYPES = (int, float, bool)
+
+NOT_SEEN = object()
+
+
+def build_specializations():
+    """Return {(operator, left type, right type): function}.
+
+    Each function gives the same result as the generic operation for
+    operands of exactly those types, but is a C function where the generic
+    one may not be: && and || on two bools become & and |.
+    """
+    arithmetic = {'+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv}
+    comparisons = {'==': operator.eq, '!=': operator.ne, '<': operator.lt, '>': operator.gt,
+                   '<=': operator.le, '>=': operator.ge}
+    specializations = {}
+    for left_type in NUMBER_TYPES:
+        for right_type in NUMBER_TYPES:
+            for symbol, function in {**arithmetic, **comparisons}.items():
+                specializations[symbol, left_type, right_type] = function
+    for symbol, function in comparisons.items():
+        specializations[symbol, str, str] = function
+    specializations['+', str, str] = operator.add
+    specializations['&&', bool, bool] = operator.and_
+    specializations['||', bool, bool] = operator.or_
+    return specializations
+
+
+SPECIALIZATIONS = build_specializations()
+
+
+class Site:
+    """Inline cache of one BinaryOperation node.
+
+    While ``quick`` is None the node runs on the generic path and the site
+    counts how many times in a row it saw the same operand types. Once it is
+    warm, ``quick`` is set to a function of the environment that evaluates
+    the node for exactly those types; see QuickeningInterpreter.
+    """
+
+    __slots__ = ('node', 'generic', 'left_type', 'right_type', 'quick', 'count', 'misses',
+                 'hits', 'total_misses', 'specializations', 'deoptimizations')
+
+    def __init__(self, node):
+        if node.operator not in OPERATIONS:
+            raise Exception(f"Unknown operator: {node.operator}")
+        self.node = node
+        self.generic = OPERATIONS[node.operator]
+        self.left_type = None
+        self.right_type = None
+        self.quick = None
+        self.count = 0
+        self.misses = 0
+        self.hits = 0  # Kept in a list while specialized, see specialize()
+        self.total_misses = 0
+        self.specializations = 0
+        self.deoptimizations = 0
+
+    def evaluate(self, interpreter, left, right):
+        """Run the generic operation, specializing the site once it is warm."""
+        left_type, right_type = type(left), type(right)
+        if left_type is self.left_type and right_type is self.right_type:
+            self.count += 1
+            if self.count >= QUICKEN_AFTER:
+                operation = SPECIALIZATIONS.get((self.node.operator, left_type, right_type))
+                if operation is None:
+                    self.count = -BACKOFF
+                else:
+                    self.specialize(interpreter, operation)
+        elif self.count >= 0:
+            self.left_type, self.right_type = left_type, right_type
+            self.count = 1
+        else:
+            self.count += 1  # Backing off
+            if self.count == 0:
+                self.left_type = self.right_type = None
+        return self.generic(left, right)
+
+    def miss(self, left, right):
+        """Called by the specialized function when its type guard fails."""
+        self.total_misses += 1
+        self.misses += 1
+        if self.misses >= DEOPTIMIZE_AFTER:
+            self.deoptimize()
+        return self.generic(left, right)
+
+    def deoptimize(self):
+        self.hits += self.quick.hits[0]
+        self.deoptimizations += 1
+        self.quick = None
+        self.count = -BACKOFF
+
+    def specialize(self, interpreter, operation):
+        """Set ``quick`` to a function evaluating the node for the current types.
+
+        Variable and literal operands are read directly instead of through
+        the interpreter's visit(). The type of a literal operand can't
+        change, so it is not checked.
+        """
+        node, left_type, right_type, miss = self.node, self.left_type, self.right_type, self.miss
+        hits = [0]
+        left_node, right_node = node.left, node.right
+        if isinstance(right_node, (Number, String)):
+            constant = right_node.value
+            if isinstance(left_node, Variable):
+                name = left_node.name
+
+                def quick(environment):
+                    left = environment[name]
+                    if type(left) is left_type:
+                        hits[0] += 1
+                        return operation(left, constant)
+                    return miss(left, constant)
+            else:
+                visit = operand_visitor(interpreter, left_node)
+
+                def quick(environment):
+                    left = visit(left_node)
+                    if type(left) is left_type:
+                        hits[0] += 1
+                        return operation(left, constant)
+                    return miss(left, constant)
+        elif isinstance(left_node, Variable) and isinstance(right_node, Variable):
+            left_name, right_name = left_node.name, right_node.name
+
+            def quick(environment):
+                left, right = environment[left_name], environment[right_name]
+                if type(left) is left_type and type(right) is right_type:
+                    hits[0] += 1
+                    return operation(left, right)
+                return miss(left, right)
+        else:
+            visit_left = operand_visitor(interpreter, left_node)
+            visit_right = operand_visitor(interpreter, right_node)
+
+            def quick(environment):
+                left, right = visit_left(left_node), visit_right(right_node)
+                if type(left) is left_type and type(right) is right_type:
+                    hits[0] += 1
+                    return operation(left, right)
+                return miss(left, right)
+
+        quick.hits = hits
+        self.quick = quick
+        self.misses = 0
+        self.specializations += 1
+
+    @property
+    def total_hits(self):
+        return self.hits + (self.quick.hits[0] if self.quick is not None else 0)
+
+
+def operand_visitor(interpreter, node):
+    # Nested operations go straight to visit_binary_operation(), skipping
+    # the type checks of visit().
+    if isinstance(node, BinaryOperation):
+        return interpreter.visit_binary_operation
+    return interpreter.visit
+
+
+class QuickeningStats:
+    def __init__(self, sites=()):
+        self.sites = 0
+        self.specialized = 0
+        self.hits = 0
+        self.misses = 0
+        self.specializations = 0
+        self.deoptimizations = 0
+        for site in sites:
+            if site is None:
+                continue  # Ran only once
+            self.sites += 1
+            self.specialized += site.quick is not None
+            self.hits += site.total_hits
+            self.misses += site.total_misses
+            self.specializations += site.specializations
+            self.deoptimizations += site.deoptimizations
+
+    def report(self):
+        return (f"Quickening: {self.specialized} of {self.sites} operations specialized, "
+                f"{self.hits} hits, {self.misses} misses, {self.deoptimizations} deoptimizations")
+
+
+class QuickeningInterpreter(Interpreter):
+    """Tree-walking interpreter whose binary operations specialize themselves.
+
+    Every BinaryOperation node gets a Site the second time it runs. Once the
+    site has seen QUICKEN_AFTER executions in a row with the same operand
+    types, the node is evaluated by a function specialized for those types,
+    its operator and the shape of its operands. This skips the comparison
+    chain on the operator string and the visit() dispatch of variable and
+    literal operands. If the types change, the generic operation is used
+    instead, and after DEOPTIMIZE_AFTER such misses the site is deoptimized
+    and warms up again.
+
+    Sites are kept by the interpreter, so the AST is never modified and
+    specializations persist across interpret() calls. Only nodes that run
+    repeatedly benefit, e.g. when the same program is interpreted many times.
+    """
+
+    def __init__(self, ast, output=None, limits=None):
+        super().__init__(ast, output, limits)
+        self.sites = {}
+
+    def visit_binary_operation(self, bin_op):
+        site = self.sites.get(bin_op, NOT_SEEN)
+        if site is not None and site is not NOT_SEEN and site.quick is not None:
+            return site.quick(self.environment)
+        left = self.visit(bin_op.left)
+        right = self.visit(bin_op.right)
+        if site is NOT_SEEN:
+            # Most nodes of a script run only once, so a Site is only made
+            # for nodes that run again.
+            operation = OPERATIONS.get(bin_op.operator)
+            if operation is None:
+                raise Exception(f"Unknown operator: {bin_op.operator}")
+            self.sites[bin_op] = None
+            return operation(left, right)
+        if site is None:
+            site = self.sites[bin_op] = Site(bin_op)
+        return site.evaluate(self, left, right)
+
+    def stats(self):
+        """Return the specialization counters summed over all sites."""
+        return QuickeningStats(self.sites.values())
@@ -1,11 +1,14 @@
-from src.interpreter import Interpreter
+import argparse
+
+from src.engines import ENGINES, DEFAULT_ENGINE, get_engine
 from src.lexer import Lexer
 from src.parser import Parser
 
 
 class REPL:
-    def __init__(self):
+    def __init__(self, engine=DEFAULT_ENGINE):
         self.environment = {}
+        self.engine = get_engine(engine)
 
     def start(self):
         print("Welcome to the interactive language REPL. Type 'exit' to quit.")
@@ -24,7 +27,7 @@ class REPL:
                 ast = parser.parse()
 
                 # Interpret AST
-                interpreter = Interpreter(ast)
+                interpreter = self.engine(ast)
                 interpreter.environment = self.environment  # Use the same environment
                 interpreter.interpret()
 
@@ -33,5 +36,9 @@ class REPL:
 
 
 if __name__ == "__main__":
-    repl = REPL()
+    arg_parser = argparse.ArgumentParser(description="Start the interactive REPL.")
+    arg_parser.add_argument('--engine', choices=sorted(ENGINES), default=DEFAULT_ENGINE,
+                            help="execution engine (default: %(default)s)")
+    args = arg_parser.parse_args()
+    repl = REPL(engine=args.engine)
     repl.start()
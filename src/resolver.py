@@ -0,0 +1,92 @@
+from src.ast import Block, PrintStatement, AssignmentStatement, IfStatement, BinaryOperation, Variable, ArrayLiteral, Call
+
+
+class Unbound:
+    """Marker stored in slots whose variable has not been assigned yet."""
+
+    def __repr__(self):
+        return '<unbound>'
+
+
+UNBOUND = Unbound()
+
+
+class Resolver:
+    """Give every distinct variable name an integer slot.
+
+    resolve() stores the slot on each Variable node, so engines can keep
+    variables in a preallocated list instead of hashing names into a dict.
+    Slots are numbered in order of first appearance, which makes resolving
+    the same tree twice produce the same numbering. ``names`` maps slots back
+    to names; load() and store() move values between a slot list and a
+    name-keyed environment dict.
+
+    It also tracks which variables are definitely assigned at every read, and
+    clears ``may_be_unbound`` on those reads so engines can skip the unbound
+    check for them.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.slots = {}
+
+    def slot(self, name):
+        if name not in self.slots:
+            self.slots[name] = len(self.names)
+            self.names.append(name)
+        return self.slots[name]
+
+    def resolve(self, node):
+        self.visit(node, set())
+        return node
+
+    def visit(self, node, assigned):
+        """Resolve node; ``assigned`` holds the names definitely assigned so far."""
+        if isinstance(node, Block):
+            for statement in node.statements:
+                self.visit(statement, assigned)
+        elif isinstance(node, AssignmentStatement):
+            # The value is resolved first so slots follow evaluation order.
+            self.visit(node.value, assigned)
+            node.variable.slot = self.slot(node.variable.name)
+            assigned.add(node.variable.name)
+        elif isinstance(node, PrintStatement):
+            self.visit(node.value, assigned)
+        elif isinstance(node, IfStatement):
+            self.visit(node.condition, assigned)
+            true_assigned = set(assigned)
+            self.visit(node.true_block, true_assigned)
+            false_assigned = set(assigned)
+            if node.false_block:
+                self.visit(node.false_block, false_assigned)
+            assigned |= true_assigned & false_assigned
+        elif isinstance(node, BinaryOperation):
+            self.visit(node.left, assigned)
+            self.visit(node.right, assigned)
+        elif isinstance(node, ArrayLiteral):
+            for element in node.elements:
+                self.visit(element, assigned)
+        elif isinstance(node, Call):
+            for argument in node.arguments:
+                self.visit(argument, assigned)
+        elif isinstance(node, Variable):
+            node.slot = self.slot(node.name)
+            node.may_be_unbound = node.name not in assigned
+
+    def load(self, environment):
+        return load_slots(self.names, environment)
+
+    def store(self, slots, environment):
+        store_slots(self.names, slots, environment)
+
+
+def load_slots(names, environment):
+    """Return a slot list initialised from an environment dict."""
+    return [environment.get(name, UNBOUND) for name in names]
+
+
+def store_slots(names, slots, environment):
+    """Copy every assigned slot back into an environment dict."""
+    for name, value in zip(names, slots):
+        if value is not UNBOUND:
+            environment[name] = value
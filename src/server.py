@@ -0,0 +1,337 @@
+"""Long-running server that runs scripts for src.client.
+
+Start it once and keep it running:
+
+    python -m src.server --socket /tmp/scl.sock --max-concurrency 4
+
+Every run in the server skips interpreter startup and module imports, and
+with --cache-dir parsed programs are shared by all requests. With --isolate
+every script runs in a process of its own, forked from the warmed-up server.
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+from concurrent.futures import ThreadPoolExecutor
+
+from src.cache import DEFAULT_MAX_SIZE, ProgramCache
+from src.engines import DEFAULT_ENGINE, get_engine
+from src.execute import add_limit_arguments, error_message, limits_from_args, parse_source, run_file, \
+    run_statements
+from src.forkserver import ForkServer, warm_up
+from src.limits import Limits
+from src.optimizer import DEFAULT_OPT_LEVEL
+from src.output import BufferedSink
+from src.typecheck import check
+
+DEFAULT_SOCKET = os.path.join(os.environ.get('TMPDIR', '/tmp'), 'scl-server.sock')  # Same as src.client
+# Largest request line, which may hold a whole script's source.
+MAX_REQUEST_SIZE = 64 * 1024 * 1024
+# Output chunks queued for a client before the script waits for them to be sent.
+MAX_QUEUED_CHUNKS = 16
+
+# Exit statuses sent back to the client.
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_BAD_REQUEST = 2
+
+
+class Request:
+    """A script to run and the execute.py options to run it with.
+
+    Requests arrive as one line of JSON with either ``path`` (a file the
+    server can read) or ``source``, and optionally ``engine``,
+    ``opt_level``, ``stream``, ``mmap``, ``typecheck`` and ``limits``, an
+    object with any of the keyword arguments of Limits.
+    """
+
+    def __init__(self, path=None, source=None, engine=DEFAULT_ENGINE, opt_level=DEFAULT_OPT_LEVEL, stream=False,
+                 mmap=False, typecheck=False, limits=None):
+        if (path is None) == (source is None):
+            raise ValueError("A request needs either a path or a source")
+        get_engine(engine)  # Fail early on unknown engines
+        if limits is not None:
+            if not isinstance(limits, dict):
+                raise ValueError("limits must be a JSON object")
+            for name, cap in limits.items():
+                if cap is not None and (isinstance(cap, bool) or not isinstance(cap, (int, float)) or cap < 0):
+                    raise ValueError(f"The {name} limit must be a number of at least 0")
+            limits = Limits(**limits)
+        self.path = path
+        self.source = source
+        self.engine = engine
+        self.opt_level = opt_level
+        self.stream = stream
+        self.mmap = mmap
+        self.typecheck = typecheck
+        self.limits = limits
+
+    @classmethod
+    def from_json(cls, line):
+        fields = json.loads(line)
+        if not isinstance(fields, dict):
+            raise ValueError("A request must be a JSON object")
+        return cls(**fields)
+
+    @property
+    def filename(self):
+        return self.path if self.path is not None else '<source>'
+
+
+def encode(message):
+    return json.dumps(message).encode() + b'\n'
+
+
+class ChunkStream:
+    """File-like stream that hands written text to the event loop's queue.
+
+    It is written from worker threads, so chunks are queued thread-safely;
+    BufferedSink batches the printed lines into large chunks first. When
+    the queue is full, the script waits until the client has taken some of
+    its output.
+    """
+
+    def __init__(self, loop, queue):
+        self.loop = loop
+        self.queue = queue
+
+    def write(self, text):
+        asyncio.run_coroutine_threadsafe(self.queue.put(text), self.loop).result()
+
+    def flush(self):
+        pass
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self.queue.put(None), self.loop).result()
+
+
+class ResultStream:
+    """File-like stream that writes text as output messages to a forked child's result pipe."""
+
+    def __init__(self, result):
+        self.result = result
+
+    def write(self, text):
+        self.result.write(encode({'output': text}))
+        self.result.flush()
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class ScriptServer:
+    """Run scripts sent over a socket, at most ``max_concurrency`` at a time.
+
+    Scripts run on a thread pool so the event loop keeps accepting clients
+    while they run. Every request gets a new interpreter and environment,
+    so nothing leaks from one script into another. Printed output is sent
+    back in chunks while the script runs.
+
+    With isolate, each script runs in a child process instead, taken from
+    a ForkServer pool of ``max_concurrency`` idle children. The server then
+    has no threads, so forking it is safe. A script can't change anything
+    in the server, and is killed if its client disconnects.
+    """
+
+    def __init__(self, max_concurrency=None, cache_dir=None, cache_max_size=DEFAULT_MAX_SIZE, isolate=False,
+                 limits=None):
+        self.max_concurrency = max_concurrency or os.cpu_count() or 1
+        self.limits = limits  # Copied for every request
+        if isolate:
+            self.executor = None
+            self.forkserver = ForkServer(self.run_job, self.max_concurrency)
+        else:
+            self.executor = ThreadPoolExecutor(self.max_concurrency)
+            self.forkserver = None
+        self.cache = ProgramCache(cache_dir, cache_max_size) if cache_dir else None
+        self.slots = None  # Semaphore of the server's event loop, see start()
+        # asyncio only keeps weak references to tasks, and once the client
+        # has hung up, nothing else refers to the task running its script.
+        self.tasks = set()
+        self.server = None
+
+    async def start(self, socket_path=None, host=None, port=None):
+        """Listen on a Unix socket, or on host and port if a port is given."""
+        self.slots = asyncio.Semaphore(self.max_concurrency)
+        if self.forkserver is not None:
+            warm_up()
+            self.forkserver.start()
+        if port is not None:
+            self.server = await asyncio.start_server(self.handle, host, port, limit=MAX_REQUEST_SIZE)
+        else:
+            self.server = await asyncio.start_unix_server(self.handle, socket_path, limit=MAX_REQUEST_SIZE)
+        if self.forkserver is not None:
+            self.forkserver.inherited_fds.update(sock.fileno() for sock in self.server.sockets)
+        return self.server
+
+    async def serve_forever(self, socket_path=None, host=None, port=None):
+        server = await self.start(socket_path, host, port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+        if self.forkserver is not None:
+            self.forkserver.close()
+        else:
+            self.executor.shutdown(wait=False)
+
+    async def handle(self, reader, writer):
+        task = asyncio.current_task()
+        self.tasks.add(task)
+        # Children forked meanwhile must not keep the client's connection open.
+        connection = writer.get_extra_info('socket').fileno()
+        if self.forkserver is not None:
+            self.forkserver.inherited_fds.add(connection)
+        try:
+            try:
+                request = Request.from_json(await reader.readline())
+            except Exception as e:
+                await self.send(writer, {'exit': EXIT_BAD_REQUEST, 'error': f"Bad request: {e}"})
+                return
+            async with self.slots:
+                if self.forkserver is not None:
+                    await self.run_isolated(request, writer)
+                else:
+                    await self.run(request, writer)
+        except ConnectionError:
+            pass  # The client went away; its script still runs to the end
+        finally:
+            if self.forkserver is not None:
+                self.forkserver.inherited_fds.discard(connection)  # Before the transport closes it
+            writer.close()
+            self.tasks.discard(task)
+
+    async def run(self, request, writer):
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(MAX_QUEUED_CHUNKS)
+        result = loop.run_in_executor(self.executor, self.execute, request, ChunkStream(loop, queue))
+        disconnected = False
+        while True:
+            chunk = await queue.get()
+            if chunk is None:
+                break
+            if not disconnected:
+                try:
+                    await self.send(writer, {'output': chunk})
+                except ConnectionError:
+                    disconnected = True  # Keep draining until the script ends
+        status, error = await result
+        if disconnected:
+            raise ConnectionResetError()
+        await self.send(writer, {'exit': status, 'error': error})
+
+    async def run_isolated(self, request, writer):
+        loop = asyncio.get_running_loop()
+        worker = self.forkserver.take()
+        await self.forkserver.submit(worker, request)
+        self.forkserver.start()
+        reader = asyncio.StreamReader(MAX_REQUEST_SIZE)
+        transport, _ = await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader),
+                                                    os.fdopen(worker.result_fd, 'rb', 0))
+        try:
+            # The child writes messages of the protocol, so they are passed on as they are.
+            line = await reader.readline()
+            while line:
+                writer.write(line)
+                await writer.drain()
+                line = await reader.readline()
+        except ConnectionError:
+            os.kill(worker.pid, signal.SIGKILL)
+            raise
+        finally:
+            transport.close()
+            status = await worker.wait_async()
+        if status != 0:  # It died before sending its exit message
+            await self.send(writer, {'exit': EXIT_ERROR, 'error': f"Error: the script's process exited with {status}"})
+
+    @staticmethod
+    async def send(writer, message):
+        writer.write(encode(message))
+        await writer.drain()
+
+    def run_job(self, request, result):
+        """Run request in a forked child, writing its messages to result."""
+        status, error = self.execute(request, ResultStream(result))
+        result.write(encode({'exit': status, 'error': error}))
+
+    def execute(self, request, stream):
+        """Run request on a worker thread or in a child; return (exit status, error message)."""
+        output = BufferedSink(stream)
+        if request.limits is not None:
+            limits = request.limits.capped(self.limits)  # A request may only lower the server's limits
+        else:
+            limits = self.limits.copy() if self.limits is not None else None
+        try:
+            if request.path is not None:
+                run_file(request.path, output, request.engine, request.opt_level, request.stream, request.mmap,
+                         None if request.stream else self.cache, typecheck=request.typecheck, limits=limits)
+            else:
+                self.run_source(request, output, limits)
+            return EXIT_OK, None
+        except Exception as e:
+            return EXIT_ERROR, error_message(request.filename, e)
+        finally:
+            try:
+                output.flush()
+            finally:
+                stream.close()
+
+    def run_source(self, request, output, limits=None):
+        engine = get_engine(request.engine)
+        if request.stream:
+            run_statements(request.source, engine, request.opt_level, output, request.typecheck, limits)
+            return
+        if self.cache is None:
+            ast, _ = parse_source(request.source, request.opt_level)
+        else:
+            key = self.cache.key(request.source.encode(), request.opt_level)
+            program = self.cache.load(key)
+            if program is None:
+                program = parse_source(request.source, request.opt_level)
+                self.cache.store(key, program)
+            ast, _ = program
+        if request.typecheck:
+            check(ast)
+        interpreter = engine(ast, output, limits=limits)
+        interpreter.interpret()
+        if limits is not None:
+            limits.check(len(interpreter.environment))
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Serve script runs to src.client over a local socket.")
+    arg_parser.add_argument('--socket', default=DEFAULT_SOCKET,
+                            help="Unix socket to listen on (default: %(default)s)")
+    arg_parser.add_argument('--host', default='127.0.0.1', help="host to listen on with --port")
+    arg_parser.add_argument('--port', type=int, help="listen on TCP instead of a Unix socket")
+    arg_parser.add_argument('--max-concurrency', type=int,
+                            help="scripts run at the same time, others wait (default: one per CPU)")
+    arg_parser.add_argument('--isolate', action='store_true',
+                            help="run every script in its own process, forked from a pool of warmed-up children")
+    arg_parser.add_argument('--cache-dir',
+                            help="cache parsed programs in this directory and reuse them across requests")
+    arg_parser.add_argument('--cache-max-size', type=int, default=DEFAULT_MAX_SIZE // (1024 * 1024),
+                            help="size cap of the cache directory in MB (default: %(default)s)")
+    add_limit_arguments(arg_parser)
+    args = arg_parser.parse_args(argv)
+
+    if args.port is None and os.path.exists(args.socket):
+        os.remove(args.socket)  # Left behind by a server that was killed
+    server = ScriptServer(args.max_concurrency, args.cache_dir, args.cache_max_size * 1024 * 1024, args.isolate,
+                          limits_from_args(args))
+    try:
+        asyncio.run(server.serve_forever(args.socket, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
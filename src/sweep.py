@@ -0,0 +1,272 @@
+import itertools
+
+from src.arrays import Array, BUILTINS
+from src.ast import Block, PrintStatement, AssignmentStatement, IfStatement, BinaryOperation, Number, String, Variable, \
+    ArrayLiteral, Call
+from src.closure import OPERATIONS
+from src.resolver import UNBOUND
+
+
+class Scalar:
+    """Expression value that is the same for every row of the batch."""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class RowErrors(Exception):
+    """Raised while evaluating a statement when it fails for some rows."""
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+class SweepResult:
+    """Final state of one environment of a sweep.
+
+    ``environment`` holds the variables as the tree-walking interpreter would
+    have left them, ``output`` the printed values and ``error`` the exception
+    that stopped this run, if any.
+    """
+
+    def __init__(self, environment, output, error=None):
+        self.environment = environment
+        self.output = output
+        self.error = error
+
+    @property
+    def failed(self):
+        return self.error is not None
+
+
+class Sweep:
+    """Run one program over a batch of initial environments at once.
+
+    The batch is evaluated column-wise: every variable is a column holding
+    one value per environment (a row), and each node of the program is
+    visited once for the whole batch instead of once per environment.
+    Literals and values computed only from literals stay scalars. An if
+    statement splits the rows by the value of its condition and runs each
+    branch on its share of them.
+
+    An error only stops the rows it occurs in. The statement is then run
+    again for the other rows, which is safe because expressions have no side
+    effects.
+    """
+
+    def __init__(self, ast):
+        self.ast = ast
+        self.columns = {}
+        self.partial = set()  # Names whose column has unassigned rows
+        self.outputs = []
+        self.errors = {}
+
+    def run(self, environments):
+        """Return a SweepResult for every environment, in the same order."""
+        environments = list(environments)
+        size = len(environments)
+        self.columns = {}
+        counts = {}
+        for row, environment in enumerate(environments):
+            for name, value in environment.items():
+                if name not in self.columns:
+                    self.columns[name] = [UNBOUND] * size
+                    counts[name] = 0
+                self.columns[name][row] = value
+                counts[name] += 1
+        self.partial = {name for name, count in counts.items() if count < size}
+        self.outputs = [[] for _ in range(size)]
+        self.errors = {}
+
+        self.visit_statement(self.ast, list(range(size)))
+        return [SweepResult(environment, self.outputs[row], self.errors.get(row))
+                for row, environment in enumerate(self.environments())]
+
+    def environments(self):
+        """Turn the columns back into one environment dict per row."""
+        environments = [{} for _ in self.outputs]
+        for name, column in self.columns.items():
+            if isinstance(column, Scalar):
+                value = column.value
+                for environment in environments:
+                    environment[name] = value
+            elif name in self.partial:
+                for environment, value in zip(environments, column):
+                    if value is not UNBOUND:
+                        environment[name] = value
+            else:
+                for environment, value in zip(environments, column):
+                    environment[name] = value
+        return environments
+
+    def live(self, rows):
+        errors = self.errors
+        return [row for row in rows if row not in errors] if errors else rows
+
+    def visit_statement(self, node, rows):
+        while rows:
+            try:
+                self.execute(node, rows)
+                return
+            except RowErrors as e:
+                self.errors.update(e.errors)
+                rows = self.live(rows)
+
+    def execute(self, node, rows):
+        if isinstance(node, Block):
+            for statement in node.statements:
+                rows = self.live(rows)
+                self.visit_statement(statement, rows)
+        elif isinstance(node, AssignmentStatement):
+            self.assign(node.variable.name, self.visit_expression(node.value, rows), rows)
+        elif isinstance(node, PrintStatement):
+            value = self.visit_expression(node.value, rows)
+            outputs = self.outputs
+            if isinstance(value, Scalar):
+                for row in rows:
+                    outputs[row].append(value.value)
+            else:
+                for row, item in zip(rows, value):
+                    outputs[row].append(item)
+        elif isinstance(node, IfStatement):
+            self.visit_if(node, rows)
+        else:
+            self.visit_expression(node, rows)
+
+    def visit_if(self, if_stmt, rows):
+        # Truth values are computed with apply() since arrays have none.
+        condition = self.apply(bool, [self.visit_expression(if_stmt.condition, rows)], rows)
+        if isinstance(condition, Scalar):
+            # Every row takes the same branch.
+            true_rows, false_rows = (rows, []) if condition.value else ([], rows)
+        else:
+            true_rows, false_rows = [], []
+            for row, value in zip(rows, condition):
+                (true_rows if value else false_rows).append(row)
+        if true_rows:
+            self.visit_statement(if_stmt.true_block, true_rows)
+        if false_rows and if_stmt.false_block:
+            self.visit_statement(if_stmt.false_block, false_rows)
+
+    def assign(self, name, value, rows):
+        size = len(self.outputs)
+        if len(rows) == size:
+            # Every row is assigned, so the column is simply replaced.
+            self.columns[name] = value
+            self.partial.discard(name)
+            return
+
+        column = self.columns.get(name)
+        if column is None:
+            column = [UNBOUND] * size
+            self.partial.add(name)
+        elif isinstance(column, Scalar):
+            column = [column.value] * size
+        else:
+            column = column[:]  # Columns are shared between variables, never modified
+        if isinstance(value, Scalar):
+            value = value.value
+            for row in rows:
+                column[row] = value
+        else:
+            for row, item in zip(rows, value):
+                column[row] = item
+        self.columns[name] = column
+        if name in self.partial and not any(item is UNBOUND for item in column):
+            self.partial.discard(name)
+
+    def visit_expression(self, node, rows):
+        """Return node's value as a Scalar or as a list aligned with rows."""
+        if isinstance(node, BinaryOperation):
+            return self.visit_binary_operation(node, rows)
+        elif isinstance(node, (Number, String)):
+            return Scalar(node.value)
+        elif isinstance(node, Variable):
+            return self.visit_variable(node.name, rows)
+        elif isinstance(node, ArrayLiteral):
+            elements = [self.visit_expression(element, rows) for element in node.elements]
+            return self.apply(lambda *values: Array.from_values(values), elements, rows)
+        elif isinstance(node, Call):
+            if node.name not in BUILTINS:
+                raise RowErrors({row: Exception(f"Unknown function: {node.name}") for row in rows})
+            arguments = [self.visit_expression(argument, rows) for argument in node.arguments]
+            return self.apply(BUILTINS[node.name], arguments, rows)
+        else:
+            raise Exception(f"Unknown node type: {type(node)}")
+
+    def visit_variable(self, name, rows):
+        column = self.columns.get(name)
+        if column is None:
+            raise RowErrors({row: KeyError(name) for row in rows})
+        if isinstance(column, Scalar):
+            return column
+        values = column if len(rows) == len(column) else [column[row] for row in rows]
+        if name in self.partial:
+            errors = {row: KeyError(name) for row, value in zip(rows, values) if value is UNBOUND}
+            if errors:
+                raise RowErrors(errors)
+        return values
+
+    def visit_binary_operation(self, bin_op, rows):
+        left = self.visit_expression(bin_op.left, rows)
+        right = self.visit_expression(bin_op.right, rows)
+        operation = OPERATIONS.get(bin_op.operator)
+        if operation is None:
+            raise RowErrors({row: Exception(f"Unknown operator: {bin_op.operator}") for row in rows})
+
+        if isinstance(left, Scalar) and isinstance(right, Scalar):
+            try:
+                return Scalar(operation(left.value, right.value))
+            except Exception as e:
+                raise RowErrors({row: e for row in rows})
+
+        try:
+            if isinstance(left, Scalar):
+                constant = left.value
+                return [operation(constant, item) for item in right]
+            elif isinstance(right, Scalar):
+                constant = right.value
+                return [operation(item, constant) for item in left]
+            return list(map(operation, left, right))
+        except Exception:
+            pass
+
+        # Some rows failed: find out which ones.
+        size = len(rows)
+        lefts = [left.value] * size if isinstance(left, Scalar) else left
+        rights = [right.value] * size if isinstance(right, Scalar) else right
+        errors = {}
+        for row, left_value, right_value in zip(rows, lefts, rights):
+            try:
+                operation(left_value, right_value)
+            except Exception as e:
+                errors[row] = e
+        raise RowErrors(errors)
+
+    def apply(self, function, values, rows):
+        """Call function row by row on values, each a Scalar or a column."""
+        if all(isinstance(value, Scalar) for value in values):
+            try:
+                return Scalar(function(*[value.value for value in values]))
+            except Exception as e:
+                raise RowErrors({row: e for row in rows})
+
+        columns = [itertools.repeat(value.value) if isinstance(value, Scalar) else value for value in values]
+        results = []
+        errors = {}
+        for row, arguments in zip(rows, zip(*columns)):
+            try:
+                results.append(function(*arguments))
+            except Exception as e:
+                errors[row] = e
+        if errors:
+            raise RowErrors(errors)
+        return results
+
+
+def sweep(ast, environments):
+    """Run ast once for every environment; return a list of SweepResults."""
+    return Sweep(ast).run(environments)
@@ -0,0 +1,148 @@
+from src.arrays import Array, BUILTINS
+from src.ast import Block, PrintStatement, AssignmentStatement, IfStatement, BinaryOperation, Number, String, Variable, \
+    ArrayLiteral, Call
+from src.interpreter import Interpreter
+
+# Python precedence of the arithmetic operators; an operand only needs
+# parentheses when it binds more loosely than its parent.
+ARITHMETIC_PRECEDENCE = {'+': 2, '-': 2, '*': 3, '/': 3}
+COMPARISONS = ('==', '!=', '<', '>', '<=', '>=')
+# && and || evaluate both operands like the other engines, so they cannot map
+# onto Python's short-circuiting ``and``/``or``.
+LOGICAL_HELPERS = {'&&': '_and', '||': '_or'}
+BOOLEAN_OPERATORS = {'&&': '&', '||': '|'}
+
+FUNCTION_NAME = '_program'
+# Builtin functions are available to the generated code under this prefix.
+BUILTIN_PREFIX = '_fn_'
+
+
+def _and(left, right):
+    return left and right
+
+
+def _or(left, right):
+    return left or right
+
+
+class Transpiler:
+    """Translate an AST into the source of an equivalent Python function.
+
+    Variables live in the ``env`` dict passed to the function, so the
+    environment keeps the same shape as with the tree-walking interpreter.
+    Printed values are passed to the ``write`` function it is given.
+
+    With check_limits, every statement is first counted down on the Limits
+    the function finds as ``_limits``.
+    """
+
+    def __init__(self, check_limits=False):
+        self.lines = []
+        self.check_limits = check_limits
+
+    def transpile(self, ast):
+        self.lines = [f'def {FUNCTION_NAME}(env, write):']
+        self.visit_statement(ast, 1)
+        if len(self.lines) == 1:
+            self.emit('pass', 1)
+        return '\n'.join(self.lines) + '\n'
+
+    def emit(self, line, depth):
+        self.lines.append('    ' * depth + line)
+
+    def visit_statement(self, node, depth):
+        if isinstance(node, Block):
+            for statement in node.statements:
+                if self.check_limits:
+                    self.emit('_limits.countdown -= 1', depth)
+                    self.emit('if _limits.countdown < 0: _limits.check(len(env))', depth)
+                self.visit_statement(statement, depth)
+        elif isinstance(node, AssignmentStatement):
+            self.emit(f'env[{node.variable.name!r}] = {self.visit_expression(node.value)}', depth)
+        elif isinstance(node, PrintStatement):
+            self.emit(f'write({self.visit_expression(node.value)})', depth)
+        elif isinstance(node, IfStatement):
+            self.emit(f'if {self.visit_expression(node.condition)}:', depth)
+            self.visit_body(node.true_block, depth + 1)
+            if node.false_block:
+                self.emit('else:', depth)
+                self.visit_body(node.false_block, depth + 1)
+        else:
+            # Bare expressions are evaluated for their errors and discarded.
+            self.emit(self.visit_expression(node), depth)
+
+    def visit_body(self, block, depth):
+        start = len(self.lines)
+        self.visit_statement(block, depth)
+        if len(self.lines) == start:
+            self.emit('pass', depth)
+
+    def visit_expression(self, node):
+        if isinstance(node, BinaryOperation):
+            return self.visit_binary_operation(node)
+        elif isinstance(node, (Number, String)):
+            return repr(node.value)
+        elif isinstance(node, Variable):
+            return f'env[{node.name!r}]'
+        elif isinstance(node, ArrayLiteral):
+            return f"_array([{', '.join(self.visit_expression(element) for element in node.elements)}])"
+        elif isinstance(node, Call):
+            if node.name not in BUILTINS:
+                raise Exception(f"Unknown function: {node.name}")
+            arguments = ', '.join(self.visit_expression(argument) for argument in node.arguments)
+            return f'{BUILTIN_PREFIX}{node.name}({arguments})'
+        else:
+            raise Exception(f"Unknown node type: {type(node)}")
+
+    def visit_binary_operation(self, bin_op):
+        operator = bin_op.operator
+        if operator in LOGICAL_HELPERS:
+            left = self.visit_expression(bin_op.left)
+            right = self.visit_expression(bin_op.right)
+            if bin_op.operand_types == (bool, bool):
+                # The type checker proved both operands are bools, for which
+                # & and | give the same result without a helper call.
+                return f'({left} {BOOLEAN_OPERATORS[operator]} {right})'
+            return f'{LOGICAL_HELPERS[operator]}({left}, {right})'
+        if operator in COMPARISONS:
+            # Parenthesize both sides so Python never chains comparisons.
+            left = self.visit_operand(bin_op.left, 2)
+            right = self.visit_operand(bin_op.right, 2)
+            return f'({left} {operator} {right})'
+        if operator in ARITHMETIC_PRECEDENCE:
+            # Operators are left associative: the left operand may share the
+            # parent's precedence, the right one has to bind tighter.
+            precedence = ARITHMETIC_PRECEDENCE[operator]
+            left = self.visit_operand(bin_op.left, precedence)
+            right = self.visit_operand(bin_op.right, precedence + 1)
+            return f'{left} {operator} {right}'
+        raise Exception(f"Unknown operator: {operator}")
+
+    def visit_operand(self, node, min_precedence):
+        code = self.visit_expression(node)
+        if isinstance(node, BinaryOperation) and ARITHMETIC_PRECEDENCE.get(node.operator, 9) < min_precedence:
+            return f'({code})'
+        return code
+
+
+def compile_program(ast, filename='<scl>', limits=None):
+    """Return a Python function f(environment, write) that runs the program."""
+    source = Transpiler(check_limits=limits is not None).transpile(ast)
+    namespace = {'_and': _and, '_or': _or, '_array': Array.from_values, '_limits': limits}
+    for name, function in BUILTINS.items():
+        namespace[BUILTIN_PREFIX + name] = function
+    exec(compile(source, filename, 'exec'), namespace)
+    return namespace[FUNCTION_NAME]
+
+
+class TranspiledInterpreter(Interpreter):
+    """Drop-in replacement for Interpreter that runs the program as CPython bytecode."""
+
+    def __init__(self, ast, output=None, limits=None):
+        super().__init__(ast, output, limits)
+        self.program = None
+
+    def interpret(self):
+        if self.program is None:
+            self.program = compile_program(self.ast, limits=self.limits)
+        self.program(self.environment, self.output.write)
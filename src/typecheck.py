@@ -0,0 +1,219 @@
+import itertools
+
+from src.arrays import Array, BUILTINS
+from src.ast import Block, PrintStatement, AssignmentStatement, IfStatement, BinaryOperation, Number, String, Variable, \
+    ArrayLiteral, Call
+from src.closure import OPERATIONS
+from src.optimizer import run_iteratively
+
+# Every type a value of the language can have at runtime. Inferred types are
+# frozensets of these; ANY is used wherever nothing is known.
+VALUE_TYPES = (int, float, bool, str, Array)
+ANY = frozenset(VALUE_TYPES)
+NUMBER_TYPES = frozenset([int, float, bool])
+SINGLE_TYPES = {value_type: frozenset([value_type]) for value_type in VALUE_TYPES}
+
+# Values the operations are tried on to build RESULT_TYPES. None of them is
+# zero or empty, so only type errors make an operation fail.
+SAMPLES = {int: 2, float: 2.5, bool: True, str: 'a', Array: Array.from_values([2.0])}
+
+BUILTIN_RESULT_TYPES = {
+    'sum': float,
+    'min': float,
+    'max': float,
+    'len': int,
+    'any': bool,
+    'all': bool,
+}
+
+
+def type_name(value_type):
+    return 'array' if value_type is Array else value_type.__name__
+
+
+def build_result_types():
+    """Return {(operator, left type, right type): result types}.
+
+    The table is built by applying the engines' own operations to a sample
+    value of each type, so it can't drift from what they do at runtime.
+    Combinations that raise are left out. && and || return one of their
+    operands, depending on its truth value.
+    """
+    result_types = {}
+    for operator, operation in OPERATIONS.items():
+        for left_type, right_type in itertools.product(VALUE_TYPES, repeat=2):
+            if operator in ('&&', '||'):
+                if left_type is not Array:  # Arrays have no truth value
+                    result_types[operator, left_type, right_type] = frozenset([left_type, right_type])
+                continue
+            try:
+                result = operation(SAMPLES[left_type], SAMPLES[right_type])
+            except Exception:
+                continue
+            result_types[operator, left_type, right_type] = frozenset([type(result)])
+    return result_types
+
+
+RESULT_TYPES = build_result_types()
+
+# Memo of result_types(); there are few distinct sets of types in practice.
+combined_result_types = {}
+
+
+def result_types(operator, left_types, right_types):
+    """Return the possible result types of an operation; empty if it always fails."""
+    key = (operator, left_types, right_types)
+    types = combined_result_types.get(key)
+    if types is None:
+        types = frozenset()
+        for left_type, right_type in itertools.product(left_types, right_types):
+            types |= RESULT_TYPES.get((operator, left_type, right_type), frozenset())
+        combined_result_types[key] = types
+    return types
+
+
+class TypeCheckError(Exception):
+    """Raised by check() with every definite type error of a program."""
+
+    def __init__(self, errors):
+        super().__init__('\n'.join(errors))
+        self.errors = errors
+
+
+class TypeChecker:
+    """Flow-sensitive type inference over a program.
+
+    Every expression gets the set of types its value can have, following
+    assignments in order and joining the two branches of an if statement.
+    Variables nobody assigned, such as those of a shared environment, can
+    hold anything. An operation is only reported when it fails for every
+    combination of its operand types. The branch an if statement with a
+    literal condition never takes is skipped, but other code that can't run
+    is checked like any other.
+
+    Inferred types are kept in ``types`` by node. A BinaryOperation whose
+    operands each have one known type, and that succeeds for them, gets
+    them in ``operand_types``, so backends can emit the operation for those
+    types without checking them at runtime.
+    """
+
+    def __init__(self):
+        self.environment = {}  # Name -> types; missing names can hold anything
+        self.types = {}
+        self.errors = []
+
+    def check(self, node):
+        """Infer the types of node; return the errors found so far."""
+        run_iteratively(self.visit_statement(node))
+        return self.errors
+
+    def error(self, node, message):
+        self.errors.append(f'{node.line}:{node.column}: {message}' if node.line is not None else message)
+
+    # The visit methods are generators driven by run_iteratively(), as in
+    # the Optimizer, so deeply nested programs don't hit the recursion limit.
+
+    def visit_statement(self, node):
+        if isinstance(node, Block):
+            for statement in node.statements:
+                yield self.visit_statement(statement)
+        elif isinstance(node, AssignmentStatement):
+            types = yield self.visit_expression(node.value)
+            self.environment[node.variable.name] = types
+            self.types[node.variable] = types
+        elif isinstance(node, PrintStatement):
+            yield self.visit_expression(node.value)
+        elif isinstance(node, IfStatement):
+            yield self.visit_if(node)
+        else:
+            yield self.visit_expression(node)
+
+    def visit_if(self, if_stmt):
+        if (yield self.visit_expression(if_stmt.condition)) == {Array}:
+            self.error(if_stmt, "the truth value of an array is ambiguous, use any() or all()")
+        condition = if_stmt.condition
+        if isinstance(condition, (Number, String)):
+            # Only the branch that runs, as at -O 0 nothing removed the other.
+            block = if_stmt.true_block if condition.value else if_stmt.false_block
+            if block:
+                yield self.visit_statement(block)
+            return
+        before = self.environment
+        self.environment = dict(before)
+        yield self.visit_statement(if_stmt.true_block)
+        true_environment = self.environment
+        self.environment = dict(before)
+        if if_stmt.false_block:
+            yield self.visit_statement(if_stmt.false_block)
+        # A name assigned in only one branch is left out, like an unknown one.
+        false_environment = self.environment
+        self.environment = {}
+        for name, types in true_environment.items():
+            other = false_environment.get(name)
+            if other is not None:
+                self.environment[name] = types if other is types else types | other
+
+    def visit_expression(self, node):
+        if isinstance(node, BinaryOperation):
+            types = yield self.visit_binary_operation(node)
+        elif isinstance(node, (Number, String)):
+            types = SINGLE_TYPES[type(node.value)]
+        elif isinstance(node, Variable):
+            types = self.environment.get(node.name, ANY)
+        elif isinstance(node, ArrayLiteral):
+            for element in node.elements:
+                element_types = yield self.visit_expression(element)
+                if not element_types & NUMBER_TYPES:
+                    self.error(node, f"array elements must be numbers, not {self.describe(element_types)}")
+            types = SINGLE_TYPES[Array]
+        elif isinstance(node, Call):
+            types = yield self.visit_call(node)
+        else:
+            raise Exception(f"Unknown node type: {type(node)}")
+        self.types[node] = types
+        return types
+
+    def visit_call(self, call):
+        arguments = []
+        for argument in call.arguments:
+            arguments.append((yield self.visit_expression(argument)))
+        if call.name not in BUILTINS:
+            self.error(call, f"unknown function {call.name}()")
+            return ANY
+        if len(arguments) != 1:
+            self.error(call, f"{call.name}() takes 1 argument, not {len(arguments)}")
+        elif Array not in arguments[0]:
+            self.error(call, f"{call.name}() expects an array, not {self.describe(arguments[0])}")
+        return SINGLE_TYPES[BUILTIN_RESULT_TYPES[call.name]]
+
+    def visit_binary_operation(self, bin_op):
+        left_types = yield self.visit_expression(bin_op.left)
+        right_types = yield self.visit_expression(bin_op.right)
+        types = result_types(bin_op.operator, left_types, right_types)
+        bin_op.operand_types = None
+        if not types:
+            self.error(bin_op, f"cannot apply {bin_op.operator} to {self.describe(left_types)} "
+                               f"and {self.describe(right_types)}")
+            return ANY  # Don't report the same mistake again further up
+        if len(left_types) == 1 and len(right_types) == 1:
+            bin_op.operand_types = (next(iter(left_types)), next(iter(right_types)))
+        return types
+
+    @staticmethod
+    def describe(types):
+        return ' or '.join(sorted(type_name(value_type) for value_type in types))
+
+
+def infer_types(ast):
+    """Run a TypeChecker over ast; return it, with its types and errors."""
+    checker = TypeChecker()
+    checker.check(ast)
+    return checker
+
+
+def check(ast):
+    """Annotate ast with inferred types; raise TypeCheckError on type errors."""
+    errors = infer_types(ast).errors
+    if errors:
+        raise TypeCheckError(errors)
+    return ast
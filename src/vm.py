@@ -0,0 +1,135 @@
+import operator
+
+from src.arrays import Array
+from src.compiler import Compiler, LOAD_CONST, LOAD_NAME, STORE_NAME, BINARY_OP, PRINT, POP_TOP, JUMP, \
+    POP_JUMP_IF_FALSE, LOAD_FAST, BUILD_ARRAY, CALL_FUNCTION, CHECK_LIMITS
+from src.interpreter import Interpreter
+from src.limits import count_variables
+from src.output import StdoutSink
+from src.resolver import UNBOUND, load_slots, store_slots
+
+# Indexed by the BINARY_OP argument, see compiler.OPERATORS. Both operands of
+# && and || are always evaluated, matching the tree-walking interpreter.
+BINARY_OPERATIONS = [
+    operator.add,
+    operator.sub,
+    operator.mul,
+    operator.truediv,
+    operator.eq,
+    operator.ne,
+    operator.lt,
+    operator.gt,
+    operator.le,
+    operator.ge,
+    lambda left, right: left and right,
+    lambda left, right: left or right,
+]
+
+
+class VM:
+    def __init__(self, code, environment=None, output=None, limits=None):
+        self.code = code
+        self.environment = {} if environment is None else environment
+        self.output = output if output is not None else StdoutSink()
+        self.limits = limits  # Used by CHECK_LIMITS instructions
+        self.program = self.link(code)
+
+    @staticmethod
+    def link(code):
+        """Resolve instruction arguments into the objects they refer to.
+
+        The flat CodeObject encoding indexes into the constants pool and the
+        operator table; linking replaces those indices with the values
+        themselves (and byte offsets with instruction indices) so the
+        dispatch loop never does a second lookup. Variable slots are kept as
+        they are and index the slot list the program runs against.
+        """
+        instructions = code.instructions
+        program = []
+        for pc in range(0, len(instructions), 2):
+            opcode, arg = instructions[pc], instructions[pc + 1]
+            if opcode == LOAD_CONST:
+                arg = code.constants[arg]
+            elif opcode == BINARY_OP:
+                arg = BINARY_OPERATIONS[arg]
+            elif opcode in (JUMP, POP_JUMP_IF_FALSE):
+                arg //= 2
+            program.append((opcode, arg))
+        return program
+
+    def run(self):
+        names = self.code.names
+        slots = load_slots(names, self.environment)
+        try:
+            self.execute(slots)
+        finally:
+            store_slots(names, slots, self.environment)
+
+    def execute(self, slots):
+        # Everything the loop touches is bound to a local to keep dispatch cheap.
+        program = self.program
+        names = self.code.names
+        write = self.output.write
+        unbound = UNBOUND
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        pc = 0
+        end = len(program)
+
+        while pc < end:
+            opcode, arg = program[pc]
+            pc += 1
+            if opcode == LOAD_FAST:
+                push(slots[arg])
+            elif opcode == LOAD_NAME:
+                value = slots[arg]
+                if value is unbound:
+                    raise KeyError(names[arg])
+                push(value)
+            elif opcode == LOAD_CONST:
+                push(arg)
+            elif opcode == BINARY_OP:
+                right = pop()
+                stack[-1] = arg(stack[-1], right)
+            elif opcode == STORE_NAME:
+                slots[arg] = pop()
+            elif opcode == POP_JUMP_IF_FALSE:
+                if not pop():
+                    pc = arg
+            elif opcode == JUMP:
+                pc = arg
+            elif opcode == PRINT:
+                write(pop())
+            elif opcode == POP_TOP:
+                pop()
+            elif opcode == CALL_FUNCTION:
+                arguments = stack[len(stack) - arg:]
+                del stack[len(stack) - arg:]
+                stack[-1] = stack[-1](*arguments)
+            elif opcode == BUILD_ARRAY:
+                elements = stack[len(stack) - arg:]
+                del stack[len(stack) - arg:]
+                push(Array.from_values(elements))
+            elif opcode == CHECK_LIMITS:
+                limits = self.limits
+                limits.countdown -= 1
+                if limits.countdown < 0:
+                    limits.check(count_variables(names, slots, self.environment))
+            else:
+                raise Exception(f"Unknown opcode: {opcode}")
+
+
+class VMInterpreter(Interpreter):
+    """Drop-in replacement for Interpreter that compiles the AST to bytecode."""
+
+    def __init__(self, ast, output=None, limits=None):
+        super().__init__(ast, output, limits)
+        self.vm = None
+
+    def interpret(self):
+        if self.vm is None:
+            self.vm = VM(Compiler(check_limits=self.limits is not None).compile(self.ast), limits=self.limits)
+        self.vm.environment = self.environment
+        self.vm.output = self.output
+        self.vm.run()
@@ -0,0 +1,151 @@
+import unittest
+from unittest import mock
+
+from src import arrays
+from src.arrays import Array, call_builtin
+from src.ast import ArrayLiteral, Call
+from src.engines import ALL_ENGINES, ENGINES
+from src.flat_ast import FlatAST
+from src.lexer import Lexer
+from src.output import ListSink
+from src.parser import Parser
+from src.sweep import sweep
+
+PROGRAMS = [
+    "a = [1, 2, 3]; b = a * 2 + 1; print b; print a / [2, 4, 8];",
+    "a = [1, 2.5, 4]; print a > 2; print 10 - a; print 2 * a == a + a; total = sum(a < 3);",
+    "x = 3; a = [x, x * 2, x + 1]; print max(a) - min(a); print len(a); print len([]);",
+    "a = [1, 0, 2]; if (any(a == 0)) { print \"zero\"; } if (all(a >= 0)) { print \"positive\"; }",
+    'print sum([1 + 1, (2 * 3)]); print [];',
+]
+
+
+def parse(code):
+    lexer = Lexer(code)
+    tokens = lexer.tokenize()
+    parser = Parser(tokens)
+    return parser.parse()
+
+
+def run(engine, code):
+    output = ListSink()
+    interpreter = engine(parse(code), output)
+    try:
+        interpreter.interpret()
+        error = None
+    except Exception as e:
+        error = str(e)
+    # Arrays compare element-wise, so compare their text instead.
+    environment = {name: str(value) for name, value in interpreter.environment.items()}
+    return environment, output.getvalue(), error
+
+
+class TestArray(unittest.TestCase):
+
+    def test_elementwise_arithmetic(self):
+        a = Array.from_values([1, 2, 3])
+        self.assertEqual((a + Array.from_values([10, 20, 30])).tolist(), [11.0, 22.0, 33.0])
+        self.assertEqual((a - 1).tolist(), [0.0, 1.0, 2.0])
+        self.assertEqual((1 - a).tolist(), [0.0, -1.0, -2.0])
+        self.assertEqual((a * 2.5).tolist(), [2.5, 5.0, 7.5])
+        self.assertEqual((6 / a).tolist(), [6.0, 3.0, 2.0])
+
+    def test_comparisons_give_masks(self):
+        a = Array.from_values([1, 2, 3])
+        self.assertEqual((a > 1).tolist(), [0.0, 1.0, 1.0])
+        self.assertEqual((1 < a).tolist(), [0.0, 1.0, 1.0])
+        self.assertEqual((a == Array.from_values([1, 0, 3])).tolist(), [1.0, 0.0, 1.0])
+
+    def test_errors(self):
+        a = Array.from_values([1, 2])
+        with self.assertRaises(ZeroDivisionError):
+            a / Array.from_values([1, 0])
+        with self.assertRaisesRegex(Exception, "lengths differ"):
+            a + Array.from_values([1, 2, 3])
+        with self.assertRaises(TypeError):
+            a + "text"
+        with self.assertRaisesRegex(Exception, "must be numbers"):
+            Array.from_values([1, "2"])
+        with self.assertRaisesRegex(Exception, "ambiguous"):
+            bool(a)
+
+    def test_builtins(self):
+        a = Array.from_values([3, 1, 2])
+        self.assertEqual(call_builtin('sum', [a]), 6.0)
+        self.assertEqual(call_builtin('min', [a]), 1.0)
+        self.assertEqual(call_builtin('max', [a]), 3.0)
+        self.assertEqual(call_builtin('len', [a]), 3)
+        self.assertTrue(call_builtin('any', [a > 2]))
+        self.assertFalse(call_builtin('all', [a > 2]))
+        with self.assertRaisesRegex(Exception, "empty array"):
+            call_builtin('min', [Array.from_values([])])
+        with self.assertRaisesRegex(Exception, "expects an array"):
+            call_builtin('sum', [1])
+        with self.assertRaisesRegex(Exception, "Unknown function"):
+            call_builtin('mean', [a])
+        with self.assertRaisesRegex(Exception, r"^sum\(\) takes 1 argument, not 2$"):
+            call_builtin('sum', [a, a])
+
+    def test_str(self):
+        self.assertEqual(str(Array.from_values([1, 2.5])), "[1.0, 2.5]")
+
+
+class TestArraySyntax(unittest.TestCase):
+
+    def test_parse_array_and_call(self):
+        ast = parse("a = [1, x, 2 + 3]; b = sum(a); c = [];")
+        array_literal = ast.statements[0].value
+        self.assertIsInstance(array_literal, ArrayLiteral)
+        self.assertEqual(len(array_literal.elements), 3)
+        call = ast.statements[1].value
+        self.assertIsInstance(call, Call)
+        self.assertEqual(call.name, 'sum')
+        self.assertEqual(ast.statements[2].value.elements, [])
+
+    def test_unknown_function(self):
+        with self.assertRaisesRegex(Exception, "Unknown function: mean"):
+            parse("a = mean([1]);")
+
+    def test_wrong_argument_count(self):
+        with self.assertRaisesRegex(Exception, r"^len\(\) takes 1 argument, not 0 at line 2$"):
+            parse("a = [1];\nb = len();")
+
+    def test_missing_comma(self):
+        with self.assertRaises(Exception):
+            parse("a = [1 2];")
+
+    def test_flat_ast_round_trip(self):
+        ast = parse("a = [1, x]; b = max(a * 2);")
+        rebuilt = FlatAST.from_ast(ast).to_ast()
+        self.assertEqual(rebuilt.statements[0].value.elements[1].name, 'x')
+        self.assertEqual(rebuilt.statements[1].value.name, 'max')
+
+
+class TestArrayEngines(unittest.TestCase):
+
+    def test_engines_match_tree_interpreter(self):
+        for code in PROGRAMS + ['a = [1, 2]; if (a > 1) { print "ambiguous"; }', 'a = [1, "x"];']:
+            expected = run(ENGINES['tree'], code)
+            for name, engine in ALL_ENGINES.items():
+                with self.subTest(engine=name, code=code):
+                    self.assertEqual(run(engine, code), expected)
+
+    def test_output(self):
+        self.assertEqual(run(ENGINES['tree'], PROGRAMS[0])[1], "[3.0, 5.0, 7.0]\n[0.5, 0.5, 0.375]\n")
+
+    def test_sweep(self):
+        results = sweep(parse("a = [x, 2]; print sum(a * x); if (all(a > 1)) { big = 1; }"), [{'x': 1}, {'x': 3}])
+        self.assertEqual([result.output for result in results], [[3.0], [15.0]])
+        self.assertEqual([sorted(result.environment) for result in results], [['a', 'x'], ['a', 'big', 'x']])
+
+    @unittest.skipIf(arrays.numpy is None, "NumPy is not installed")
+    def test_backends_agree(self):
+        for code in PROGRAMS:
+            with self.subTest(code=code):
+                with_numpy = run(ENGINES['tree'], code)
+                with mock.patch.object(arrays, 'numpy', None):
+                    self.assertEqual(run(ENGINES['tree'], code), with_numpy)
+
+
+if __name__ == '__main__':
+    unittest.main()
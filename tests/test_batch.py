@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+from io import StringIO
+
+from src.batch import BatchSettings, collect_scripts, run_batch
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        os.mkdir(os.path.join(self.directory, 'sub'))
+        self.scripts = {
+            'a.scl': 'x = 2; print x * 3;',
+            'b.scl': 'print "b"; print missing;',
+            'notes.txt': 'not a script',
+            os.path.join('sub', 'c.scl'): 'if (1 < 2) { print "c"; }',
+        }
+        for name, code in self.scripts.items():
+            with open(os.path.join(self.directory, name), 'w') as file:
+                file.write(code)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def test_collect_scripts(self):
+        self.assertEqual(collect_scripts([self.directory]),
+                         [self.path('a.scl'), self.path('b.scl'), self.path(os.path.join('sub', 'c.scl'))])
+        self.assertEqual(collect_scripts([self.path('notes.txt'), self.path('a.scl')]),
+                         [self.path('notes.txt'), self.path('a.scl')])
+
+    def run_batch(self, paths, jobs, settings=None):
+        stdout, report = StringIO(), StringIO()
+        results = run_batch(paths, jobs=jobs, settings=settings, stdout=stdout, report=report)
+        return results, stdout.getvalue(), report.getvalue()
+
+    def test_output_is_in_order(self):
+        expected = "6\nb\nError: 'missing'\nc\n"
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                results, stdout, report = self.run_batch([self.directory], jobs)
+                self.assertEqual(stdout, expected)
+                self.assertEqual([result.failed for result in results], [False, True, False])
+                self.assertIn("Ran 3 scripts", report)
+                self.assertIn("1 failed", report)
+                self.assertIn(self.path('b.scl'), report)
+
+    def test_missing_file(self):
+        results, stdout, _ = self.run_batch([self.path('missing.scl')], 1)
+        self.assertTrue(results[0].failed)
+        self.assertIn("was not found", stdout)
+
+    def test_settings_are_used(self):
+        settings = BatchSettings(engine='vm', cache_dir=os.path.join(self.directory, 'cache'))
+        for _ in range(2):
+            _, stdout, _ = self.run_batch([self.path('a.scl')], 2, settings)
+            self.assertEqual(stdout, "6\n")
+        self.assertEqual(len(os.listdir(os.path.join(self.directory, 'cache'))), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+from benchmarks.generators import GENERATORS
+from benchmarks.suite import METRICS, benchmark, compare, regressions
+from src.interpreter import Interpreter
+from src.lexer import Lexer
+from src.output import ListSink
+from src.parser import Parser
+
+
+class TestGenerators(unittest.TestCase):
+
+    def test_scripts_run(self):
+        for name, generator in GENERATORS.items():
+            with self.subTest(workload=name):
+                code = generator(200)
+                self.assertEqual(code, generator(200))
+                self.assertNotEqual(code, generator(200, seed=1))
+                ast = Parser(Lexer(code).tokenize()).parse()
+                self.assertGreaterEqual(len(ast.statements), 1)
+                Interpreter(ast, ListSink()).interpret()
+
+
+class TestSuite(unittest.TestCase):
+
+    def test_benchmark_record(self):
+        result = benchmark('chain', 50, repeat=1)
+        self.assertEqual((result['workload'], result['size'], result['engine']), ('chain', 50, 'tree'))
+        for metric in METRICS:
+            self.assertGreater(result[metric], 0)
+
+    def test_compare(self):
+        old = {'workload': 'chain', 'size': 10, 'engine': 'tree', 'lex': 1.0, 'parse': 2.0, 'interpret': 1.0,
+               'peak_memory': 100}
+        new = dict(old, lex=1.05, parse=3.0, peak_memory=90)
+        other = dict(new, size=20)
+        comparisons = compare([new, other], [old])
+        self.assertEqual(len(comparisons), len(METRICS))
+        changes = {metric: change for _, metric, _, _, change in comparisons}
+        self.assertAlmostEqual(changes['parse'], 0.5)
+        self.assertAlmostEqual(changes['peak_memory'], -0.1)
+        self.assertEqual([metric for _, metric, _, _, _ in regressions(comparisons, 0.1)], ['parse'])
+        self.assertEqual([metric for _, metric, _, _, _ in regressions(comparisons, 0.01)], ['lex', 'parse'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import errno
+import os
+import sys
+import tempfile
+import time
+import unittest
+from io import StringIO
+from unittest import mock
+
+from src.ast import Block
+from src.cache import ProgramCache
+from src.execute import load_program, run_source_file
+from src.interpreter import Interpreter
+
+
+class TestProgramCache(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.cache = ProgramCache(os.path.join(self.directory, 'cache'))
+
+    def write_script(self, code, name='script.scl'):
+        filename = os.path.join(self.directory, name)
+        with open(filename, 'w') as file:
+            file.write(code)
+        return filename
+
+    def test_key_depends_on_source_and_opt_level(self):
+        key = self.cache.key(b'x = 1;', 1)
+        self.assertEqual(key, self.cache.key(b'x = 1;', 1))
+        self.assertNotEqual(key, self.cache.key(b'x = 2;', 1))
+        self.assertNotEqual(key, self.cache.key(b'x = 1;', 2))
+        # Lexing bytes gives byte offsets as columns, so the ASTs differ.
+        self.assertNotEqual(key, self.cache.key(b'x = 1;', 1, use_mmap=True))
+
+    def test_store_and_load(self):
+        key = self.cache.key(b'source', 1)
+        self.assertIsNone(self.cache.load(key))
+        self.assertTrue(self.cache.store(key, (Block([]), None)))
+        ast, stats = self.cache.load(key)
+        self.assertIsInstance(ast, Block)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertEqual([name for name in os.listdir(self.cache.directory) if name.endswith('.tmp')], [])
+
+    def test_corrupt_entry_is_a_miss(self):
+        key = self.cache.key(b'source', 1)
+        with open(self.cache.path(key), 'wb') as file:
+            file.write(b'garbage')
+        self.assertIsNone(self.cache.load(key))
+        self.assertFalse(os.path.exists(self.cache.path(key)))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        keys = [self.cache.key(str(i).encode(), 1) for i in range(3)]
+        for key in keys:
+            self.cache.store(key, 'x' * 1000)
+        # Make the first entry the most recently used one.
+        for age, key in zip((0, 20, 10), keys):
+            timestamp = time.time() - age
+            os.utime(self.cache.path(key), (timestamp, timestamp))
+
+        self.cache.max_size = 2500
+        self.cache.evict()
+        self.assertIsNotNone(self.cache.load(keys[0]))
+        self.assertIsNone(self.cache.load(keys[1]))
+        self.assertIsNotNone(self.cache.load(keys[2]))
+
+    def test_load_program_uses_cache(self):
+        filename = self.write_script("x = 2 * 3; if (x > 5) { y = x; }")
+        for use_mmap in (False, True, False, True):
+            ast, stats = load_program(filename, cache=self.cache, use_mmap=use_mmap)
+            interpreter = Interpreter(ast)
+            interpreter.interpret()
+            self.assertEqual(interpreter.environment, {'x': 6, 'y': 6})
+            self.assertEqual(stats.folded, 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 2))
+
+    def test_cached_columns_match_the_lexing_mode(self):
+        filename = self.write_script('s = "\u00e9"; t = s;')
+        for use_mmap, column in ((False, 9), (True, 10), (False, 9)):
+            ast, _ = load_program(filename, cache=self.cache, use_mmap=use_mmap)
+            self.assertEqual(ast.statements[1].column, column)
+
+    def test_failed_store_does_not_stop_the_script(self):
+        filename = self.write_script('print 1;')
+        full = OSError(errno.ENOSPC, 'No space left on device')
+        for target in ('tempfile.mkstemp', 'os.replace'):
+            with self.subTest(target=target), mock.patch(target, side_effect=full):
+                self.assertFalse(self.cache.store(self.cache.key(b'print 1;', 1), (Block([]), None)))
+                held_stdout, sys.stdout = sys.stdout, StringIO()
+                try:
+                    run_source_file(filename, cache_dir=self.cache.directory)
+                    self.assertEqual(sys.stdout.getvalue(), "1\n")
+                finally:
+                    sys.stdout = held_stdout
+        self.assertEqual([name for name in os.listdir(self.cache.directory) if name.endswith('.tmp')], [])
+
+    def test_changed_source_is_reparsed(self):
+        filename = self.write_script("x = 1;")
+        load_program(filename, cache=self.cache)
+        self.write_script("x = 2;")
+        ast, _ = load_program(filename, cache=self.cache)
+        self.assertEqual(ast.statements[0].value.value, 2)
+        self.assertEqual(self.cache.misses, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
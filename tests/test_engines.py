@@ -0,0 +1,98 @@
+import unittest
+
+from src.engines import ALL_ENGINES, ENGINES, get_engine
+from src.interpreter import Interpreter
+from src.lexer import Lexer
+from src.output import ListSink
+from src.parser import Parser
+
+PROGRAMS = [
+    "x = 10; y = 20; z = x + y;",
+    "result = (2 + 3) * (5 - 2) / 3;",
+    "a = 1; b = 2; c = (a < b) && (b > a); d = (a == b) || (a != b); e = 0 && 5; f = 0 || 0;",
+    'print "Hello, world!"; x = 10; print x; print x * 1.5;',
+    'greeting = "Hello, " + "world"; same = greeting == "Hello, world";',
+    """
+    x = 10;
+    y = 20;
+    if ((x < y) && (x > 5)) {
+        result = y - x;
+    } else {
+        result = y + x;
+    }
+    print result;
+    if (result > 100) {
+        print "never";
+    }
+    """,
+    """
+    n = 3;
+    if (n > 1) {
+        if (n > 2) { size = "big"; } else { size = "medium"; }
+        print size;
+    } else {
+        size = "small";
+    }
+    """,
+    "x = 1; 1 + x",
+]
+
+
+def parse(code):
+    lexer = Lexer(code)
+    tokens = lexer.tokenize()
+    parser = Parser(tokens)
+    return parser.parse()
+
+
+def run(engine, code, environment=None):
+    output = ListSink()
+    interpreter = engine(parse(code), output)
+    if environment is not None:
+        interpreter.environment = environment
+    interpreter.interpret()
+    return interpreter.environment, output.values
+
+
+class TestEngines(unittest.TestCase):
+    def test_engines_match_tree_interpreter(self):
+        for code in PROGRAMS:
+            expected = run(Interpreter, code)
+            for name, engine in ALL_ENGINES.items():
+                with self.subTest(engine=name, code=code):
+                    self.assertEqual(run(engine, code), expected)
+
+    def test_engines_share_environment(self):
+        for name, engine in ALL_ENGINES.items():
+            with self.subTest(engine=name):
+                environment = {'x': 21}
+                run(engine, "y = x * 2;", environment)
+                self.assertEqual(environment, {'x': 21, 'y': 42})
+
+    def test_engines_reject_undefined_variable(self):
+        for name, engine in ALL_ENGINES.items():
+            with self.subTest(engine=name):
+                with self.assertRaises(KeyError):
+                    run(engine, "y = x;")
+
+    def test_engines_can_be_rerun(self):
+        for name, engine in ALL_ENGINES.items():
+            with self.subTest(engine=name):
+                interpreter = engine(parse("x = x + 1;"))
+                interpreter.environment = {'x': 0}
+                interpreter.interpret()
+                interpreter.interpret()
+                self.assertEqual(interpreter.environment['x'], 2)
+
+    def test_unknown_engine(self):
+        with self.assertRaises(Exception):
+            get_engine('nope')
+
+    def test_api_engines_are_not_offered(self):
+        self.assertNotIn('quick', ENGINES)
+        with self.assertRaises(Exception):
+            get_engine('quick')
+
+
+if __name__ == "__main__":
+    unittest.main()
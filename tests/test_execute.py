@@ -0,0 +1,154 @@
+import os
+import tempfile
+import threading
+import unittest
+from io import StringIO
+import sys
+
+from src.execute import run_source_file, run_statements
+from src.interpreter import Interpreter
+from src.limits import Limits
+from src.vm import VMInterpreter
+
+
+class TestRunStatements(unittest.TestCase):
+
+    def setUp(self):
+        self.held_stdout = sys.stdout
+        sys.stdout = StringIO()
+
+    def tearDown(self):
+        sys.stdout = self.held_stdout
+
+    def test_runs_program(self):
+        code = StringIO('x = 10;\nif (x > 5) {\n    print "big";\n} else {\n    print "small";\n}\nprint x + 1;\n')
+        run_statements(code, Interpreter)
+        self.assertEqual(sys.stdout.getvalue(), "big\n11\n")
+
+    def test_statements_run_before_later_errors(self):
+        code = StringIO('print 1;\nprint 2;\nx = ;\nprint 3;\n')
+        with self.assertRaises(Exception):
+            run_statements(code, Interpreter)
+        self.assertEqual(sys.stdout.getvalue(), "1\n2\n")
+
+    def test_input_is_read_incrementally(self):
+        lines_read = []
+        output_seen = []
+
+        def lines():
+            for number in range(1000):
+                lines_read.append(number)
+                output_seen.append(sys.stdout.getvalue())
+                yield f'print {number};\n'
+
+        run_statements(lines(), VMInterpreter)
+        # The first statement printed before the third line was read.
+        self.assertEqual(output_seen[2], "0\n")
+        self.assertEqual(len(lines_read), 1000)
+
+    def test_multi_line_strings(self):
+        code = StringIO('print "a\nb";\nprint "c";\n')
+        run_statements(code, Interpreter)
+        self.assertEqual(sys.stdout.getvalue(), "a\nb\nc\n")
+
+    def test_optimizer_stats_are_accumulated(self):
+        code = StringIO('x = 1 + 2;\ny = 3 * 4;\n')
+        stats = run_statements(code, Interpreter, 1)
+        self.assertEqual(stats.folded, 2)
+
+
+class TestRunSourceFile(unittest.TestCase):
+
+    def setUp(self):
+        self.held_stdout = sys.stdout
+        sys.stdout = StringIO()
+        file = tempfile.NamedTemporaryFile('w', suffix='.scl', delete=False)
+        self.filename = file.name
+        self.addCleanup(os.remove, self.filename)
+        with file:
+            file.write('x = 15;\ny = 10;\nprint x + y;\nif (x > y) { print "bigger"; }\n')
+
+    def tearDown(self):
+        sys.stdout = self.held_stdout
+
+    def test_modes_agree(self):
+        outputs = []
+        for stream in (False, True):
+            for use_mmap in (False, True):
+                sys.stdout = StringIO()
+                run_source_file(self.filename, stream=stream, use_mmap=use_mmap)
+                outputs.append(sys.stdout.getvalue())
+        self.assertEqual(outputs, ["25\nbigger\n"] * 4)
+
+    def test_mmap_syntax_error_is_reported(self):
+        with open(self.filename, 'w') as file:
+            file.write('x = ;\n')
+        run_source_file(self.filename, use_mmap=True)
+        self.assertTrue(sys.stdout.getvalue().startswith("Error:"))
+
+    def test_output_is_flushed_before_errors(self):
+        with open(self.filename, 'w') as file:
+            file.write('print 1;\nprint 2;\nprint missing;\n')
+        for stream in (False, True):
+            with self.subTest(stream=stream):
+                sys.stdout = StringIO()
+                run_source_file(self.filename, stream=stream)
+                self.assertEqual(sys.stdout.getvalue(), "1\n2\nError: 'missing'\n")
+
+    def test_typecheck_stops_before_running(self):
+        with open(self.filename, 'w') as file:
+            file.write('print 1;\nx = "abc";\ny = x - 1;\n')
+        run_source_file(self.filename, typecheck=True)
+        self.assertEqual(sys.stdout.getvalue(), "Error: 3:6: cannot apply - to str and int\n")
+
+        # Streaming checks each statement before running it.
+        sys.stdout = StringIO()
+        run_source_file(self.filename, stream=True, typecheck=True)
+        self.assertEqual(sys.stdout.getvalue(), "1\nError: 3:6: cannot apply - to str and int\n")
+
+    def test_streamed_output_appears_before_the_input_ends(self):
+        fifo = os.path.join(tempfile.mkdtemp(), 'input.scl')
+        os.mkfifo(fifo)
+        self.addCleanup(os.rmdir, os.path.dirname(fifo))
+        self.addCleanup(os.remove, fifo)
+        printed = threading.Event()
+        seen_before_end = []
+
+        class Stdout(StringIO):
+            def write(self, text):
+                result = super().write(text)
+                if '1' in self.getvalue():
+                    printed.set()
+                return result
+
+        def feed():
+            with open(fifo, 'w') as file:
+                # The parser needs the token after a statement before running it.
+                file.write('print 1;\nprint 2;\n')
+                file.flush()
+                seen_before_end.append(printed.wait(5))
+
+        writer = threading.Thread(target=feed)
+        writer.start()
+        sys.stdout = Stdout()
+        run_source_file(fifo, stream=True)
+        writer.join()
+        self.assertEqual(seen_before_end, [True])
+        self.assertEqual(sys.stdout.getvalue(), "1\n2\n")
+
+    def test_limits(self):
+        with open(self.filename, 'w') as file:
+            file.write('print 1;\nprint 2;\n')
+        for stream in (False, True):
+            with self.subTest(stream=stream):
+                sys.stdout = StringIO()
+                run_source_file(self.filename, stream=stream, limits=Limits(max_statements=1))
+                self.assertEqual(sys.stdout.getvalue(), "1\nError: Statement limit of 1 exceeded\n")
+
+    def test_missing_file(self):
+        run_source_file(self.filename + '.missing', use_mmap=True)
+        self.assertIn("was not found", sys.stdout.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
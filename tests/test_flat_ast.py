@@ -0,0 +1,70 @@
+import pickle
+import unittest
+
+from src.ast import Block, AssignmentStatement, IfStatement, BinaryOperation, Number, Variable
+from src.compiler import OPERATORS
+from src.flat_ast import FlatAST, FlatInterpreter, BLOCK, ASSIGNMENT, BINARY_OPERATION, NUMBER, VARIABLE, NO_NODE
+from src.lexer import Lexer
+from src.parser import Parser
+
+
+def parse(code):
+    lexer = Lexer(code)
+    tokens = lexer.tokenize()
+    parser = Parser(tokens)
+    return parser.parse()
+
+
+class TestFlatAST(unittest.TestCase):
+    def test_nodes_have_no_dict(self):
+        for node in (Number(1), Variable('x'), BinaryOperation(Number(1), '+', Number(2)), Block([])):
+            self.assertFalse(hasattr(node, '__dict__'))
+
+    def test_columns(self):
+        flat = FlatAST.from_ast(parse("x = y + 1;"))
+        self.assertEqual(list(flat.kinds), [VARIABLE, NUMBER, BINARY_OPERATION, ASSIGNMENT, BLOCK])
+        self.assertEqual(flat.ops[2], OPERATORS.index('+'))
+        self.assertEqual((flat.a[2], flat.b[2]), (0, 1))
+        self.assertEqual(flat.names, ['y', 'x'])
+        self.assertEqual(flat.literals, [1])
+        self.assertEqual(flat.root, 4)
+        self.assertEqual(list(flat.children[flat.a[4]:flat.a[4] + flat.b[4]]), [3])
+
+    def test_literals_and_names_are_deduplicated(self):
+        flat = FlatAST.from_ast(parse("x = 1; x = 1; y = 1.0;"))
+        self.assertEqual(flat.literals, [1, 1.0])
+        self.assertEqual(flat.names, ['x', 'y'])
+
+    def test_round_trip(self):
+        flat = FlatAST.from_ast(parse("if (a > 1) { b = a * 2; } else { print \"no\"; } c = 3;"))
+        ast = flat.to_ast()
+        if_stmt, assignment = ast.statements
+        self.assertIsInstance(if_stmt, IfStatement)
+        self.assertEqual(if_stmt.condition.operator, '>')
+        self.assertEqual(if_stmt.true_block.statements[0].value.right.value, 2)
+        self.assertEqual(if_stmt.false_block.statements[0].value.value, "no")
+        self.assertIsInstance(assignment, AssignmentStatement)
+        self.assertEqual(assignment.variable.name, 'c')
+
+    def test_if_without_else(self):
+        flat = FlatAST.from_ast(parse("if (a) { b = 1; }"))
+        self.assertEqual(flat.c[flat.children[flat.a[flat.root]]], NO_NODE)
+        self.assertIsNone(flat.to_ast().statements[0].false_block)
+
+    def test_pickle(self):
+        flat = pickle.loads(pickle.dumps(FlatAST.from_ast(parse("x = 1 + 2;"))))
+        interpreter = FlatInterpreter(flat)
+        interpreter.interpret()
+        self.assertEqual(interpreter.environment, {'x': 3})
+
+    def test_interpreter(self):
+        interpreter = FlatInterpreter(FlatAST.from_ast(parse("""
+        x = 10;
+        if (x > 5 && x < 20) { y = x * 2; } else { y = 0; }
+        """)))
+        interpreter.interpret()
+        self.assertEqual(interpreter.environment, {'x': 10, 'y': 20})
+
+
+if __name__ == "__main__":
+    unittest.main()
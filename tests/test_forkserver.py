@@ -0,0 +1,122 @@
+import asyncio
+import os
+import socket
+import unittest
+
+from src.forkserver import ForkServer, warm_up
+
+# Changed by jobs; each job should see the value the parent has.
+state = []
+
+
+def record(job, result):
+    state.append(job)
+    result.write(f'{os.getpid()} {state}'.encode())
+
+
+def is_open(fd, result):
+    try:
+        os.fstat(fd)
+        result.write(b'open')
+    except OSError:
+        result.write(b'closed')
+
+
+def measure(job, result):
+    result.write(str(len(job)).encode())
+
+
+def fail(job, result):
+    result.write(b'partial')
+    raise ValueError(job)
+
+
+class TestForkServer(unittest.TestCase):
+
+    def start(self, target, pool_size):
+        forkserver = ForkServer(target, pool_size)
+        forkserver.start()
+        self.addCleanup(forkserver.close)
+        return forkserver
+
+    def test_jobs_run_in_fresh_children(self):
+        forkserver = self.start(record, 2)
+        pids = set()
+        for job in range(4):
+            data, status = forkserver.run(job)
+            pid, seen = data.decode().split(' ', 1)
+            self.assertEqual((seen, status), (f'[{job}]', 0))
+            pids.add(int(pid))
+        self.assertEqual(len(pids), 4)
+        self.assertNotIn(os.getpid(), pids)
+        self.assertEqual(state, [])
+
+    def test_pool_is_refilled(self):
+        forkserver = self.start(record, 2)
+        idle = [worker.pid for worker in forkserver.idle]
+        worker = forkserver.take()
+        self.assertEqual(worker.pid, idle[0])
+        self.assertEqual(len(forkserver.idle), 1)
+        worker.submit('job')
+        forkserver.start()
+        self.assertEqual(len(forkserver.idle), 2)
+        with os.fdopen(worker.result_fd, 'rb') as result:
+            self.assertTrue(result.read().endswith(b"['job']"))
+        self.assertEqual(worker.wait(), 0)
+
+    def test_without_a_pool(self):
+        forkserver = self.start(record, 0)
+        self.assertEqual(forkserver.run('job')[1], 0)
+        self.assertEqual(forkserver.idle, [])
+
+    def test_failing_job(self):
+        forkserver = self.start(fail, 1)
+        with open(os.devnull, 'w') as devnull:
+            stderr = os.dup(2)
+            os.dup2(devnull.fileno(), 2)  # The child prints the traceback
+            try:
+                self.assertEqual(forkserver.run('job'), (b'partial', 1))
+            finally:
+                os.dup2(stderr, 2)
+                os.close(stderr)
+
+    def test_close_stops_idle_children(self):
+        forkserver = ForkServer(record, 2)
+        forkserver.start()
+        pids = [worker.pid for worker in forkserver.idle]
+        forkserver.close()
+        for pid in pids:
+            with self.assertRaises(ChildProcessError):
+                os.waitpid(pid, 0)
+
+    def test_inherited_fds_are_closed(self):
+        forkserver = self.start(is_open, 0)
+        with socket.socket() as listening:
+            self.assertEqual(forkserver.run(listening.fileno())[0], b'open')
+            forkserver.inherited_fds.add(listening.fileno())
+            self.assertEqual(forkserver.run(listening.fileno())[0], b'closed')
+
+    def test_async_submit_and_wait(self):
+        forkserver = self.start(measure, 1)
+        job = 'x' * (4 * 1024 * 1024)  # Larger than the pipe buffer
+
+        async def run():
+            worker = forkserver.take()
+            submit = asyncio.create_task(forkserver.submit(worker, job))
+            await asyncio.sleep(0)
+            # Forked while the job is written: it must not hold the job pipe open.
+            forkserver.start()
+            await asyncio.wait_for(submit, 10)
+            with os.fdopen(worker.result_fd, 'rb') as result:
+                data = result.read()
+            return data, await asyncio.wait_for(worker.wait_async(), 10)
+
+        self.assertEqual(asyncio.run(run()), (str(len(job)).encode(), 0))
+        self.assertEqual(len(forkserver.idle), 1)
+
+    def test_warm_up(self):
+        warm_up()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import sys
+import unittest
+
+from benchmarks.deep import RecursiveParser
+from src.interpreter import Interpreter
+from src.iterative import IterativeInterpreter
+from src.lexer import Lexer
+from src.optimizer import Optimizer, count_nodes
+from src.output import ListSink
+from src.parser import Parser
+from src.typecheck import infer_types
+from tests.test_engines import PROGRAMS
+
+
+def parse(code):
+    lexer = Lexer(code)
+    tokens = lexer.tokenize()
+    parser = Parser(tokens)
+    return parser.parse()
+
+
+def run(engine, ast):
+    output = ListSink()
+    interpreter = engine(ast, output)
+    interpreter.interpret()
+    return interpreter.environment, output.values
+
+
+# Deeper than the recursion limit, so recursive walks of these programs fail.
+DEPTH = sys.getrecursionlimit() * 2
+
+
+class TestIterativeInterpreter(unittest.TestCase):
+    def test_matches_tree_interpreter(self):
+        for code in PROGRAMS:
+            with self.subTest(code=code):
+                self.assertEqual(run(IterativeInterpreter, parse(code)), run(Interpreter, parse(code)))
+
+    def test_arrays(self):
+        _, output = run(IterativeInterpreter, parse('a = [1, 2, 3] * 2; print sum(a); print a > 3;'))
+        self.assertEqual(output[0], 12.0)
+        self.assertEqual(output[1].tolist(), [0.0, 1.0, 1.0])
+
+    def test_errors(self):
+        with self.assertRaises(KeyError):
+            run(IterativeInterpreter, parse("x = y + 1;"))
+        with self.assertRaises(ZeroDivisionError):
+            run(IterativeInterpreter, parse("x = 1 / 0;"))
+
+    def test_long_chain(self):
+        ast = parse('x = 0' + ' + 1' * DEPTH + ';')
+        with self.assertRaises(RecursionError):
+            run(Interpreter, ast)
+        environment, _ = run(IterativeInterpreter, ast)
+        self.assertEqual(environment['x'], DEPTH)
+
+    def test_deeply_nested_ifs(self):
+        ast = parse('x = 1; ' + 'if (x) { ' * DEPTH + 'print x;' + ' } else { print 0; }' * DEPTH)
+        with self.assertRaises(RecursionError):
+            run(Interpreter, ast)
+        _, output = run(IterativeInterpreter, ast)
+        self.assertEqual(output, [1])
+
+
+class TestIterativeParsing(unittest.TestCase):
+    def test_deeply_nested_ifs(self):
+        ast = parse('if (1) { ' * DEPTH + 'x = 1;' + ' }' * DEPTH + ' y = 2;')
+        self.assertEqual(len(ast.statements), 2)
+        node = ast.statements[0]
+        depth = 0
+        while depth < DEPTH - 1:
+            node = node.true_block.statements[0]
+            depth += 1
+        self.assertEqual(node.true_block.statements[0].variable.name, 'x')
+        self.assertEqual(count_nodes(ast), 3 * DEPTH + 7)
+
+    def test_else_blocks(self):
+        ast = parse('if (0) { x = 1; } else { if (1) { x = 2; } else { x = 3; } } print x;')
+        self.assertEqual(run(IterativeInterpreter, ast)[1], [2])
+
+    def test_recursive_parser_matches(self):
+        # benchmarks.deep compares the two parsers.
+        for code in PROGRAMS:
+            with self.subTest(code=code):
+                recursive = RecursiveParser(Lexer(code).tokenize()).parse()
+                self.assertEqual(run(Interpreter, recursive), run(Interpreter, parse(code)))
+
+    def test_optimize_deep_program(self):
+        ast = parse('x = 0' + ' + 1' * DEPTH + ';')
+        optimized = Optimizer(1).optimize(ast)
+        self.assertEqual(optimized.statements[0].value.value, DEPTH)
+
+
+class TestIterativeTypeCheck(unittest.TestCase):
+    def test_long_chain(self):
+        checker = infer_types(parse('a = 1; x = a' + ' + a' * DEPTH + '; y = x - "s";'))
+        self.assertEqual(checker.environment['x'], {int})
+        self.assertEqual(len(checker.errors), 1)
+
+    def test_deeply_nested_ifs(self):
+        checker = infer_types(parse('if (1) { ' * DEPTH + 'x = "s" * 1.5;' + ' }' * DEPTH))
+        self.assertEqual(checker.errors, [f'1:{9 * DEPTH + 8}: cannot apply * to str and float'])
+
+
+if __name__ == '__main__':
+    unittest.main()
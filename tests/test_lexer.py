@@ -1,5 +1,10 @@
+import mmap
+import tempfile
 import unittest
-from src.lexer import Lexer, Token
+from src.lexer import Lexer, Token, TokenArray
+from src.interpreter import Interpreter
+from src.output import ListSink
+from src.parser import Parser
 
 
 class TestLexer(unittest.TestCase):
@@ -96,6 +101,82 @@ class TestLexer(unittest.TestCase):
             Token('RBRACE', '}', 1, 41)
         ])
 
+    def test_iter_tokens_matches_tokenize(self):
+        code = 'x = 1.5; // comment\nif (x > 1) { print "big"; }'
+        self.assertEqual(list(Lexer(code).iter_tokens()), Lexer(code).tokenize())
+
+    def test_iter_tokens_is_lazy(self):
+        tokens = Lexer("x = 1; @").iter_tokens()
+        self.assertEqual(next(tokens), Token('ID', 'x', 1, 0))
+        self.assertEqual(next(tokens), Token('ASSIGN', '=', 1, 2))
+        self.assertEqual(next(tokens), Token('NUMBER', 1, 1, 4))
+        self.assertEqual(next(tokens), Token('END', ';', 1, 5))
+        with self.assertRaises(RuntimeError):
+            next(tokens)
+
+    def test_iter_tokens_from_lines(self):
+        code = 'x = "multi\nline"; // a "quote\nprint x;\n'
+        lines = code.splitlines(keepends=True)
+        self.assertEqual(list(Lexer(lines).iter_tokens()), Lexer(code).tokenize())
+
+    def test_long_string_in_lines(self):
+        code = 'x = "' + 'line\n' * 1000 + 'end"; y = "a\n\nb" + x;\nprint y;\n'
+        lines = code.splitlines(keepends=True)
+        self.assertEqual(list(Lexer(lines).iter_tokens()), Lexer(code).tokenize())
+
+    def test_unterminated_string_in_lines(self):
+        with self.assertRaises(RuntimeError) as context:
+            list(Lexer(['x = 1;\n', '"abc\n', 'y']).iter_tokens())
+        self.assertIn('2:0', str(context.exception))
+
+    def test_bytes_match_text(self):
+        code = 'x = 1.5; // comment\nif (x >= 1 && y != 2) { print "big"; }'
+        self.assertEqual(Lexer(code.encode()).tokenize(), Lexer(code).tokenize())
+
+    def test_bytes_decode_values(self):
+        tokens = Lexer('name = "caf\u00e9";'.encode()).tokenize()
+        self.assertEqual(tokens[0], Token('ID', 'name', 1, 0))
+        self.assertEqual(tokens[2], Token('STRING', '"caf\u00e9"', 1, 7))
+        # Columns are byte offsets: the accented character takes two bytes.
+        self.assertEqual(tokens[3], Token('END', ';', 1, 14))
+
+    def test_bytes_illegal_character(self):
+        with self.assertRaises(RuntimeError) as context:
+            Lexer(b'x = 1;\n  @').tokenize()
+        self.assertIn('2:2', str(context.exception))
+
+    def test_mmap(self):
+        with tempfile.TemporaryFile() as file:
+            file.write(b'x = 10;\nprint x;\n')
+            file.flush()
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                tokens = Lexer(mapped).tokenize()
+        self.assertEqual(tokens, Lexer('x = 10;\nprint x;\n').tokenize())
+
+    def test_compact_tokens_match_tokenize(self):
+        code = 'x = 1.5; // comment\nif (x >= 1 && y != 2) { print "big"; x = [1, 1.0]; }'
+        for source in (code, code.encode()):
+            with self.subTest(source=type(source)):
+                tokens = Lexer(source).tokenize_compact()
+                self.assertEqual(list(tokens), Lexer(code).tokenize())
+                self.assertEqual(len(tokens), len(Lexer(code).tokenize()))
+                self.assertEqual(tokens[2], Token('NUMBER', 1.5, 1, 4))
+
+    def test_compact_tokens_intern_values(self):
+        tokens = Lexer('count = 1;\ncount = count + 1.0;').tokenize_compact()
+        self.assertEqual(tokens.constants, ['count', '=', 1, ';', '+', 1.0])
+        self.assertEqual([type(value) for value in tokens.constants[2::3]], [int, float])
+        names = [token.value for token in tokens if token.type == 'ID']
+        self.assertTrue(all(name is names[0] for name in names))
+        self.assertEqual(list(tokens.lines), [1, 1, 1, 1, 2, 2, 2, 2, 2, 2])
+
+    def test_parser_reads_compact_tokens(self):
+        tokens = Lexer('x = 1; if (x > 0) { print x * 2; } else { print "no"; }').tokenize_compact()
+        output = ListSink()
+        Interpreter(Parser(tokens).parse(), output).interpret()
+        self.assertEqual(output.values, [2])
+        self.assertEqual(list(TokenArray(tokens)), list(tokens))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+
+from src.engines import ALL_ENGINES, ENGINES
+from src.lexer import Lexer
+from src.limits import CHECK_INTERVAL, LimitExceeded, Limits
+from src.output import ListSink
+from src.parser import Parser
+from tests.test_engines import PROGRAMS
+
+
+def parse(code):
+    return Parser(Lexer(code).tokenize()).parse()
+
+
+def run(engine, code, limits):
+    output = ListSink()
+    interpreter = engine(parse(code), output, limits=limits)
+    try:
+        interpreter.interpret()
+    except LimitExceeded as e:
+        return e.limit, output.values
+    return None, output.values
+
+
+# Prints 0 to 2999, one assignment and one print statement per number.
+LONG_PROGRAM = ''.join(f'x{i} = {i}; print x{i};\n' for i in range(3000))
+NESTED_PROGRAM = 'if (1) { a = 1; b = 2; if (a < b) { c = 3; } else { c = 4; } } print c;'
+
+
+class TestLimits(unittest.TestCase):
+
+    def test_generous_limits_change_nothing(self):
+        for name, engine in ALL_ENGINES.items():
+            for code in PROGRAMS + [LONG_PROGRAM]:
+                with self.subTest(engine=name, code=code[:40]):
+                    limits = Limits(10 ** 6, 10 ** 6, 10 ** 6, 60)
+                    self.assertEqual(run(engine, code, limits), run(engine, code, None))
+
+    def test_statement_limit(self):
+        for name, engine in ALL_ENGINES.items():
+            with self.subTest(engine=name):
+                limit, output = run(engine, LONG_PROGRAM, Limits(max_statements=100))
+                self.assertEqual(limit, 'statements')
+                self.assertEqual(output, list(range(50)))
+
+    def test_nested_statements_are_counted(self):
+        for name, engine in ALL_ENGINES.items():
+            with self.subTest(engine=name):
+                limits = Limits(max_statements=6)
+                self.assertEqual(run(engine, NESTED_PROGRAM, limits), (None, [3]))
+                self.assertEqual(limits.executed_statements, 6)
+                self.assertEqual(run(engine, NESTED_PROGRAM, Limits(max_statements=5)), ('statements', []))
+
+    def test_output_limit(self):
+        for name, engine in ALL_ENGINES.items():
+            with self.subTest(engine=name):
+                # Every line of the first ten is two bytes long.
+                self.assertEqual(run(engine, LONG_PROGRAM, Limits(max_output_bytes=21)), ('output', list(range(10))))
+
+    def test_variable_limit_is_checked_periodically(self):
+        for name, engine in ALL_ENGINES.items():
+            with self.subTest(engine=name):
+                limit, output = run(engine, LONG_PROGRAM, Limits(max_variables=100))
+                self.assertEqual(limit, 'variables')
+                self.assertEqual(len(output), CHECK_INTERVAL // 2)
+
+    def test_timeout(self):
+        for name, engine in ALL_ENGINES.items():
+            with self.subTest(engine=name):
+                self.assertEqual(run(engine, LONG_PROGRAM, Limits(timeout=0))[0], 'timeout')
+
+    def test_start_resets_the_counts(self):
+        limits = Limits(max_statements=4, max_output_bytes=4)
+        for _ in range(2):
+            limits.start()
+            self.assertEqual(run(ENGINES['tree'], 'print 1; print 2;', limits), (None, [1, 2]))
+        copy = limits.copy()
+        self.assertEqual((copy.max_statements, copy.output_bytes, copy.executed_statements), (4, 0, 0))
+
+    def test_capped(self):
+        limits = Limits(max_statements=10, max_output_bytes=100, timeout=5).capped(
+            Limits(max_statements=20, max_output_bytes=50, max_variables=3))
+        self.assertEqual((limits.max_statements, limits.max_output_bytes, limits.max_variables, limits.timeout),
+                         (10, 50, 3, 5))
+        self.assertEqual(Limits(max_statements=10).capped(None).max_statements, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+
+from src.ast import Block, AssignmentStatement, IfStatement, BinaryOperation, Number, String, Variable
+from src.interpreter import Interpreter
+from src.lexer import Lexer
+from src.optimizer import Optimizer, count_nodes, optimize
+from src.parser import Parser
+
+
+def parse(code):
+    lexer = Lexer(code)
+    tokens = lexer.tokenize()
+    parser = Parser(tokens)
+    return parser.parse()
+
+
+class TestOptimizer(unittest.TestCase):
+    def test_constant_folding(self):
+        ast, stats = optimize(parse("x = (2 + 3) * (5 - 2) / 3;"))
+        value = ast.statements[0].value
+        self.assertIsInstance(value, Number)
+        self.assertEqual(value.value, 5.0)
+        self.assertEqual(stats.folded, 4)
+        self.assertEqual(stats.nodes_removed, 8)
+
+    def test_string_folding(self):
+        ast, _ = optimize(parse('x = "Hello, " + "world";'))
+        value = ast.statements[0].value
+        self.assertIsInstance(value, String)
+        self.assertEqual(value.value, "Hello, world")
+
+    def test_long_strings_are_not_built(self):
+        # Would take a gigabyte if the operation ran before the size check.
+        for code in ('if (0) { x = "a" * 1000000000; }', 'x = 1000000000 * "ab";',
+                     f'x = "{"a" * 3000}" + "{"b" * 3000}";'):
+            with self.subTest(code=code[:30]):
+                _, stats = optimize(parse(code))
+                self.assertEqual(stats.folded, 0)
+        self.assertEqual(optimize(parse('x = "ab" * 3;'))[0].statements[0].value.value, "ababab")
+
+    def test_partial_folding(self):
+        ast, _ = optimize(parse("x = y * (2 + 3);"))
+        value = ast.statements[0].value
+        self.assertIsInstance(value, BinaryOperation)
+        self.assertIsInstance(value.left, Variable)
+        self.assertEqual(value.right.value, 5)
+
+    def test_failing_operations_are_not_folded(self):
+        ast, stats = optimize(parse('x = 1 / 0; y = "abc" - 1;'))
+        self.assertIsInstance(ast.statements[0].value, BinaryOperation)
+        self.assertIsInstance(ast.statements[1].value, BinaryOperation)
+        self.assertEqual(stats.folded, 0)
+        with self.assertRaises(ZeroDivisionError):
+            Interpreter(ast).interpret()
+
+    def test_dead_branch_elimination(self):
+        ast, stats = optimize(parse("if (1 < 2) { x = 1; y = 2; } else { x = 3; } z = 4;"))
+        self.assertEqual([type(s) for s in ast.statements], [AssignmentStatement] * 3)
+        self.assertEqual([s.variable.name for s in ast.statements], ['x', 'y', 'z'])
+        self.assertEqual(stats.branches_eliminated, 1)
+
+    def test_false_branch_without_else_is_removed(self):
+        ast, _ = optimize(parse('if ("a" == "b") { x = 1; } y = 2;'))
+        self.assertEqual([s.variable.name for s in ast.statements], ['y'])
+
+    def test_nested_branches(self):
+        ast, _ = optimize(parse("if (x) { if (0) { y = 1; } else { y = 2; } }"))
+        if_stmt = ast.statements[0]
+        self.assertIsInstance(if_stmt, IfStatement)
+        self.assertEqual(len(if_stmt.true_block.statements), 1)
+        self.assertEqual(if_stmt.true_block.statements[0].value.value, 2)
+
+    def test_algebraic_simplification_requires_level_2(self):
+        code = "a = x * 1; b = 1 * x; c = x + 0; d = 0 + x; e = x - 0; f = x / 1; g = x * 1.0;"
+        ast, stats = optimize(parse(code), 1)
+        self.assertEqual(stats.simplified, 0)
+
+        ast, stats = optimize(parse(code), 2)
+        values = [statement.value for statement in ast.statements]
+        self.assertTrue(all(isinstance(value, Variable) for value in values[:5]))
+        self.assertIsInstance(values[5], BinaryOperation)
+        self.assertIsInstance(values[6], BinaryOperation)
+        self.assertEqual(stats.simplified, 5)
+
+    def test_level_0_keeps_tree(self):
+        original = parse("x = 1 + 2;")
+        ast, stats = optimize(original, 0)
+        self.assertIs(ast, original)
+        self.assertEqual(stats.nodes_removed, 0)
+
+    def test_input_is_not_modified(self):
+        original = parse("x = 1 + 2; if (1) { y = 3; }")
+        before = count_nodes(original)
+        optimize(original, 2)
+        self.assertEqual(count_nodes(original), before)
+
+    def test_same_results(self):
+        code = """
+        x = 10 * (2 + 3);
+        if (x > 10 * 4) { y = x * 1 + 0; } else { y = 0; }
+        if (2 > 3) { z = 1; } else { z = "a" + "b"; }
+        """
+        expected = Interpreter(parse(code))
+        expected.interpret()
+        optimized = Interpreter(optimize(parse(code), 2)[0])
+        optimized.interpret()
+        self.assertEqual(optimized.environment, expected.environment)
+
+    def test_unknown_level(self):
+        with self.assertRaises(Exception):
+            Optimizer(3)
+
+    def test_count_nodes(self):
+        ast = Block([AssignmentStatement(Variable('x'), BinaryOperation(Number(1), '+', Number(2)))])
+        self.assertEqual(count_nodes(ast), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+from io import StringIO
+
+from src.engines import ALL_ENGINES
+from src.lexer import Lexer
+from src.output import BufferedSink, CallbackSink, FileSink, ListSink
+from src.parser import Parser
+
+
+def parse(code):
+    lexer = Lexer(code)
+    tokens = lexer.tokenize()
+    parser = Parser(tokens)
+    return parser.parse()
+
+
+class TestSinks(unittest.TestCase):
+
+    def test_list_sink(self):
+        sink = ListSink()
+        sink.write(1)
+        sink.write("a")
+        self.assertEqual(sink.values, [1, "a"])
+        self.assertEqual(sink.getvalue(), "1\na\n")
+
+    def test_buffered_sink_holds_output_until_flush(self):
+        stream = StringIO()
+        sink = BufferedSink(stream)
+        sink.write(1)
+        sink.write(2.5)
+        self.assertEqual(stream.getvalue(), "")
+        sink.flush()
+        self.assertEqual(stream.getvalue(), "1\n2.5\n")
+
+    def test_buffered_sink_flush_threshold(self):
+        stream = StringIO()
+        sink = BufferedSink(stream, flush_threshold=4)
+        sink.write("a")
+        self.assertEqual(stream.getvalue(), "")
+        sink.write("b")
+        self.assertEqual(stream.getvalue(), "a\nb\n")
+        sink.write("c")
+        sink.close()
+        self.assertEqual(stream.getvalue(), "a\nb\nc\n")
+
+    def test_file_sink(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'out.txt')
+            sink = FileSink(filename)
+            sink.write("hello")
+            sink.write(3)
+            sink.close()
+            self.assertTrue(sink.stream.closed)
+            with open(filename) as file:
+                self.assertEqual(file.read(), "hello\n3\n")
+
+    def test_callback_sink(self):
+        seen = []
+        sink = CallbackSink(seen.append)
+        sink.write(7)
+        self.assertEqual(seen, [7])
+
+
+class TestEngineOutput(unittest.TestCase):
+
+    def test_engines_write_to_sink(self):
+        ast = parse('x = 2; print x * 3; if (x > 1) { print "big"; }')
+        for name, engine in ALL_ENGINES.items():
+            with self.subTest(engine=name):
+                sink = ListSink()
+                engine(ast, sink).interpret()
+                self.assertEqual(sink.values, [6, "big"])
+
+    def test_output_can_be_replaced_between_runs(self):
+        ast = parse('print 1;')
+        for name, engine in ALL_ENGINES.items():
+            with self.subTest(engine=name):
+                first, second = ListSink(), ListSink()
+                interpreter = engine(ast, first)
+                interpreter.interpret()
+                interpreter.output = second
+                interpreter.interpret()
+                self.assertEqual(first.values, [1])
+                self.assertEqual(second.values, [1])
+
+
+if __name__ == '__main__':
+    unittest.main()
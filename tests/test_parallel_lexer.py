@@ -0,0 +1,69 @@
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from src.lexer import Lexer, UnterminatedString
+from src.parallel_lexer import split_lines, tokenize_parallel
+
+LINES = 'x = 1; // a "quote\nif (x > 0) { print "café"; }\n'
+
+
+def lex(code, processes=None, executor=None):
+    """Return repr() of the tokens, which tells 1 from 1.0, or the error raised."""
+    try:
+        if processes is None:
+            return repr(Lexer(code).tokenize())
+        return repr(list(tokenize_parallel(code, processes, executor)))
+    except RuntimeError as e:
+        return type(e).__name__, str(e)
+
+
+class TestParallelLexer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ProcessPoolExecutor(2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def assertMatchesSerial(self, code):
+        for source in (code, code.encode()):
+            for processes in (2, 3, 7):
+                with self.subTest(source=type(source), processes=processes):
+                    self.assertEqual(lex(source, processes, self.executor), lex(source))
+
+    def test_split_lines(self):
+        data = b'a\nbb\nccc\ndddd\n'
+        self.assertEqual(split_lines(data, 2), [(0, 9), (9, 14)])
+        self.assertEqual(split_lines(data, 10), [(0, 2), (2, 5), (5, 9), (9, 14)])
+        self.assertEqual(split_lines(b'no newline', 3), [(0, 10)])
+
+    def test_matches_serial(self):
+        self.assertMatchesSerial(LINES * 20 + 'y = 2.0')
+
+    def test_strings_across_chunks(self):
+        # Newlines in string literals don't count as lines, so every chunk
+        # after one of these starts on a line only known once it is joined.
+        self.assertMatchesSerial(LINES * 5 + 'x = "a\n"; s = "b\n\n' + LINES * 10 + '"; print s;\n' + LINES * 5)
+        self.assertMatchesSerial('"' + 'a\n' * 50 + '"' + LINES * 5)
+
+    def test_errors_match_serial(self):
+        self.assertMatchesSerial(LINES * 10 + 'y = @;\n' + LINES * 10)
+        self.assertMatchesSerial(LINES * 10 + 'x = "a\n' + LINES * 10 + 'print x; @')
+        self.assertMatchesSerial(LINES * 10 + '"unterminated\n' + LINES * 10)
+        with self.assertRaises(UnterminatedString):
+            tokenize_parallel(LINES * 10 + '"', 2, self.executor)
+
+    def test_own_pool(self):
+        code = LINES * 10
+        self.assertEqual(repr(list(Lexer(code).tokenize_parallel(2))), lex(code))
+
+    def test_small_inputs(self):
+        for code in ('', 'x = 1;', 'x = 1;\n'):
+            with self.subTest(code=code):
+                self.assertEqual(lex(code, 4, self.executor), lex(code))
+
+
+if __name__ == '__main__':
+    unittest.main()
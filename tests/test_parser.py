@@ -623,6 +623,51 @@ class TestParser(unittest.TestCase):
         self.assertIsInstance(false_print_stmt.value, String)
         self.assertEqual(false_print_stmt.value.value, "Result is out of expected range.")
 
+    def test_parse_from_token_iterator(self):
+        code = "x = 1; if (x > 0) { y = x + 2; } else { y = 0; } print y;"
+        ast = Parser(Lexer(code).iter_tokens()).parse()
+        self.assertIsInstance(ast, Block)
+        self.assertEqual(len(ast.statements), 3)
+        self.assertIsInstance(ast.statements[1], IfStatement)
+        self.assertEqual(ast.statements[1].true_block.statements[0].value.operator, '+')
+        self.assertIsInstance(ast.statements[2], PrintStatement)
+
+    def test_parser_pulls_one_token_ahead(self):
+        consumed = []
+
+        def tokens():
+            for token in Lexer("x = 1; y = 2;").iter_tokens():
+                consumed.append(token)
+                yield token
+
+        parser = Parser(tokens())
+        self.assertEqual(len(consumed), 1)
+        parser.assignment_statement()
+        self.assertEqual(len(consumed), 5)
+
+    def test_operators_associate_left(self):
+        def shape(node):
+            if isinstance(node, BinaryOperation):
+                return shape(node.left), node.operator, shape(node.right)
+            return node.value if isinstance(node, Number) else node.name
+
+        cases = {
+            "1 - 2 - 3": ((1, '-', 2), '-', 3),
+            "8 / 4 * 2": ((8, '/', 4), '*', 2),
+            "1 < 2 == 1": ((1, '<', 2), '==', 1),
+            "1 && b || c": ((1, '&&', 'b'), '||', 'c'),
+            "1 || b && c": ((1, '||', 'b'), '&&', 'c'),
+            "1 + 2 * 3 > x - 1 && y": (((1, '+', (2, '*', 3)), '>', ('x', '-', 1)), '&&', 'y'),
+            "(1 + 2) * (3 - (4 - 5))": ((1, '+', 2), '*', (3, '-', (4, '-', 5))),
+        }
+        for code, expected in cases.items():
+            with self.subTest(code=code):
+                self.assertEqual(shape(Parser(Lexer(code).tokenize()).parse().statements[0]), expected)
+
+    def test_every_operator_has_a_binding_power(self):
+        for operator in ['+', '-', '*', '/', '==', '!=', '<', '>', '<=', '>=', '&&', '||']:
+            self.assertIn(operator, BINDING_POWERS)
+
 
 if __name__ == '__main__':
     unittest.main()
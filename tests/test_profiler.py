@@ -0,0 +1,110 @@
+import os
+import sys
+import tempfile
+import unittest
+from io import StringIO
+
+from src.execute import run_source_file
+from src.lexer import Lexer
+from src.optimizer import optimize
+from src.output import ListSink
+from src.parser import Parser
+from src.profiler import Profile, ProfilingInterpreter
+
+CODE = 'x = 1;\ny = x + 2 * 3;\nif (y > 5) {\n    print y;\n}\n'
+
+
+def parse(code):
+    lexer = Lexer(code)
+    tokens = lexer.tokenize()
+    parser = Parser(tokens)
+    return parser.parse()
+
+
+class TestPositions(unittest.TestCase):
+
+    def test_parser_sets_positions(self):
+        ast = parse(CODE)
+        assignment = ast.statements[1]
+        self.assertEqual((assignment.line, assignment.column), (2, 0))
+        self.assertEqual((assignment.value.line, assignment.value.column), (2, 6))  # The + operator
+        if_stmt = ast.statements[2]
+        self.assertEqual(if_stmt.line, 3)
+        self.assertEqual(if_stmt.true_block.statements[0].line, 4)
+
+    def test_optimizer_keeps_positions(self):
+        ast, _ = optimize(parse(CODE))
+        folded = ast.statements[1].value.right
+        self.assertEqual(folded.value, 6)
+        self.assertEqual((folded.line, folded.column), (2, 10))
+
+
+class TestProfiler(unittest.TestCase):
+
+    def test_counts(self):
+        output = ListSink()
+        interpreter = ProfilingInterpreter(parse(CODE), output)
+        interpreter.interpret()
+        self.assertEqual(output.values, [7])
+        profile = interpreter.profile
+        self.assertEqual(profile.node_types['BinaryOperation'].hits, 3)
+        self.assertEqual(profile.node_types['Variable'].hits, 3)
+        self.assertEqual(profile.operators['*'].hits, 1)
+        self.assertEqual(profile.operators['>'].hits, 1)
+        self.assertEqual(profile.lines[2].hits, 6)
+        self.assertEqual(profile.lines[4].hits, 2)
+
+    def test_nested_time_is_counted_once(self):
+        interpreter = ProfilingInterpreter(parse('x = ((1 + 2) + 3) + 4;'), ListSink())
+        interpreter.interpret()
+        profile = interpreter.profile
+        binary = profile.node_types['BinaryOperation']
+        self.assertLessEqual(binary.total, profile.node_types['AssignmentStatement'].total)
+        self.assertLessEqual(binary.own, binary.total)
+
+    def test_shared_profile(self):
+        profile = Profile()
+        for _ in range(2):
+            ProfilingInterpreter(parse('print 1;'), ListSink(), profile).interpret()
+        self.assertEqual(profile.node_types['PrintStatement'].hits, 2)
+
+    def test_collapsed_stacks(self):
+        profile = Profile()
+        profile.stacks = {('Block', 'PrintStatement (line 1)'): 0.000012, ('Block',): 0.0000001}
+        self.assertEqual(profile.collapsed_stacks(), 'Block;PrintStatement (line 1) 12\n')
+
+    def test_report(self):
+        interpreter = ProfilingInterpreter(parse(CODE), ListSink())
+        interpreter.interpret()
+        report = interpreter.profile.report()
+        self.assertIn('by node type', report)
+        self.assertIn('by operator', report)
+        self.assertIn('by line', report)
+
+
+class TestProfileOption(unittest.TestCase):
+
+    def test_run_source_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'script.scl')
+            stacks = os.path.join(directory, 'stacks.txt')
+            with open(filename, 'w') as file:
+                file.write(CODE)
+            held_stdout, held_stderr = sys.stdout, sys.stderr
+            sys.stdout, sys.stderr = StringIO(), StringIO()
+            try:
+                run_source_file(filename, profile_output=stacks)
+                output, report = sys.stdout.getvalue(), sys.stderr.getvalue()
+            finally:
+                sys.stdout, sys.stderr = held_stdout, held_stderr
+            self.assertEqual(output, "7\n")
+            self.assertIn('by line', report)
+            with open(stacks) as file:
+                for line in file:
+                    frames, microseconds = line.rsplit(' ', 1)
+                    self.assertTrue(frames.startswith('Block'))
+                    self.assertGreater(int(microseconds), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
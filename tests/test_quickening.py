@@ -0,0 +1,90 @@
+import unittest
+
+from src.ast import BinaryOperation, Number
+from src.interpreter import Interpreter
+from src.lexer import Lexer
+from src.output import ListSink
+from src.parser import Parser
+from src.quickening import QuickeningInterpreter, QUICKEN_AFTER, DEOPTIMIZE_AFTER, SPECIALIZATIONS
+from tests.test_engines import PROGRAMS
+
+
+def parse(code):
+    lexer = Lexer(code)
+    tokens = lexer.tokenize()
+    parser = Parser(tokens)
+    return parser.parse()
+
+
+def run_many(interpreter, environments):
+    """Interpret the same program once per environment; return the outputs."""
+    outputs = []
+    for environment in environments:
+        output = ListSink()
+        interpreter.output = output
+        interpreter.environment = dict(environment)
+        interpreter.interpret()
+        outputs.append(output.values)
+    return outputs
+
+
+class TestQuickening(unittest.TestCase):
+    def test_matches_tree_interpreter_when_warm(self):
+        for code in PROGRAMS:
+            with self.subTest(code=code):
+                ast = parse(code)
+                quick = QuickeningInterpreter(ast)
+                expected = run_many(Interpreter(ast), [{}])[0]
+                self.assertEqual(run_many(quick, [{}] * (QUICKEN_AFTER + 5)), [expected] * (QUICKEN_AFTER + 5))
+
+    def test_specializes_after_warm_up(self):
+        quick = QuickeningInterpreter(parse("y = x + 1; z = (y * x > 2) && (x < 100); print z;"))
+        # The first run only marks the nodes as seen.
+        run_many(quick, [{'x': 2}] * (QUICKEN_AFTER + 1))
+        stats = quick.stats()
+        self.assertEqual(stats.sites, 5)
+        self.assertEqual(stats.specialized, 5)
+        self.assertEqual(stats.hits, 0)
+
+        self.assertEqual(run_many(quick, [{'x': 3}] * 2), [[True], [True]])
+        stats = quick.stats()
+        self.assertEqual(stats.hits, 10)
+        self.assertEqual(stats.misses, 0)
+
+    def test_type_change_falls_back_and_deoptimizes(self):
+        ast = parse("y = x * 2; print y;")
+        quick = QuickeningInterpreter(ast)
+        run_many(quick, [{'x': 2}] * (QUICKEN_AFTER + 1))
+        self.assertEqual(quick.stats().specialized, 1)
+
+        self.assertEqual(run_many(quick, [{'x': 1.5}]), [[3.0]])
+        self.assertEqual(run_many(quick, [{'x': 'ab'}]), [['abab']])
+        stats = quick.stats()
+        self.assertEqual((stats.specialized, stats.misses, stats.deoptimizations), (1, 2, 0))
+
+        run_many(quick, [{'x': 'ab'}] * (DEOPTIMIZE_AFTER - 2))
+        stats = quick.stats()
+        self.assertEqual((stats.specialized, stats.misses, stats.deoptimizations), (0, DEOPTIMIZE_AFTER, 1))
+        self.assertEqual(run_many(quick, [{'x': 4}]), [[8]])
+
+    def test_errors_match_tree_interpreter(self):
+        quick = QuickeningInterpreter(parse("y = x / z;"))
+        run_many(quick, [{'x': 1, 'z': 2}] * (QUICKEN_AFTER + 1))
+        with self.assertRaises(ZeroDivisionError):
+            run_many(quick, [{'x': 1, 'z': 0}])
+        with self.assertRaises(KeyError):
+            run_many(quick, [{'x': 1}])
+
+    def test_logical_operators_keep_their_results(self):
+        quick = QuickeningInterpreter(parse("print (x > 1) && (x < 5); print x && 0; print x || 0;"))
+        outputs = run_many(quick, [{'x': 3}] * (QUICKEN_AFTER + 2))
+        self.assertEqual(outputs[-1], [True, 0, 3])
+        self.assertIs(SPECIALIZATIONS['&&', bool, bool](True, False), False)
+
+    def test_unknown_operator(self):
+        with self.assertRaises(Exception):
+            QuickeningInterpreter(BinaryOperation(Number(1), '%', Number(2))).interpret()
+
+
+if __name__ == '__main__':
+    unittest.main()
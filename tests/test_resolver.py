@@ -0,0 +1,70 @@
+import unittest
+
+from src.lexer import Lexer
+from src.parser import Parser
+from src.resolver import Resolver, UNBOUND
+
+
+def parse(code):
+    lexer = Lexer(code)
+    tokens = lexer.tokenize()
+    parser = Parser(tokens)
+    return parser.parse()
+
+
+class TestResolver(unittest.TestCase):
+    def test_slots_follow_first_appearance(self):
+        resolver = Resolver()
+        ast = resolver.resolve(parse("x = y + 1; z = x * y; x = z;"))
+        self.assertEqual(resolver.names, ['y', 'x', 'z'])
+        self.assertEqual(resolver.slots, {'y': 0, 'x': 1, 'z': 2})
+
+        first, second, third = ast.statements
+        self.assertEqual(first.value.left.slot, 0)
+        self.assertEqual(first.variable.slot, 1)
+        self.assertEqual(second.value.left.slot, 1)
+        self.assertEqual(second.value.right.slot, 0)
+        self.assertEqual(third.variable.slot, 1)
+
+    def test_resolving_twice_is_stable(self):
+        ast = parse("a = b; c = a + d;")
+        first, second = Resolver(), Resolver()
+        first.resolve(ast)
+        second.resolve(ast)
+        self.assertEqual(first.names, second.names)
+
+    def test_reads_after_assignment_are_bound(self):
+        ast = Resolver().resolve(parse("x = y; z = x + y;"))
+        first, second = ast.statements
+        self.assertTrue(first.value.may_be_unbound)
+        self.assertFalse(second.value.left.may_be_unbound)
+        self.assertTrue(second.value.right.may_be_unbound)
+
+    def test_if_assigns_only_when_both_branches_do(self):
+        ast = Resolver().resolve(parse("""
+        if (c) { x = 1; y = 1; } else { x = 2; }
+        print x;
+        print y;
+        if (c) { print x; w = 1; }
+        print w;
+        """))
+        statements = ast.statements
+        self.assertFalse(statements[1].value.may_be_unbound)
+        self.assertTrue(statements[2].value.may_be_unbound)
+        self.assertFalse(statements[3].true_block.statements[0].value.may_be_unbound)
+        self.assertTrue(statements[4].value.may_be_unbound)
+
+    def test_load_and_store(self):
+        resolver = Resolver()
+        resolver.resolve(parse("x = y; z = x;"))
+        environment = {'y': 1, 'other': 'kept'}
+        slots = resolver.load(environment)
+        self.assertEqual(slots, [1, UNBOUND, UNBOUND])
+
+        slots[1] = 2
+        resolver.store(slots, environment)
+        self.assertEqual(environment, {'y': 1, 'x': 2, 'other': 'kept'})
+
+
+if __name__ == "__main__":
+    unittest.main()
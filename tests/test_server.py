@@ -0,0 +1,205 @@
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest import mock
+
+from src import client
+from src.limits import Limits
+from src.server import ChunkStream, ScriptServer
+
+
+class TestServer(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.socket_path = os.path.join(self.directory, 'server.sock')
+        self.start_server(ScriptServer(max_concurrency=2, cache_dir=os.path.join(self.directory, 'cache')))
+
+    def start_server(self, server):
+        self.server = server
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        asyncio.run_coroutine_threadsafe(server.start(self.socket_path), loop).result()
+
+        def stop():
+            loop.call_soon_threadsafe(server.close)
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+        self.addCleanup(stop)
+
+    def run_request(self, **request):
+        output = StringIO()
+        status, error = client.run(request, output, socket_path=self.socket_path)
+        return status, output.getvalue(), error
+
+    def write_script(self, name, code):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as file:
+            file.write(code)
+        return path
+
+    def test_run_path(self):
+        path = self.write_script('a.scl', 'x = 2; print x * 3; print "done";')
+        for engine in ('tree', 'vm', 'iterative'):
+            for _ in range(2):  # Parsed, then loaded from the cache
+                with self.subTest(engine=engine):
+                    self.assertEqual(self.run_request(path=path, engine=engine), (0, "6\ndone\n", None))
+        self.assertEqual(self.server.cache.hits, 5)
+
+    def test_run_source(self):
+        self.assertEqual(self.run_request(source='print 1 + 2;'), (0, "3\n", None))
+        self.assertEqual(self.run_request(source='print 1; print 2;', stream=True), (0, "1\n2\n", None))
+
+    def test_errors(self):
+        self.assertEqual(self.run_request(source='print 1; print missing;'), (1, "1\n", "Error: 'missing'"))
+        self.assertEqual(self.run_request(source='print 1;\nx = "a" - 1;', typecheck=True),
+                         (1, "", "Error: 2:8: cannot apply - to str and int"))
+        path = os.path.join(self.directory, 'missing.scl')
+        self.assertEqual(self.run_request(path=path), (1, "", f"Error: The file '{path}' was not found."))
+
+    def test_bad_requests(self):
+        status, _, error = self.run_request(source='print 1;', engine='nope')
+        self.assertEqual(status, 2)
+        self.assertIn("Unknown engine", error)
+        status, _, error = self.run_request(source='print 1;', path='a.scl')
+        self.assertEqual(status, 2)
+
+    def test_request_limits(self):
+        source = 'print 1; print 2; print 3;'
+        self.assertEqual(self.run_request(source=source, limits={'max_statements': 2}),
+                         (1, "1\n2\n", "Error: Statement limit of 2 exceeded"))
+        # Requests can't raise the server's limits.
+        self.server.limits = Limits(max_output_bytes=2)
+        self.assertEqual(self.run_request(source=source, limits={'max_output_bytes': 100, 'max_statements': 5}),
+                         (1, "1\n", "Error: Output limit of 2 bytes exceeded"))
+        for limits in ({'max_statements': 'many'}, {'max_lines': 1}, [1]):
+            with self.subTest(limits=limits):
+                self.assertEqual(self.run_request(source=source, limits=limits)[0], 2)
+
+    def test_output_waits_for_the_client(self):
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        queue = asyncio.Queue(1)
+        stream = ChunkStream(loop, queue)
+
+        def write():
+            for text in 'abc':
+                stream.write(text)
+            stream.close()
+        writer = threading.Thread(target=write)
+        writer.start()
+        writer.join(0.2)
+        # 'a' is queued and 'b' waits until it is taken.
+        self.assertTrue(writer.is_alive())
+        self.assertEqual(queue.qsize(), 1)
+
+        async def drain():
+            chunks = []
+            while (chunk := await queue.get()) is not None:
+                chunks.append(chunk)
+            return chunks
+        self.assertEqual(asyncio.run_coroutine_threadsafe(drain(), loop).result(5), ['a', 'b', 'c'])
+        writer.join()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    def test_environments_are_isolated(self):
+        self.assertEqual(self.run_request(source='x = 1; print x;')[0], 0)
+        self.assertEqual(self.run_request(source='print x;'), (1, "", "Error: 'x'"))
+
+    def test_concurrency_limit(self):
+        running = []
+        peak = []
+        lock = threading.Lock()
+        release = threading.Event()
+        run_source = self.server.run_source
+
+        def blocking_run_source(request, output, limits=None):
+            with lock:
+                running.append(request)
+                peak.append(len(running))
+            release.wait(5)
+            run_source(request, output, limits)
+            with lock:
+                running.remove(request)
+        self.server.run_source = blocking_run_source
+
+        with ThreadPoolExecutor(4) as executor:
+            results = [executor.submit(self.run_request, source=f'print {n};') for n in range(4)]
+            threading.Timer(0.2, release.set).start()
+            outputs = [result.result() for result in results]
+        self.assertEqual(outputs, [(0, f"{n}\n", None) for n in range(4)])
+        self.assertEqual(max(peak), 2)
+
+    def test_client_main(self):
+        path = self.write_script('a.scl', 'print 7;')
+        with self.assertRaises(SystemExit) as raised, \
+                mock.patch('sys.stdout', new_callable=StringIO) as stdout:
+            client.main([path, '--engine', 'closure', '-O', '0', '--socket', self.socket_path])
+        self.assertEqual(raised.exception.code, 0)
+        self.assertEqual(stdout.getvalue(), "7\n")
+        with self.assertRaises(SystemExit) as raised, \
+                mock.patch('sys.stdout', new_callable=StringIO) as stdout:
+            client.main([path, '--max-output-bytes', '1', '--socket', self.socket_path])
+        self.assertEqual(raised.exception.code, 1)
+        self.assertEqual(stdout.getvalue(), "Error: Output limit of 1 bytes exceeded\n")
+
+
+class TestIsolatedServer(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.socket_path = os.path.join(directory.name, 'server.sock')
+        # Run in a process of its own: forking is only safe without other threads.
+        server = subprocess.Popen([sys.executable, '-m', 'src.server', '--isolate', '--max-concurrency', '2',
+                                   '--socket', self.socket_path])
+        self.addCleanup(server.wait)
+        self.addCleanup(server.terminate)
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                client.connect(self.socket_path).close()
+                break
+            except OSError:  # Not listening yet
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.01)
+
+    def run_request(self, **request):
+        output = StringIO()
+        status, error = client.run(request, output, socket_path=self.socket_path)
+        return status, output.getvalue(), error
+
+    def test_run(self):
+        for engine in ('tree', 'closure'):
+            with self.subTest(engine=engine):
+                self.assertEqual(self.run_request(source='x = 2; print x * 3;', engine=engine), (0, "6\n", None))
+        self.assertEqual(self.run_request(source='print 1; print 2;', stream=True), (0, "1\n2\n", None))
+
+    def test_errors_and_isolation(self):
+        self.assertEqual(self.run_request(source='x = 1; print x; print y;'), (1, "1\n", "Error: 'y'"))
+        self.assertEqual(self.run_request(source='print x;'), (1, "", "Error: 'x'"))
+        self.assertEqual(self.run_request(source='print 1;', engine='nope')[0], 2)
+
+    def test_concurrent_requests(self):
+        with ThreadPoolExecutor(4) as executor:
+            results = [executor.submit(self.run_request, source=f'print {n};') for n in range(8)]
+            self.assertEqual([result.result() for result in results], [(0, f"{n}\n", None) for n in range(8)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+
+from src.interpreter import Interpreter
+from src.lexer import Lexer
+from src.output import ListSink
+from src.parser import Parser
+from src.sweep import sweep
+
+PROGRAM = """
+y = x * 2 + seed;
+if (y > 10) {
+    z = y / (x - 3);
+    print z;
+} else {
+    z = 0 - y;
+    w = "small";
+}
+label = "done";
+if ((z > 0) && (x != 4)) { print label; } else { print w; }
+"""
+
+ENVIRONMENTS = [{'x': x, 'seed': seed} for x in range(8) for seed in (0, 2.5, 7)] + [{'x': 5}, {}]
+
+
+def parse(code):
+    lexer = Lexer(code)
+    tokens = lexer.tokenize()
+    parser = Parser(tokens)
+    return parser.parse()
+
+
+def run_one(ast, environment):
+    output = ListSink()
+    interpreter = Interpreter(ast, output)
+    interpreter.environment = dict(environment)
+    try:
+        interpreter.interpret()
+        error = None
+    except Exception as e:
+        error = e
+    return interpreter.environment, output.values, error
+
+
+class TestSweep(unittest.TestCase):
+
+    def assertMatchesInterpreter(self, code, environments):
+        ast = parse(code)
+        results = sweep(ast, environments)
+        self.assertEqual(len(results), len(environments))
+        for environment, result in zip(environments, results):
+            with self.subTest(environment=environment):
+                expected_environment, expected_output, expected_error = run_one(ast, environment)
+                self.assertEqual(result.environment, expected_environment)
+                self.assertEqual(result.output, expected_output)
+                self.assertEqual(repr(result.error), repr(expected_error))
+
+    def test_matches_interpreter(self):
+        self.assertMatchesInterpreter(PROGRAM, ENVIRONMENTS)
+
+    def test_constant_program(self):
+        self.assertMatchesInterpreter('a = 2 * 3; if (a > 5) { print "six"; } b = a + 1;', [{}, {'a': 1}, {'c': 0}])
+
+    def test_errors_only_stop_their_rows(self):
+        results = sweep(parse('y = 10 / x; print y; z = y + 1;'), [{'x': 2}, {'x': 0}, {}, {'x': 5}])
+        self.assertEqual([result.failed for result in results], [False, True, True, False])
+        self.assertIsInstance(results[1].error, ZeroDivisionError)
+        self.assertIsInstance(results[2].error, KeyError)
+        self.assertEqual(results[1].environment, {'x': 0})
+        self.assertEqual(results[3].environment, {'x': 5, 'y': 2.0, 'z': 3.0})
+        self.assertEqual(results[3].output, [2.0])
+
+    def test_input_environments_are_not_modified(self):
+        environments = [{'x': 1}, {'x': 2}]
+        sweep(parse('x = x + 1; y = x;'), environments)
+        self.assertEqual(environments, [{'x': 1}, {'x': 2}])
+
+    def test_empty_batch(self):
+        self.assertEqual(sweep(parse('print 1;'), []), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
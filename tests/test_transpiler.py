@@ -0,0 +1,63 @@
+import unittest
+
+from src.lexer import Lexer
+from src.parser import Parser
+from src.transpiler import Transpiler, compile_program
+
+
+def parse(code):
+    lexer = Lexer(code)
+    tokens = lexer.tokenize()
+    parser = Parser(tokens)
+    return parser.parse()
+
+
+class TestTranspiler(unittest.TestCase):
+    def test_assignment(self):
+        source = Transpiler().transpile(parse("x = 1; y = x + 2.5;"))
+        self.assertEqual(source, (
+            "def _program(env, write):\n"
+            "    env['x'] = 1\n"
+            "    env['y'] = env['x'] + 2.5\n"
+        ))
+
+    def test_if_else(self):
+        source = Transpiler().transpile(parse('if (x > 1) { print "big"; } else { }'))
+        self.assertEqual(source, (
+            "def _program(env, write):\n"
+            "    if (env['x'] > 1):\n"
+            "        write('big')\n"
+            "    else:\n"
+            "        pass\n"
+        ))
+
+    def test_empty_program(self):
+        environment = {}
+        compile_program(parse(""))(environment, print)
+        self.assertEqual(environment, {})
+
+    def test_precedence_is_preserved(self):
+        environment = {}
+        compile_program(parse("a = 1 - (2 - 3); b = (1 + 2) * 3; c = 8 / (4 / 2); d = 2 * 3 + 4;"))(environment, print)
+        self.assertEqual(environment, {'a': 2, 'b': 9, 'c': 4.0, 'd': 10})
+
+    def test_comparisons_do_not_chain(self):
+        # (3 > 2) > 1 is True > 1, which is False; a chained Python
+        # comparison would give True.
+        environment = {}
+        compile_program(parse("x = 3 > 2 > 1;"))(environment, print)
+        self.assertIs(environment['x'], False)
+
+    def test_logical_operators_evaluate_both_sides(self):
+        with self.assertRaises(KeyError):
+            compile_program(parse("x = 0 && undefined;"))({}, print)
+
+    def test_long_chain(self):
+        code = "x = " + " + ".join(["1"] * 200) + ";"
+        environment = {}
+        compile_program(parse(code))(environment, print)
+        self.assertEqual(environment['x'], 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+
+from src.arrays import Array
+from src.engines import get_engine
+from src.lexer import Lexer
+from src.output import ListSink
+from src.parser import Parser
+from src.transpiler import Transpiler
+from src.typecheck import ANY, RESULT_TYPES, TypeCheckError, check, infer_types
+from tests.test_engines import PROGRAMS
+
+
+def parse(code):
+    lexer = Lexer(code)
+    tokens = lexer.tokenize()
+    parser = Parser(tokens)
+    return parser.parse()
+
+
+def errors(code):
+    return infer_types(parse(code)).errors
+
+
+class TestTypeInference(unittest.TestCase):
+    def test_variable_types(self):
+        environment = infer_types(parse(
+            'a = 1; b = a / 2; c = "x" + "y"; d = a < b; e = [1, 2] * a; f = sum(e); g = d && (a > 0);'
+        )).environment
+        self.assertEqual(environment, {
+            'a': {int}, 'b': {float}, 'c': {str}, 'd': {bool}, 'e': {Array}, 'f': {float}, 'g': {bool},
+        })
+
+    def test_branches_are_joined(self):
+        environment = infer_types(parse(
+            'x = 1; if (x > 0) { y = 2; z = "s"; w = 1; } else { y = 2.5; z = "t"; } v = y * 2;'
+        )).environment
+        self.assertEqual(environment['y'], {int, float})
+        self.assertEqual(environment['z'], {str})
+        self.assertEqual(environment['v'], {int, float})
+        # Assigned in one branch only, so it may come from outside.
+        self.assertNotIn('w', environment)
+
+    def test_unknown_variables_can_be_anything(self):
+        checker = infer_types(parse('y = x;'))
+        self.assertEqual(checker.environment['y'], ANY)
+        self.assertEqual(checker.errors, [])
+
+    def test_logical_operators_return_an_operand(self):
+        self.assertEqual(infer_types(parse('x = 1 && "a";')).environment['x'], {int, str})
+
+    def test_operand_types_are_annotated(self):
+        ast = parse('x = 1; y = x + 2.5; z = (x < 2) && (y > 1); w = q + 1;')
+        check(ast)
+        self.assertEqual(ast.statements[1].value.operand_types, (int, float))
+        self.assertEqual(ast.statements[2].value.operand_types, (bool, bool))
+        self.assertIsNone(ast.statements[3].value.operand_types)
+
+    def test_result_types_match_the_runtime(self):
+        self.assertEqual(RESULT_TYPES['/', int, int], {float})
+        self.assertEqual(RESULT_TYPES['*', str, int], {str})
+        self.assertEqual(RESULT_TYPES['<', Array, int], {Array})
+        self.assertNotIn(('-', str, int), RESULT_TYPES)
+        self.assertNotIn(('&&', Array, bool), RESULT_TYPES)
+
+
+class TestTypeErrors(unittest.TestCase):
+    def test_correct_programs_have_no_errors(self):
+        for code in PROGRAMS:
+            with self.subTest(code=code):
+                self.assertEqual(errors(code), [])
+
+    def test_definite_errors(self):
+        cases = {
+            'x = "abc" - 1;': ["1:10: cannot apply - to str and int"],
+            'x = [1, "a"];': ["1:4: array elements must be numbers, not str"],
+            'x = sum(1);': ["1:4: sum() expects an array, not int"],
+            'x = [1]; if (x > 0) { print 1; }': ["1:9: the truth value of an array is ambiguous, use any() or all()"],
+            'x = "a"; y = x < 1;\nz = y + "b";': ["1:15: cannot apply < to str and int"],
+        }
+        for code, expected in cases.items():
+            with self.subTest(code=code):
+                self.assertEqual(errors(code), expected)
+
+    def test_possible_errors_are_not_reported(self):
+        self.assertEqual(errors('if (q) { x = 1; } else { x = "a"; } y = x - 1;'), [])
+
+    def test_branches_that_never_run_are_skipped(self):
+        self.assertEqual(errors('if (0) { x = "a" - 1; }'), [])
+        self.assertEqual(errors('if (1) { } else { x = "a" - 1; }'), [])
+        self.assertEqual(errors('if ("") { x = "a" - 1; } else { x = "b"; } y = x - 1;'),
+                         ['1:49: cannot apply - to str and int'])
+        checker = infer_types(parse('if (1) { x = 1; } else { x = "a"; }'))
+        self.assertEqual(checker.environment['x'], {int})
+
+    def test_other_unreachable_code_is_checked(self):
+        self.assertEqual(len(errors('x = 0; if (x) { y = "a" - 1; }')), 1)
+
+    def test_check_raises(self):
+        with self.assertRaises(TypeCheckError) as context:
+            check(parse('x = "a" * "b";\ny = "c" / 2;'))
+        self.assertEqual(len(context.exception.errors), 2)
+
+
+class TestSpecializedBackends(unittest.TestCase):
+    CODE = 'x = 3; a = (x > 1) && (x < 5); b = (x > 4) || (x < 2); c = x && 0; print a; print b; print c;'
+
+    def test_transpiler_uses_bitwise_operators_on_bools(self):
+        ast = check(parse(self.CODE))
+        source = Transpiler().transpile(ast)
+        self.assertIn("(env['x'] > 1) & (env['x'] < 5)", source)
+        self.assertIn("_and(env['x'], 0)", source)
+
+    def test_results_are_unchanged(self):
+        for engine in ('python', 'closure'):
+            with self.subTest(engine=engine):
+                output = ListSink()
+                get_engine(engine)(check(parse(self.CODE)), output).interpret()
+                self.assertEqual(output.values, [True, False, 0])
+                self.assertIs(output.values[0], True)
+
+
+if __name__ == '__main__':
+    unittest.main()
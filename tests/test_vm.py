@@ -0,0 +1,127 @@
+import unittest
+from io import StringIO
+import sys
+
+from src.compiler import Compiler, LOAD_CONST, LOAD_NAME, STORE_NAME, BINARY_OP, POP_JUMP_IF_FALSE, JUMP, OPERATORS
+from src.interpreter import Interpreter
+from src.lexer import Lexer
+from src.parser import Parser
+from src.vm import VMInterpreter
+
+
+def parse(code):
+    lexer = Lexer(code)
+    tokens = lexer.tokenize()
+    parser = Parser(tokens)
+    return parser.parse()
+
+
+class TestCompiler(unittest.TestCase):
+    def test_assignment(self):
+        code = Compiler().compile(parse("x = 1 + y;"))
+        self.assertEqual(code.instructions, [
+            LOAD_CONST, 0,
+            LOAD_NAME, 0,
+            BINARY_OP, OPERATORS.index('+'),
+            STORE_NAME, 1,
+        ])
+        self.assertEqual(code.constants, [1])
+        self.assertEqual(code.names, ['y', 'x'])
+
+    def test_constants_are_deduplicated(self):
+        code = Compiler().compile(parse("x = 1; y = 1; z = 1.0;"))
+        self.assertEqual(code.constants, [1, 1.0])
+        self.assertIsInstance(code.constants[1], float)
+
+    def test_if_else_jumps(self):
+        code = Compiler().compile(parse("if (x) { y = 1; } else { y = 2; }"))
+        instructions = code.instructions
+        self.assertEqual(instructions[2], POP_JUMP_IF_FALSE)
+        self.assertEqual(instructions[8], JUMP)
+        # The conditional jump lands on the else block, the jump skips it.
+        self.assertEqual(instructions[3], 10)
+        self.assertEqual(instructions[9], len(instructions))
+
+    def test_disassemble(self):
+        listing = Compiler().compile(parse("x = 2 * 3;")).disassemble()
+        self.assertIn('BINARY_OP', listing)
+        self.assertIn('STORE_NAME', listing)
+        self.assertIn('x', listing)
+
+
+class TestVMInterpreter(unittest.TestCase):
+
+    def setUp(self):
+        self.held_stdout = sys.stdout
+        sys.stdout = StringIO()
+
+    def tearDown(self):
+        sys.stdout = self.held_stdout
+
+    def run_both(self, code):
+        sys.stdout = StringIO()
+        tree = Interpreter(parse(code))
+        tree.interpret()
+        tree_output = sys.stdout.getvalue()
+
+        sys.stdout = StringIO()
+        vm = VMInterpreter(parse(code))
+        vm.interpret()
+        self.assertEqual(vm.environment, tree.environment)
+        self.assertEqual(sys.stdout.getvalue(), tree_output)
+        return vm
+
+    def test_arithmetic_operations(self):
+        vm = self.run_both("result = (2 + 3) * (5 - 2) / 3;")
+        self.assertEqual(vm.environment['result'], 5.0)
+
+    def test_logical_operations(self):
+        vm = self.run_both("a = 1; b = 2; c = (a < b) && (b > a); d = (a == b) || (a != b); e = 0 && 5;")
+        self.assertTrue(vm.environment['c'])
+        self.assertTrue(vm.environment['d'])
+        self.assertEqual(vm.environment['e'], 0)
+
+    def test_if_statement(self):
+        vm = self.run_both("""
+        x = 10;
+        y = 20;
+        if (x < y) {
+            result = x + y;
+            print result;
+        } else {
+            result = x - y;
+            print result;
+        }
+        if (x > y) {
+            print "unreachable";
+        }
+        print "done";
+        """)
+        self.assertEqual(vm.environment['result'], 30)
+        self.assertEqual(sys.stdout.getvalue(), "30\ndone\n")
+
+    def test_nested_if_statement(self):
+        vm = self.run_both("""
+        x = 3;
+        if (x > 1) {
+            if (x > 2) { y = "big"; } else { y = "medium"; }
+        } else {
+            y = "small";
+        }
+        """)
+        self.assertEqual(vm.environment['y'], "big")
+
+    def test_shared_environment(self):
+        vm = VMInterpreter(parse("y = x * 2;"))
+        vm.environment = {'x': 21}
+        vm.interpret()
+        self.assertEqual(vm.environment['y'], 42)
+
+    def test_undefined_variable(self):
+        vm = VMInterpreter(parse("y = x;"))
+        with self.assertRaises(KeyError):
+            vm.interpret()
+
+
+if __name__ == "__main__":
+    unittest.main()